@@ -25,6 +25,12 @@ USO EN DESARROLLO:
 USO EN PRODUCCIÓN:
     uvicorn TodoLap.asgi:application --host 0.0.0.0 --port 8000
 
+EVENTOS EN VIVO:
+    /ventas/eventos/ (Server-Sent Events) es una vista asíncrona de Django y no
+    requiere Channels, pero sí un servidor ASGI: con WSGI cada conexión abierta
+    ocuparía un hilo. Con varios workers configurar
+    EVENTOS_BACKEND=inventario.eventos.BusPostgres (ver inventario/eventos.py).
+
 NOTA IMPORTANTE:
     Para características asíncronas avanzadas (WebSockets, etc.), 
     instalar Django Channels:
@@ -182,6 +182,29 @@ DATABASES = {
 #     }
 # }
 
+# ==================== CACHÉ ====================
+
+# Caché utilizada por la fotografía del catálogo de productos (inventario/catalogo.py)
+# La memoria local (default) solo es válida con un único proceso; con varios
+# workers usar una caché compartida, por ejemplo:
+#   CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+#   CACHE_LOCATION=redis://127.0.0.1:6379
+# o DatabaseCache (requiere 'python manage.py createcachetable')
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='todolap'),
+    }
+}
+
+# ==================== EVENTOS EN VIVO ====================
+
+# Bus de eventos de stock y cotizaciones (/ventas/eventos/, inventario/eventos.py)
+# El bus en memoria (default) solo reparte eventos dentro de un proceso ASGI;
+# con varios workers o servidores usar LISTEN/NOTIFY de PostgreSQL:
+#   EVENTOS_BACKEND=inventario.eventos.BusPostgres
+EVENTOS_BACKEND = config('EVENTOS_BACKEND', default='inventario.eventos.BusEnMemoria')
+
 # ==================== VALIDADORES DE CONTRASEÑA ====================
 
 # Validadores para asegurar contraseñas seguras
@@ -87,9 +87,13 @@ urlpatterns = [
     # ========== INVENTARIO - CRUD DE PRODUCTOS ==========
     # Gestión completa de productos del inventario
     path("inventario/", views.inventario_view, name="inventario"),                          # Listar productos
+    path("inventario/filas/", views.inventario_filas, name="inventario_filas"),             # Fragmento de filas (AJAX)
     path("inventario/agregar/", views.agregar_producto, name="agregar_producto"),          # Agregar producto
     path("inventario/modificar/<int:pk>/", views.modificar_producto, name="modificar_producto"),  # Modificar producto
     path("inventario/eliminar/<int:pk>/", views.eliminar_producto, name="eliminar_producto"),    # Eliminar producto
+    path("inventario/importar/", views.importar_productos, name="importar_productos"),    # Importar CSV/XLSX
+    path("inventario/exportar/", views.exportar_inventario, name="exportar_inventario"),  # Exportar CSV/XLSX
+    path("inventario/stock-bajo/", views.stock_bajo, name="stock_bajo"),                  # Productos con stock bajo
     
     # ========== SERVICIOS - GESTIÓN Y COTIZACIONES ==========
     # CRUD de servicios + sistema de cotización
@@ -98,7 +102,7 @@ urlpatterns = [
     path("servicios/modificar/<int:pk>/", modificar_servicio, name="modificar_servicio"),  # Modificar servicio
     path("servicios/eliminar/<int:pk>/", eliminar_servicio, name="eliminar_servicio"),     # Eliminar servicio
     path("servicios/cotizar/<int:servicio_id>/", cotizar_servicio, name="cotizar_servicio"),  # Generar cotización
-    path("servicios/producto-info/", obtener_producto_info, name="obtener_producto_info"), # AJAX: info de producto
+    path("servicios/producto-info/", obtener_producto_info, name="obtener_producto_info"), # AJAX (GET, async): info de productos
     
     # ========== VENTAS - MÓDULO COMPLETO ==========
     # Incluye todas las URLs definidas en ventas/urls.py
@@ -1,8 +1,147 @@
+from django import forms
 from django.contrib import admin
-from .models import Producto
+from django.db import transaction
+from django.db.models import F
+from .catalogo import invalidar_catalogo
+from .models import Producto, MovimientoStock, CorteStock, ReservaStock
+from .movimientos import registrar_movimientos
 
 # ==================== REGISTRO DE MODELOS EN ADMIN ====================
 
+class ProductoAdminForm(forms.ModelForm):
+    """
+    Formulario del admin con la versión del producto que se está editando.
+
+    Igual que en concurrencia.actualizar_producto, el guardado se rechaza si
+    el producto cambió desde que se abrió el formulario (ej. una venta
+    descontó stock): sobrescribirlo desharía esos cambios.
+    """
+
+    # Versión de Producto leída al abrir el formulario (Producto.version no es editable)
+    version_leida = forms.IntegerField(required=False, widget=forms.HiddenInput())
+
+    class Meta:
+        model = Producto
+        fields = '__all__'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk:
+            self.initial['version_leida'] = self.instance.version
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if self.instance.pk:
+            # El admin guarda dentro de una transacción: el bloqueo se conserva
+            # hasta que save_model escribe la fila
+            version = Producto.todos.select_for_update().filter(
+                pk=self.instance.pk
+            ).values_list('version', flat=True).first()
+            if version != cleaned_data.get('version_leida'):
+                raise forms.ValidationError(
+                    'El producto fue modificado por otra operación (ej. una venta) '
+                    'desde que se abrió este formulario. Recarga la página para ver '
+                    'los valores actuales.'
+                )
+        return cleaned_data
+
+
 # Registrar el modelo Producto en el panel de administración de Django
 # Esto permite gestionar productos desde /admin/
-admin.site.register(Producto)
+@admin.register(Producto)
+class ProductoAdmin(admin.ModelAdmin):
+    """
+    Administración de productos.
+    Los cambios de stock hechos desde el admin se registran en la bitácora
+    y cada guardado incrementa la versión del producto; un formulario
+    abierto antes del último cambio se rechaza (ver ProductoAdminForm).
+    Incluye los productos archivados, que pueden restaurarse con una acción.
+    Los productos no se borran (conservan su historial): se archivan.
+    """
+
+    form = ProductoAdminForm
+    list_display = ('nombre', 'sku', 'precio', 'cantidad_stock', 'stock_minimo', 'activo')
+    list_filter = ('activo',)
+    search_fields = ('nombre', 'sku')
+    actions = ('archivar', 'restaurar')
+
+    def get_queryset(self, request):
+        return Producto.todos.all()
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description='Archivar productos seleccionados')
+    def archivar(self, request, queryset):
+        producto_ids = list(queryset.values_list('pk', flat=True))
+        queryset.update(activo=False, version=F('version') + 1)
+        invalidar_catalogo(producto_ids)
+
+    @admin.action(description='Restaurar productos seleccionados')
+    def restaurar(self, request, queryset):
+        producto_ids = list(queryset.values_list('pk', flat=True))
+        queryset.update(activo=True, version=F('version') + 1)
+        invalidar_catalogo(producto_ids)
+
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            stock_anterior = 0
+            if change:
+                # Bloquear la fila: el stock y la versión leídos son exactos
+                stock_anterior, version = Producto.todos.select_for_update().filter(
+                    pk=obj.pk
+                ).values_list('cantidad_stock', 'version').get()
+                # Invalida las ediciones abiertas en el inventario (ver concurrencia.py)
+                obj.version = version + 1
+            super().save_model(request, obj, form, change)
+            registrar_movimientos(
+                {obj.pk: obj.cantidad_stock - stock_anterior},
+                'ajuste' if change else 'alta', request.user, 'Admin'
+            )
+
+
+# La bitácora es de solo lectura: los movimientos nunca se editan ni se borran
+@admin.register(MovimientoStock)
+class MovimientoStockAdmin(admin.ModelAdmin):
+    list_display = ('fecha', 'producto', 'cantidad', 'tipo', 'usuario', 'referencia')
+    list_filter = ('tipo',)
+    list_select_related = ('producto', 'usuario')
+    date_hierarchy = 'fecha'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(CorteStock)
+class CorteStockAdmin(admin.ModelAdmin):
+    list_display = ('fecha', 'producto', 'cantidad')
+    list_select_related = ('producto',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+# Las reservas las crean y liberan las cotizaciones y el POS (ver reservas.py): solo lectura
+@admin.register(ReservaStock)
+class ReservaStockAdmin(admin.ModelAdmin):
+    list_display = ('fecha', 'producto', 'cantidad', 'origen', 'documento', 'expira')
+    list_filter = ('origen',)
+    list_select_related = ('producto',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -14,3 +14,9 @@ class InventarioConfig(AppConfig):
     
     # Nombre de la aplicación (debe coincidir con el nombre del directorio)
     name = 'inventario'
+    
+    def ready(self):
+        """
+        Conecta las señales de la aplicación (invalidación del catálogo).
+        """
+        from . import signals  # noqa: F401
@@ -0,0 +1,134 @@
+"""
+Motor de búsqueda de productos del inventario.
+
+API de búsqueda compartida por el inventario, el punto de venta y las
+cotizaciones de servicios. Encapsula la estrategia de búsqueda según el
+motor de base de datos configurado en settings.DATABASES.
+
+POSTGRESQL:
+- Índices GIN pg_trgm sobre UPPER(nombre) y UPPER(descripcion): permiten
+  que las búsquedas "contiene" (icontains / ILIKE '%texto%') usen índice
+  en lugar de recorrer toda la tabla
+- Índice GIN de texto completo (tsvector, configuración 'spanish') sobre
+  nombre + descripción
+- Ordenamiento por relevancia: SearchRank + similitud de trigramas
+
+SQLITE / OTROS MOTORES (fallback):
+- Filtro icontains sobre nombre y descripción
+- Relevancia simple: primero coincidencias al inicio del nombre,
+  luego coincidencias en el nombre y al final en la descripción
+
+Los índices se crean en la migración 0003_indices_busqueda_producto.
+
+USO:
+    productos = buscar_productos('ssd', Producto.objects.filter(cantidad_stock__gt=0))[:10]
+"""
+
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from .models import Producto
+
+# Configuración de idioma para el análisis de texto completo en PostgreSQL
+CONFIGURACION_TEXTO = 'spanish'
+
+
+# ==================== UTILIDADES ====================
+
+def es_postgresql(queryset):
+    """
+    Indica si el queryset se ejecutará contra una base de datos PostgreSQL.
+
+    Args:
+        queryset (QuerySet): Queryset a evaluar
+
+    Returns:
+        bool: True si el motor es PostgreSQL
+    """
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def vector_busqueda():
+    """
+    Expresión tsvector de nombre + descripción.
+
+    Debe coincidir exactamente con la expresión del índice GIN de texto
+    completo para que PostgreSQL pueda utilizarlo.
+
+    Returns:
+        SearchVector: Vector de búsqueda de texto completo
+    """
+    from django.contrib.postgres.search import SearchVector
+
+    return SearchVector('nombre', 'descripcion', config=CONFIGURACION_TEXTO)
+
+
+# ==================== API DE BÚSQUEDA ====================
+
+def filtrar_productos(queryset, termino):
+    """
+    Filtra productos cuyo nombre o descripción coinciden con el término.
+
+    No modifica el ordenamiento del queryset, por lo que puede combinarse
+    con listados ordenados por nombre (por ejemplo, el inventario).
+
+    Args:
+        queryset (QuerySet): Queryset base de Producto
+        termino (str): Texto a buscar
+
+    Returns:
+        QuerySet: Productos que coinciden con el término
+    """
+    termino = (termino or '').strip()
+    if not termino:
+        return queryset
+
+    coincidencias = Q(nombre__icontains=termino) | Q(descripcion__icontains=termino)
+
+    if es_postgresql(queryset):
+        from django.contrib.postgres.search import SearchQuery
+
+        # Cada condición usa su propio índice GIN (BitmapOr en el plan)
+        consulta = SearchQuery(termino, config=CONFIGURACION_TEXTO, search_type='websearch')
+        return queryset.annotate(busqueda=vector_busqueda()).filter(
+            Q(busqueda=consulta) | coincidencias
+        )
+
+    return queryset.filter(coincidencias)
+
+
+def buscar_productos(termino, queryset=None):
+    """
+    Busca productos y los ordena por relevancia.
+
+    Args:
+        termino (str): Texto a buscar
+        queryset (QuerySet): Queryset base (por defecto todos los productos)
+
+    Returns:
+        QuerySet: Productos coincidentes anotados con 'relevancia' y
+                  ordenados de mayor a menor relevancia y luego por nombre
+    """
+    if queryset is None:
+        queryset = Producto.objects.all()
+
+    termino = (termino or '').strip()
+    if not termino:
+        return queryset.order_by('nombre')
+
+    productos = filtrar_productos(queryset, termino)
+
+    if es_postgresql(queryset):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+
+        consulta = SearchQuery(termino, config=CONFIGURACION_TEXTO, search_type='websearch')
+        relevancia = SearchRank(vector_busqueda(), consulta) + TrigramSimilarity('nombre', termino)
+    else:
+        relevancia = Case(
+            When(nombre__istartswith=termino, then=Value(3)),
+            When(nombre__icontains=termino, then=Value(2)),
+            default=Value(1),
+            output_field=IntegerField(),
+        )
+
+    return productos.annotate(relevancia=relevancia).order_by('-relevancia', 'nombre')
@@ -0,0 +1,247 @@
+"""
+Fotografía versionada del catálogo de productos en la caché de Django.
+
+El punto de venta, la cotización de servicios y la búsqueda de productos
+muestran el catálogo de productos con stock disponible (descontando las
+unidades apartadas por cotizaciones, ver reservas.py). En lugar de consultarlo y
+serializarlo en cada carga de página, se guarda una lista compacta en la
+caché bajo una clave que incluye la versión del catálogo.
+
+ESTRATEGIA:
+- La versión vive en la clave CLAVE_VERSION y se incrementa (después del
+  commit) cada vez que cambia un producto: señales post_save/post_delete
+  y actualizaciones masivas de stock (ventas, importaciones, ediciones)
+  o de reservas (cotizaciones creadas, pagadas o eliminadas)
+- La fotografía se guarda en 'catalogo:<version>': al incrementar la
+  versión, la fotografía anterior simplemente deja de usarse y expira
+- Saber si el catálogo cambió cuesta una sola lectura de la caché
+  (version_catalogo), sin tocar la base de datos
+- La versión y la hora del último cambio sirven como ETag y Last-Modified
+  de las vistas de consulta: un cliente con la versión actual recibe un
+  304 sin que se consulte la base de datos
+- Las vistas asíncronas usan las variantes a* (aestado_catalogo,
+  abuscar_en_catalogo), que leen la caché con su API asíncrona
+
+USO:
+    version, productos = obtener_catalogo()
+    if version_catalogo() != version_cliente: ...
+    version, modificado = await aestado_catalogo()
+    respuesta = condicion_catalogo(request, version, modificado)  # 304 o None
+"""
+
+import hashlib
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .eventos import publicar_stock
+from .models import Producto
+
+# Clave con la versión actual del catálogo
+CLAVE_VERSION = 'catalogo:version'
+
+# Clave con la hora (timestamp) del último cambio del catálogo
+CLAVE_MODIFICADO = 'catalogo:modificado'
+
+# Segundos que se conserva cada fotografía y cada resultado de búsqueda
+DURACION_CATALOGO = 60 * 60
+
+
+# ==================== VERSIÓN DEL CATÁLOGO ====================
+
+def version_catalogo():
+    """
+    Obtiene la versión actual del catálogo (una sola lectura de la caché).
+
+    Si la clave no existe (caché vacía o expulsada) se inicializa con la
+    hora actual en milisegundos, para nunca reutilizar una versión anterior
+    cuya fotografía pudiera seguir en la caché.
+
+    Returns:
+        int: Versión actual del catálogo
+    """
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        cache.add(CLAVE_VERSION, int(time.time() * 1000), timeout=None)
+        version = cache.get(CLAVE_VERSION)
+    return version
+
+
+def estado_catalogo():
+    """
+    Obtiene la versión del catálogo y la hora de su último cambio.
+
+    Si la hora no existe se inicializa con la hora actual: un cliente puede
+    recibir un 200 de más, nunca un 304 con datos viejos.
+
+    Returns:
+        tuple: (versión, timestamp del último cambio)
+    """
+    version = version_catalogo()
+    modificado = cache.get(CLAVE_MODIFICADO)
+    if modificado is None:
+        cache.add(CLAVE_MODIFICADO, time.time(), timeout=None)
+        modificado = cache.get(CLAVE_MODIFICADO)
+    return version, modificado
+
+
+async def aestado_catalogo():
+    """
+    Versión asíncrona de estado_catalogo (una sola lectura de la caché).
+    """
+    valores = await cache.aget_many([CLAVE_VERSION, CLAVE_MODIFICADO])
+    if len(valores) == 2:
+        return valores[CLAVE_VERSION], valores[CLAVE_MODIFICADO]
+    # Caché vacía o expulsada: inicializar con la lógica síncrona
+    return await sync_to_async(estado_catalogo)()
+
+
+def invalidar_catalogo(producto_ids=None):
+    """
+    Incrementa la versión del catálogo cuando la transacción actual confirma.
+
+    Se ejecuta en on_commit para que ninguna petición reconstruya la
+    fotografía con datos aún no confirmados. Si se indican los productos
+    modificados, también publica su disponible a las pantallas conectadas
+    (ver eventos.py).
+
+    Args:
+        producto_ids (list): Productos cuyo stock o disponible cambió (opcional)
+    """
+    transaction.on_commit(incrementar_version)
+    publicar_stock(producto_ids)
+
+
+def incrementar_version():
+    """
+    Incrementa atómicamente la versión del catálogo en la caché.
+    """
+    try:
+        cache.incr(CLAVE_VERSION)
+    except ValueError:
+        # La clave no existe: inicializarla con una versión nueva
+        version_catalogo()
+    cache.set(CLAVE_MODIFICADO, time.time(), timeout=None)
+
+
+# ==================== FOTOGRAFÍA DEL CATÁLOGO ====================
+
+def obtener_catalogo():
+    """
+    Obtiene la fotografía de los productos con stock disponible, ordenados por nombre.
+
+    Returns:
+        tuple: (versión, lista de dicts {id, nombre, precio, cantidad_stock, disponible})
+    """
+    # Importación local: reservas.py importa este módulo
+    from .reservas import anotar_disponible
+
+    version = version_catalogo()
+    clave = f'catalogo:{version}'
+
+    productos = cache.get(clave)
+    if productos is None:
+        productos = [
+            {'id': pk, 'nombre': nombre, 'precio': str(precio), 'cantidad_stock': stock, 'disponible': disponible}
+            for pk, nombre, precio, stock, disponible in anotar_disponible(
+                Producto.objects.filter(cantidad_stock__gt=0)
+            )
+            .filter(disponible__gt=0)
+            .order_by('nombre')
+            .values_list('id', 'nombre', 'precio', 'cantidad_stock', 'disponible')
+        ]
+        cache.set(clave, productos, DURACION_CATALOGO)
+
+    return version, productos
+
+
+def buscar_en_catalogo(termino, buscar):
+    """
+    Resultado de una búsqueda de productos guardado con la versión del catálogo.
+
+    Las búsquedas repetidas (ej. varios cajeros escribiendo el mismo término)
+    se responden desde la caché hasta que el catálogo cambie.
+
+    Args:
+        termino (str): Término buscado
+        buscar (callable): Función que ejecuta la búsqueda y retorna una lista
+
+    Returns:
+        list: Resultado de la búsqueda
+    """
+    clave = _clave_busqueda(version_catalogo(), termino)
+
+    resultado = cache.get(clave)
+    if resultado is None:
+        resultado = buscar()
+        cache.set(clave, resultado, DURACION_CATALOGO)
+    return resultado
+
+
+async def abuscar_en_catalogo(termino, buscar, version):
+    """
+    Versión asíncrona de buscar_en_catalogo.
+
+    Args:
+        termino (str): Término buscado
+        buscar (callable): Función asíncrona que ejecuta la búsqueda y retorna una lista
+        version (int): Versión del catálogo ya leída por la vista (aestado_catalogo)
+
+    Returns:
+        list: Resultado de la búsqueda
+    """
+    clave = _clave_busqueda(version, termino)
+
+    resultado = await cache.aget(clave)
+    if resultado is None:
+        resultado = await buscar()
+        await cache.aset(clave, resultado, DURACION_CATALOGO)
+    return resultado
+
+
+def _clave_busqueda(version, termino):
+    huella = hashlib.md5(termino.strip().lower().encode('utf-8')).hexdigest()
+    return f'catalogo:{version}:buscar:{huella}'
+
+
+# ==================== VALIDACIÓN CONDICIONAL (ETag / Last-Modified) ====================
+
+def condicion_catalogo(request, version, modificado):
+    """
+    Respuesta 304 si el cliente ya tiene la versión actual del catálogo.
+
+    El ETag es la versión del catálogo: cualquier cambio de stock, precio o
+    reservas la incrementa. La URL (parámetros incluidos) distingue cada
+    consulta en la caché del navegador.
+
+    Returns:
+        HttpResponse: 304 con los validadores, o None si hay que responder completo
+    """
+    respuesta = get_conditional_response(
+        request, etag=_etag(version), last_modified=int(modificado)
+    )
+    if respuesta is not None:
+        agregar_validadores(respuesta, version, modificado)
+    return respuesta
+
+
+def agregar_validadores(respuesta, version, modificado):
+    """
+    Agrega ETag, Last-Modified y Cache-Control a una respuesta de consulta.
+
+    private + no-cache: el navegador guarda la respuesta (son datos de
+    usuarios autenticados, no de proxies compartidos) y la revalida en
+    cada uso con If-None-Match.
+    """
+    respuesta['ETag'] = _etag(version)
+    respuesta['Last-Modified'] = http_date(modificado)
+    patch_cache_control(respuesta, private=True, no_cache=True)
+    return respuesta
+
+
+def _etag(version):
+    return quote_etag(f'catalogo-{version}')
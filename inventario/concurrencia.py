@@ -0,0 +1,133 @@
+"""
+Edición de productos con control de concurrencia optimista.
+
+Cada Producto tiene una versión que se incrementa en cada escritura
+(ediciones, ventas, importaciones, admin). Una edición de stock indica la
+versión que leyó el usuario y solo se aplica si la fila sigue en esa
+versión (compare-and-swap); si otra operación la modificó mientras tanto,
+la edición se rechaza en lugar de sobrescribir los cambios ajenos.
+
+Una edición que no toca el stock (ej. solo el precio) compara únicamente
+las columnas editadas con los valores que leyó el usuario: las ventas
+incrementan la versión a cada momento y no deben rechazar un cambio de
+precio de un producto que se vende mucho.
+
+CARACTERÍSTICAS:
+- Sin bloqueos pesimistas: el UPDATE ... WHERE version = X (o WHERE
+  precio = P) es atómico
+- Actualización parcial: solo se escriben los campos que cambiaron, de modo
+  que editar el precio nunca toca el stock
+- Los ajustes de stock se registran en la bitácora de movimientos
+
+USO:
+    nueva_version = actualizar_producto(producto.pk, version, {'cantidad_stock': 5}, request.user)
+    nueva_version = actualizar_producto(
+        producto.pk, version, {'precio': precio}, request.user, leidos={'precio': precio_leido}
+    )
+"""
+
+from django.db import transaction
+from django.db.models import F, Q
+
+from .catalogo import invalidar_catalogo
+from .models import Producto
+from .movimientos import registrar_movimientos
+
+# ==================== EXCEPCIONES ====================
+
+class ConflictoVersionError(ValueError):
+    """
+    Error lanzado cuando el producto cambió desde que el usuario lo leyó.
+
+    Incluye el producto con sus valores actuales para mostrarlos al usuario.
+    """
+
+    def __init__(self, producto):
+        self.producto = producto
+        super().__init__(
+            f'El producto "{producto.nombre}" fue modificado por otra operación. '
+            'Revisa los valores actuales e intenta de nuevo.'
+        )
+
+
+# ==================== ACTUALIZACIÓN CONDICIONAL ====================
+
+def actualizar_producto(producto_id, version, cambios, usuario=None, leidos=None):
+    """
+    Aplica cambios a un producto solo si no cambió desde que el usuario lo leyó.
+
+    CONDICIÓN DEL UPDATE:
+    - Si se modifica el stock, o no se indican los valores leídos: la
+      versión debe seguir siendo 'version' (cualquier escritura la cambia)
+    - Si no se modifica el stock y se indican los valores leídos: cada
+      columna editada debe conservar el valor que leyó el usuario; las
+      ventas y demás cambios de otras columnas no generan conflicto
+
+    FLUJO (dentro de una transacción atómica):
+    1. Lectura del stock actual bajo la condición
+    2. UPDATE ... WHERE pk = X AND <condición> con los campos modificados,
+       incrementando la versión
+    3. Si se modificó el stock, registro del ajuste en la bitácora
+
+    Cuando se modifica el stock la condición es la versión: si el UPDATE
+    aplica es porque el stock leído en el paso 1 sigue vigente y la
+    diferencia registrada es exacta.
+
+    Args:
+        producto_id (int): ID del producto
+        version (int): Versión que leyó el usuario
+        cambios (dict): Campos a modificar {campo: valor}
+        usuario (Usuario): Usuario que edita (para la bitácora)
+        leidos (dict): Valores que leyó el usuario de los campos modificados {campo: valor}
+
+    Returns:
+        int: Nueva versión del producto
+
+    Raises:
+        Producto.DoesNotExist: Si el producto no existe
+        ConflictoVersionError: Si el producto cambió desde que el usuario lo leyó
+    """
+    if 'cantidad_stock' in cambios or leidos is None or not set(cambios) <= set(leidos):
+        condicion = Q(version=version)
+    else:
+        condicion = Q()
+        for campo in cambios:
+            condicion &= _igual_a(campo, leidos[campo])
+
+    with transaction.atomic():
+        stock_anterior = Producto.objects.filter(
+            condicion, pk=producto_id
+        ).values_list('cantidad_stock', flat=True).first()
+
+        actualizados = 0
+        if stock_anterior is not None:
+            actualizados = Producto.objects.filter(
+                condicion, pk=producto_id
+            ).update(**cambios, version=F('version') + 1)
+
+        if not actualizados:
+            # Versión o valores distintos (o producto eliminado): informar los valores actuales
+            raise ConflictoVersionError(Producto.todos.get(pk=producto_id))
+
+        # La versión pudo avanzar por otras escrituras: leer la que quedó
+        nueva_version = Producto.todos.filter(pk=producto_id).values_list('version', flat=True).get()
+
+        # El UPDATE no emite señales: actualizar la fotografía del catálogo
+        invalidar_catalogo([producto_id])
+
+        if 'cantidad_stock' in cambios:
+            registrar_movimientos(
+                {producto_id: cambios['cantidad_stock'] - stock_anterior}, 'ajuste', usuario
+            )
+
+    return nueva_version
+
+
+def _igual_a(campo, valor):
+    """
+    Condición 'campo = valor leído'. En columnas de texto que admiten NULL,
+    el formulario lee NULL como cadena vacía: ambos se consideran iguales.
+    """
+    if valor in ('', None) and Producto._meta.get_field(campo).null:
+        return Q(**{f'{campo}__isnull': True}) | Q(**{campo: ''})
+    return Q(**{campo: valor})
@@ -0,0 +1,309 @@
+"""
+Eventos en vivo del stock y de las cotizaciones (publicación/suscripción).
+
+Las pantallas abiertas (POS, cobro de servicios) mantienen una sola
+conexión Server-Sent Events (/ventas/eventos/) y reciben solo los cambios,
+en lugar de recargar la página completa:
+
+    {"stock": {"12": 3, "15": 0}}                       # producto -> disponible
+    {"servicios": {"7": "pagado", "9": "cotizado"}}     # cotización -> estado
+    {"recargar": true}                                  # se perdieron eventos
+
+ESTRATEGIA:
+- Los módulos que modifican el stock o las cotizaciones publican después
+  del commit (transaction.on_commit): nunca se anuncia un cambio revertido
+- La publicación es opcional: un error al leer el disponible o al enviar
+  el NOTIFY solo se registra en el log y nunca convierte en error 500 una
+  venta o un pago ya confirmados (las pantallas se resincronizan con el
+  catálogo versionado al reconectarse)
+- El stock se lee una sola vez por publicación (disponible de los productos
+  afectados) y se envía a todas las pantallas conectadas
+- Cada conexión tiene una cola acotada; si un cliente lento la llena se
+  descarta su cola y recibe {"recargar": true} para resincronizarse con
+  el catálogo versionado (/ventas/catalogo/)
+- El bus se elige con settings.EVENTOS_BACKEND:
+  - BusEnMemoria (default): reparte los eventos dentro del proceso; basta
+    con un solo proceso ASGI (ej. uvicorn con un worker)
+  - BusPostgres: LISTEN/NOTIFY de PostgreSQL, para varios procesos o
+    servidores; cada proceso escucha el canal con una conexión dedicada
+
+USO:
+    publicar_stock([producto.pk])                  # dentro o fuera de una transacción
+    publicar_servicios({servicio_pagado.pk: 'pagado'})
+    async for fragmento in flujo_sse(): ...        # cuerpo de la respuesta SSE
+"""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+from functools import partial
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Canal de PostgreSQL para LISTEN/NOTIFY
+CANAL = 'todolap_eventos'
+
+# Entradas máximas por mensaje (NOTIFY admite hasta 8000 bytes por mensaje)
+MAXIMO_POR_MENSAJE = 200
+
+# Mensajes que se acumulan por conexión antes de pedirle que se resincronice
+TAMANO_COLA = 100
+
+# Segundos sin eventos tras los que se envía un comentario para mantener viva la conexión
+ESPERA_LATIDO = 25
+
+# Milisegundos que el navegador espera antes de reconectarse
+ESPERA_RECONEXION = 3000
+
+
+# ==================== SUSCRIPCIONES ====================
+
+class Suscripcion:
+    """
+    Cola de eventos de una conexión SSE.
+
+    Se crea dentro del event loop de la conexión; los eventos se publican
+    desde otros hilos (vistas síncronas, escucha de PostgreSQL) y se
+    entregan al loop con call_soon_threadsafe.
+    """
+
+    def __init__(self, bus):
+        self.bus = bus
+        self.loop = asyncio.get_running_loop()
+        self.cola = asyncio.Queue(maxsize=TAMANO_COLA)
+
+    def recibir(self, mensaje):
+        """
+        Entrega un mensaje a la conexión (seguro desde cualquier hilo).
+        """
+        try:
+            self.loop.call_soon_threadsafe(self._encolar, mensaje)
+        except RuntimeError:
+            # El loop de la conexión ya terminó
+            self.cerrar()
+
+    def _encolar(self, mensaje):
+        if self.cola.full():
+            # Cliente lento: descartar lo pendiente y pedirle que se resincronice
+            while not self.cola.empty():
+                self.cola.get_nowait()
+            mensaje = {'recargar': True}
+        self.cola.put_nowait(mensaje)
+
+    async def siguiente(self):
+        """
+        Espera el siguiente mensaje de la conexión.
+        """
+        return await self.cola.get()
+
+    def cerrar(self):
+        """
+        Deja de recibir eventos.
+        """
+        self.bus.quitar(self)
+
+
+# ==================== BUSES ====================
+
+class BusEnMemoria:
+    """
+    Reparte los eventos entre las conexiones del proceso actual.
+    """
+
+    def __init__(self):
+        self._suscripciones = set()
+        self._candado = threading.Lock()
+
+    def suscribir(self):
+        """
+        Crea la suscripción de una conexión (llamar dentro de su event loop).
+        """
+        suscripcion = Suscripcion(self)
+        with self._candado:
+            self._suscripciones.add(suscripcion)
+        return suscripcion
+
+    def quitar(self, suscripcion):
+        with self._candado:
+            self._suscripciones.discard(suscripcion)
+
+    def entregar(self, mensaje):
+        """
+        Entrega un mensaje a todas las conexiones del proceso.
+        """
+        with self._candado:
+            suscripciones = list(self._suscripciones)
+        for suscripcion in suscripciones:
+            suscripcion.recibir(mensaje)
+
+    def publicar(self, mensaje):
+        """
+        Publica un mensaje (ya confirmado) para todas las conexiones.
+        """
+        self.entregar(mensaje)
+
+
+class BusPostgres(BusEnMemoria):
+    """
+    Reparte los eventos entre procesos con LISTEN/NOTIFY de PostgreSQL.
+
+    Publicar es un NOTIFY; cada proceso escucha el canal en un hilo con
+    una conexión dedicada (se abre con la primera suscripción) y entrega
+    los mensajes a sus propias conexiones.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._escuchando = False
+
+    def suscribir(self):
+        with self._candado:
+            if not self._escuchando:
+                self._escuchando = True
+                threading.Thread(target=self._escuchar, name='eventos-listen', daemon=True).start()
+        return super().suscribir()
+
+    def publicar(self, mensaje):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [CANAL, json.dumps(mensaje, separators=(',', ':'))])
+
+    def _escuchar(self):
+        """
+        Recibe los NOTIFY del canal y los entrega a las conexiones del proceso.
+        """
+        conexion = connections.create_connection(DEFAULT_DB_ALIAS)
+        try:
+            conexion.ensure_connection()
+            crudo = conexion.connection
+            with crudo.cursor() as cursor:
+                cursor.execute(f'LISTEN {CANAL}')
+
+            if callable(getattr(crudo, 'notifies', None)):
+                # psycopg 3: generador bloqueante de notificaciones
+                for aviso in crudo.notifies():
+                    self.entregar(json.loads(aviso.payload))
+            else:
+                # psycopg2: esperar a que el socket tenga datos y leer la lista
+                while True:
+                    if select.select([crudo], [], [], ESPERA_LATIDO)[0]:
+                        crudo.poll()
+                        while crudo.notifies:
+                            self.entregar(json.loads(crudo.notifies.pop(0).payload))
+        except Exception:
+            logger.exception('Se perdió la escucha del canal %s', CANAL)
+        finally:
+            # Conexión perdida: cerrarla, pedir a las pantallas que se
+            # resincronicen y volver a escuchar con la siguiente suscripción
+            conexion.close()
+            with self._candado:
+                self._escuchando = False
+            self.entregar({'recargar': True})
+
+
+_bus = None
+_candado_bus = threading.Lock()
+
+
+def obtener_bus():
+    """
+    Bus configurado en settings.EVENTOS_BACKEND (uno por proceso).
+    """
+    global _bus
+    if _bus is None:
+        with _candado_bus:
+            if _bus is None:
+                _bus = import_string(
+                    getattr(settings, 'EVENTOS_BACKEND', 'inventario.eventos.BusEnMemoria')
+                )()
+    return _bus
+
+
+# ==================== PUBLICACIÓN ====================
+
+def _en_lotes(cambios):
+    """
+    Divide un diccionario de cambios en mensajes de MAXIMO_POR_MENSAJE entradas.
+    """
+    entradas = [(str(clave), valor) for clave, valor in cambios.items()]
+    for inicio in range(0, len(entradas), MAXIMO_POR_MENSAJE):
+        yield dict(entradas[inicio:inicio + MAXIMO_POR_MENSAJE])
+
+
+def publicar_stock(producto_ids):
+    """
+    Publica, al confirmar la transacción, el disponible de los productos indicados.
+    """
+    if producto_ids:
+        transaction.on_commit(partial(_enviar_stock, set(producto_ids)))
+
+
+def _enviar_stock(producto_ids):
+    # Importación local: reservas.py importa catalogo.py, que importa este módulo
+    from .models import Producto
+    from .reservas import anotar_disponible
+
+    try:
+        # Un producto archivado o eliminado ya no está disponible
+        disponibles = dict.fromkeys(producto_ids, 0)
+        disponibles.update(
+            anotar_disponible(Producto.objects.filter(pk__in=producto_ids))
+            .values_list('pk', 'disponible')
+        )
+
+        bus = obtener_bus()
+        for lote in _en_lotes({pk: max(disponible, 0) for pk, disponible in disponibles.items()}):
+            bus.publicar({'stock': lote})
+    except Exception:
+        # La operación ya se confirmó: el evento es opcional
+        logger.exception('No se pudo publicar el stock de los productos %s', sorted(producto_ids))
+
+
+def publicar_servicios(estados):
+    """
+    Publica, al confirmar la transacción, el nuevo estado de las cotizaciones.
+
+    Args:
+        estados (dict): {servicio_pagado_id: 'cotizado' | 'pagado' | 'eliminado'}
+    """
+    if estados:
+        transaction.on_commit(partial(_enviar_servicios, dict(estados)))
+
+
+def _enviar_servicios(estados):
+    try:
+        bus = obtener_bus()
+        for lote in _en_lotes(estados):
+            bus.publicar({'servicios': lote})
+    except Exception:
+        # La operación ya se confirmó: el evento es opcional
+        logger.exception('No se pudo publicar el estado de las cotizaciones %s', sorted(estados))
+
+
+# ==================== FLUJO SSE ====================
+
+async def flujo_sse():
+    """
+    Cuerpo de una respuesta text/event-stream con los eventos publicados.
+
+    Termina cuando el cliente se desconecta (el servidor ASGI cancela la
+    tarea y la suscripción se cierra).
+    """
+    suscripcion = obtener_bus().suscribir()
+    try:
+        yield f'retry: {ESPERA_RECONEXION}\n\n'
+        while True:
+            try:
+                mensaje = await asyncio.wait_for(suscripcion.siguiente(), ESPERA_LATIDO)
+            except asyncio.TimeoutError:
+                # Comentario SSE: evita que los proxies cierren la conexión inactiva
+                yield ': latido\n\n'
+                continue
+            yield f"data: {json.dumps(mensaje, separators=(',', ':'))}\n\n"
+    finally:
+        suscripcion.cerrar()
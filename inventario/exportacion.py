@@ -0,0 +1,196 @@
+"""
+Exportación de datos en streaming (CSV/XLSX).
+
+Utilidades para exportar tablas grandes sin cargar los querysets en memoria,
+junto con la exportación del catálogo de productos. Las exportaciones de
+ventas y servicios (ventas/exportacion.py) reutilizan estas utilidades.
+
+ESTRATEGIA:
+- Las filas se leen con .iterator(chunk_size=...): en PostgreSQL Django usa
+  cursores del lado del servidor, por lo que solo hay un bloque de filas
+  en memoria a la vez
+- CSV: cada fila se escribe y se envía al cliente inmediatamente
+  (StreamingHttpResponse), la descarga empieza con el primer bloque
+- XLSX: openpyxl en modo write_only escribe las filas en un archivo
+  temporal (memoria constante) y el archivo resultante se envía por bloques.
+  LIMITACIÓN: un XLSX es un ZIP que se cierra al final, por lo que el
+  primer byte sale hasta que el libro está completo; las exportaciones muy
+  grandes conviene generarlas con 'python manage.py exportar_datos'
+- Bajo ASGI Django consumiría un iterador síncrono completo en memoria
+  antes de enviarlo; respuesta_exportacion recibe el request y, bajo ASGI,
+  envía un iterador asíncrono que lee el iterador síncrono por lotes en
+  el hilo de la petición (iterar_asincrono)
+
+USO:
+    encabezados, filas = exportar_productos()
+    return respuesta_exportacion('productos', encabezados, filas, 'csv', request)
+"""
+
+import csv
+import tempfile
+from datetime import datetime
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import Producto
+
+# Filas leídas de la base de datos por cada viaje al servidor
+TAMANO_BLOQUE = 2000
+
+# Tamaño de los bloques de bytes enviados al cliente (archivos XLSX)
+TAMANO_ENVIO = 64 * 1024
+
+# Partes (líneas CSV o bloques XLSX) leídas por cada salto al hilo síncrono bajo ASGI
+TAMANO_LOTE_ASINCRONO = 200
+
+# Formatos soportados: extensión → content type
+FORMATOS = {
+    'csv': 'text/csv; charset=utf-8',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+# ==================== ESCRITORES EN STREAMING ====================
+
+class Eco:
+    """
+    Pseudo-buffer para csv.writer: en lugar de almacenar, retorna lo escrito.
+    Permite generar el CSV fila por fila sin acumularlo en memoria.
+    """
+
+    def write(self, valor):
+        return valor
+
+
+def valor_local(valor):
+    """
+    Convierte fechas con zona horaria a la hora local sin zona.
+    openpyxl no soporta datetimes con tzinfo y en CSV se prefiere la hora local.
+    """
+    if isinstance(valor, datetime) and timezone.is_aware(valor):
+        return timezone.make_naive(valor)
+    return valor
+
+
+def generar_csv(encabezados, filas):
+    """
+    Genera el contenido CSV línea por línea.
+
+    Incluye BOM UTF-8 al inicio para que Excel reconozca los acentos.
+    """
+    escritor = csv.writer(Eco())
+    yield '\ufeff' + escritor.writerow(encabezados)
+    for fila in filas:
+        yield escritor.writerow([valor_local(valor) for valor in fila])
+
+
+def generar_xlsx(encabezados, filas, titulo='Datos'):
+    """
+    Genera el contenido XLSX en bloques de bytes.
+
+    El libro en modo write_only no conserva las filas en memoria; al terminar
+    se guarda en un archivo temporal que se envía en bloques de TAMANO_ENVIO.
+    El primer bloque sale hasta que se escribieron todas las filas (el ZIP
+    del XLSX se cierra al final): para exportaciones muy grandes usar el
+    comando 'exportar_datos'.
+    """
+    from openpyxl import Workbook
+
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet(title=titulo[:31])
+    hoja.append(list(encabezados))
+    for fila in filas:
+        hoja.append([valor_local(valor) for valor in fila])
+
+    with tempfile.TemporaryFile() as temporal:
+        libro.save(temporal)
+        temporal.seek(0)
+        while True:
+            bloque = temporal.read(TAMANO_ENVIO)
+            if not bloque:
+                break
+            yield bloque
+
+
+def escribir_exportacion(salida, encabezados, filas, formato, titulo='Datos'):
+    """
+    Escribe una exportación completa en un archivo binario abierto.
+    Utilizado por el comando de administración 'exportar_datos'.
+    """
+    if formato == 'xlsx':
+        for bloque in generar_xlsx(encabezados, filas, titulo):
+            salida.write(bloque)
+    else:
+        for linea in generar_csv(encabezados, filas):
+            salida.write(linea.encode('utf-8'))
+
+
+async def iterar_asincrono(contenido, tamano_lote=TAMANO_LOTE_ASINCRONO):
+    """
+    Recorre un iterador síncrono desde el event loop, por lotes.
+
+    Cada lote se lee con sync_to_async (thread_sensitive): el cursor de la
+    base de datos se usa siempre desde el mismo hilo y solo un lote está en
+    memoria a la vez.
+    """
+    siguiente_lote = sync_to_async(lambda: list(islice(contenido, tamano_lote)))
+    while True:
+        lote = await siguiente_lote()
+        if not lote:
+            break
+        for parte in lote:
+            yield parte
+
+
+def respuesta_exportacion(nombre, encabezados, filas, formato='csv', request=None):
+    """
+    Construye una StreamingHttpResponse de descarga para una exportación.
+
+    Args:
+        nombre (str): Nombre base del archivo descargado
+        encabezados (list): Títulos de las columnas
+        filas (iterable): Filas a exportar (normalmente un .iterator())
+        formato (str): 'csv' o 'xlsx'
+        request (HttpRequest): Petición actual; bajo ASGI el contenido se
+            envía con un iterador asíncrono para no acumularlo en memoria
+
+    Returns:
+        StreamingHttpResponse: Respuesta con el archivo como adjunto
+    """
+    if formato not in FORMATOS:
+        formato = 'csv'
+
+    if formato == 'xlsx':
+        contenido = generar_xlsx(encabezados, filas, titulo=nombre)
+    else:
+        contenido = generar_csv(encabezados, filas)
+
+    if isinstance(request, ASGIRequest):
+        contenido = iterar_asincrono(contenido)
+
+    fecha = timezone.localdate().isoformat()
+    response = StreamingHttpResponse(contenido, content_type=FORMATOS[formato])
+    response['Content-Disposition'] = f'attachment; filename="{nombre}_{fecha}.{formato}"'
+    return response
+
+
+# ==================== EXPORTACIÓN DE PRODUCTOS ====================
+
+def exportar_productos():
+    """
+    Define la exportación del catálogo de productos.
+
+    Returns:
+        tuple: (encabezados, iterador de filas)
+    """
+    encabezados = ['id', 'sku', 'nombre', 'descripcion', 'precio', 'cantidad_stock', 'stock_minimo']
+
+    filas = Producto.objects.order_by('pk').values_list(
+        'id', 'sku', 'nombre', 'descripcion', 'precio', 'cantidad_stock', 'stock_minimo'
+    ).iterator(chunk_size=TAMANO_BLOQUE)
+
+    return encabezados, filas
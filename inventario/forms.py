@@ -15,14 +15,15 @@ class ProductoForm(forms.ModelForm):
         model = Producto
         
         # Campos que se mostrarán en el formulario
-        fields = ['nombre', 'descripcion', 'precio', 'cantidad_stock']
+        fields = ['nombre', 'descripcion', 'precio', 'cantidad_stock', 'stock_minimo']
         
         # Etiquetas personalizadas para cada campo
         labels = {
             'nombre': 'Nombre',
             'descripcion': 'Descripción',
             'precio': 'Precio',
-            'cantidad_stock': 'Cantidad en stock'
+            'cantidad_stock': 'Cantidad en stock',
+            'stock_minimo': 'Stock mínimo'
         }
         
         # Widgets personalizados con estilos y validaciones HTML5
@@ -54,4 +55,55 @@ class ProductoForm(forms.ModelForm):
                 'min': '0',
                 'placeholder': 'Cantidad disponible'
             }),
+            # Punto de reorden (0 = sin alerta de stock bajo)
+            'stock_minimo': forms.NumberInput(attrs={
+                'class': 'form-control',
+                'min': '0',
+                'placeholder': 'Punto de reorden'
+            }),
         }
+
+
+
+class EditarProductoForm(ProductoForm):
+    """
+    Formulario para editar un producto con control de concurrencia optimista.
+    
+    Agrega la versión del producto que el usuario está editando (campo oculto).
+    La vista modificar_producto construye una variante con solo los campos
+    enviados, para que una edición parcial (ej. solo precio) no toque el resto.
+    """
+    
+    # Versión de Producto leída al abrir el formulario
+    version = forms.IntegerField(min_value=1, widget=forms.HiddenInput())
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance.pk and 'version' not in self.initial:
+            self.initial['version'] = self.instance.version
+
+
+class ImportarProductosForm(forms.Form):
+    """
+    Formulario para subir un archivo de productos (CSV o XLSX).
+    
+    El archivo se procesa con inventario.importacion, que valida cada fila
+    con las reglas de ProductoForm y guarda los productos por lotes.
+    """
+    
+    # Archivo del proveedor con encabezados en la primera fila
+    archivo = forms.FileField(
+        label='Archivo de productos',
+        help_text='Formatos: .csv o .xlsx. Columnas: nombre, descripcion, precio, cantidad_stock, sku.',
+        widget=forms.ClearableFileInput(attrs={
+            'class': 'form-control',
+            'accept': '.csv,.xlsx'
+        })
+    )
+    
+    # Modo de actualización del stock para productos existentes
+    sumar_stock = forms.BooleanField(
+        label='Sumar cantidades al stock actual (en lugar de reemplazarlo)',
+        required=False,
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
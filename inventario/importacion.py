@@ -0,0 +1,451 @@
+"""
+Importación masiva de productos desde archivos de proveedores (CSV/XLSX).
+
+Este módulo procesa archivos de productos fila por fila, sin cargar el
+archivo completo en memoria, y guarda los productos por lotes.
+
+CARACTERÍSTICAS:
+- Lectura en streaming: CSV con csv.reader y XLSX con openpyxl en modo read_only
+- Validación de cada fila con las mismas reglas de ProductoForm
+- Upsert por SKU (si la fila lo trae) o por nombre del producto; los
+  productos archivados que vuelven a aparecer en el archivo se restauran
+- Guardado por lotes: una consulta de búsqueda, un bulk_create y un
+  bulk_update por lote, cada lote en su propia transacción
+- Reporte de errores por número de fila del archivo
+- Los cambios de stock de cada lote se registran en la bitácora de movimientos
+
+COLUMNAS RECONOCIDAS (encabezado en la primera fila, sin importar
+mayúsculas o acentos):
+- nombre / artículo (obligatoria)
+- descripción
+- precio
+- cantidad_stock / cantidad / stock
+- sku
+- stock_minimo / minimo (si falta, se conserva el del producto existente)
+
+USO:
+    with open('proveedor.xlsx', 'rb') as archivo:
+        resultado = importar_archivo(archivo, 'proveedor.xlsx')
+    print(resultado.creados, resultado.actualizados, resultado.errores)
+"""
+
+import csv
+import io
+import unicodedata
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .forms import ProductoForm
+from .catalogo import invalidar_catalogo
+from .models import Producto
+from .movimientos import registrar_movimientos
+
+# Número de filas válidas que se guardan en cada transacción
+TAMANO_LOTE = 1000
+
+# Máximo de errores que se conservan en el reporte (el conteo total no se limita)
+MAX_ERRORES = 500
+
+# Encabezados aceptados (normalizados) y el campo de Producto al que corresponden
+COLUMNAS = {
+    'nombre': 'nombre',
+    'articulo': 'nombre',
+    'producto': 'nombre',
+    'descripcion': 'descripcion',
+    'precio': 'precio',
+    'cantidad_stock': 'cantidad_stock',
+    'cantidad_en_stock': 'cantidad_stock',
+    'cantidad': 'cantidad_stock',
+    'stock': 'cantidad_stock',
+    'sku': 'sku',
+    'codigo': 'sku',
+    'stock_minimo': 'stock_minimo',
+    'minimo': 'stock_minimo',
+    'punto_de_reorden': 'stock_minimo',
+}
+
+# Longitud máxima del SKU (debe coincidir con Producto.sku)
+LONGITUD_SKU = 50
+
+
+# ==================== RESULTADO DE LA IMPORTACIÓN ====================
+
+class ResultadoImportacion:
+    """
+    Resumen de una importación de productos.
+
+    ATRIBUTOS:
+    - filas: Filas de datos leídas (sin contar encabezado ni filas vacías)
+    - creados: Productos nuevos insertados
+    - actualizados: Productos existentes actualizados
+    - total_errores: Número de filas rechazadas
+    - errores: Lista de tuplas (fila, mensaje), limitada a MAX_ERRORES
+    - interrumpido: True si el archivo no se pudo leer completo (las filas
+      anteriores al error sí se guardaron)
+    """
+
+    def __init__(self):
+        self.filas = 0
+        self.creados = 0
+        self.actualizados = 0
+        self.total_errores = 0
+        self.errores = []
+        self.interrumpido = False
+
+    def agregar_error(self, fila, mensaje):
+        """
+        Registra un error de validación de una fila del archivo.
+        """
+        self.total_errores += 1
+        if len(self.errores) < MAX_ERRORES:
+            self.errores.append((fila, mensaje))
+
+    @property
+    def errores_omitidos(self):
+        """Errores contados pero no incluidos en la lista del reporte."""
+        return self.total_errores - len(self.errores)
+
+
+# ==================== LECTURA DE ARCHIVOS ====================
+
+def normalizar_encabezado(valor):
+    """
+    Normaliza un encabezado: minúsculas, sin acentos y con guiones bajos.
+
+    Ejemplo: " Descripción " → "descripcion", "Cantidad en stock" → "cantidad_en_stock"
+    """
+    texto = unicodedata.normalize('NFKD', str(valor or '').strip().lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return '_'.join(texto.split())
+
+
+def leer_csv(archivo, codificacion='utf-8-sig'):
+    """
+    Genera las filas de un archivo CSV como listas de valores.
+
+    Detecta automáticamente el separador (coma, punto y coma o tabulador).
+    """
+    texto = io.TextIOWrapper(getattr(archivo, 'file', archivo), encoding=codificacion, newline='')
+
+    muestra = texto.read(4096)
+    texto.seek(0)
+    try:
+        dialecto = csv.Sniffer().sniff(muestra, delimiters=',;\t')
+    except csv.Error:
+        dialecto = csv.excel
+
+    try:
+        yield from csv.reader(texto, dialecto)
+    finally:
+        # Evitar que el wrapper cierre el archivo original al ser recolectado
+        texto.detach()
+
+
+def leer_xlsx(archivo):
+    """
+    Genera las filas de la hoja activa de un archivo XLSX.
+
+    Usa el modo read_only de openpyxl, que lee las celdas en streaming
+    sin construir el libro completo en memoria.
+    """
+    from openpyxl import load_workbook
+
+    libro = load_workbook(archivo, read_only=True, data_only=True)
+    try:
+        yield from libro.active.iter_rows(values_only=True)
+    finally:
+        libro.close()
+
+
+def leer_filas(archivo, nombre_archivo, codificacion='utf-8-sig'):
+    """
+    Genera tuplas (numero_fila, datos) con las filas de datos del archivo.
+
+    Args:
+        archivo: Archivo binario abierto (o UploadedFile de Django)
+        nombre_archivo (str): Nombre del archivo, define el formato por su extensión
+        codificacion (str): Codificación de texto para archivos CSV
+
+    Yields:
+        tuple: (número de fila en el archivo, dict campo → valor)
+
+    Raises:
+        ValueError: Si el formato no es soportado o falta la columna 'nombre'
+    """
+    extension = nombre_archivo.lower().rsplit('.', 1)[-1]
+
+    if extension in ('csv', 'txt'):
+        filas = leer_csv(archivo, codificacion)
+    elif extension in ('xlsx', 'xlsm'):
+        filas = leer_xlsx(archivo)
+    else:
+        raise ValueError('Formato no soportado. Utiliza un archivo .csv o .xlsx.')
+
+    campos = None
+
+    for numero, valores in enumerate(filas, start=1):
+        # Omitir filas completamente vacías
+        if not any(valor not in (None, '') for valor in valores):
+            continue
+
+        # La primera fila con datos es el encabezado
+        if campos is None:
+            campos = [COLUMNAS.get(normalizar_encabezado(valor)) for valor in valores]
+            if 'nombre' not in campos:
+                raise ValueError('El archivo no tiene una columna "nombre".')
+            continue
+
+        datos = {}
+        for campo, valor in zip(campos, valores):
+            if campo and campo not in datos:
+                datos[campo] = '' if valor is None else str(valor).strip()
+
+        yield numero, datos
+
+
+# ==================== VALIDACIÓN ====================
+
+def validar_fila(datos):
+    """
+    Valida una fila con las reglas de ProductoForm.
+
+    Usa directamente los campos de ProductoForm (mismos tipos, longitudes,
+    decimales y mínimos) sin construir un formulario completo por fila,
+    lo que mantiene la validación rápida en archivos grandes.
+
+    Args:
+        datos (dict): Valores de la fila (campo → texto)
+
+    Returns:
+        tuple: (datos_limpios, None) si es válida o (None, mensaje) si no lo es
+    """
+    valores = {
+        'nombre': datos.get('nombre', ''),
+        'descripcion': datos.get('descripcion', ''),
+        'precio': datos.get('precio', ''),
+        'cantidad_stock': datos.get('cantidad_stock') or '0',
+        'stock_minimo': datos.get('stock_minimo') or '',
+    }
+
+    limpios = {}
+    errores = []
+
+    for nombre, campo in ProductoForm.base_fields.items():
+        # stock_minimo es opcional en el archivo (None = no modificar)
+        if nombre == 'stock_minimo' and not valores[nombre]:
+            limpios[nombre] = None
+            continue
+        try:
+            limpios[nombre] = campo.clean(valores.get(nombre, ''))
+        except ValidationError as e:
+            errores.append(f'{nombre}: {" ".join(e.messages)}')
+
+    sku = datos.get('sku') or None
+    if sku and len(sku) > LONGITUD_SKU:
+        errores.append(f'sku: Máximo {LONGITUD_SKU} caracteres.')
+
+    if errores:
+        return None, '; '.join(errores)
+
+    return {
+        'nombre': limpios['nombre'],
+        'descripcion': limpios['descripcion'] or None,
+        'precio': limpios['precio'],
+        'cantidad_stock': limpios['cantidad_stock'],
+        'sku': sku,
+        'stock_minimo': limpios['stock_minimo'],
+    }, None
+
+
+# ==================== GUARDADO POR LOTES ====================
+
+def guardar_lote(lote, sumar_stock=False, usuario=None, referencia=''):
+    """
+    Inserta o actualiza un lote de filas válidas en una sola transacción.
+
+    Busca primero por SKU y después por nombre. Las filas repetidas dentro
+    del lote se combinan (la última gana, o se suman si sumar_stock=True).
+
+    Args:
+        lote (list): Lista de dicts con datos limpios de productos
+        sumar_stock (bool): Sumar la cantidad al stock actual en lugar de reemplazarlo
+        usuario (Usuario): Usuario que importa (para la bitácora de movimientos)
+        referencia (str): Referencia de los movimientos (ej. nombre del archivo)
+
+    Returns:
+        tuple: (creados, actualizados)
+    """
+    # Combinar filas repetidas dentro del lote (misma llave SKU o nombre)
+    combinadas = {}
+    for datos in lote:
+        llave = ('sku', datos['sku']) if datos['sku'] else ('nombre', datos['nombre'])
+        previa = combinadas.get(llave)
+        if previa and sumar_stock:
+            datos = {**datos, 'cantidad_stock': previa['cantidad_stock'] + datos['cantidad_stock']}
+        combinadas[llave] = datos
+
+    skus = [datos['sku'] for datos in combinadas.values() if datos['sku']]
+    nombres = [datos['nombre'] for datos in combinadas.values()]
+
+    with transaction.atomic():
+        # Una consulta por llave para todo el lote
+        # Incluye productos archivados: si el proveedor los vuelve a enviar se restauran
+        por_sku = Producto.todos.select_for_update().in_bulk(skus, field_name='sku')
+        por_nombre = {}
+        for producto in (Producto.todos.select_for_update().filter(nombre__in=nombres)
+                         .order_by('-activo', 'pk')):
+            por_nombre.setdefault(producto.nombre, producto)
+
+        nuevos = []
+        # Productos nuevos del lote por nombre: una fila sin SKU (o con el
+        # mismo) se combina con ellos en lugar de crear otro producto
+        nuevos_por_nombre = {}
+        existentes = {}
+        coincidentes = set()
+        campos_modificados = set()
+        # Stock previo de cada producto existente, para registrar la diferencia
+        stock_original = {}
+
+        for datos in combinadas.values():
+            producto = por_sku.get(datos['sku']) if datos['sku'] else None
+
+            if producto is None:
+                candidato = por_nombre.get(datos['nombre'])
+                if candidato:
+                    candidato = existentes.get(candidato.pk, candidato)
+                # No reutilizar un producto que ya tiene otro SKU asignado
+                if candidato and (not datos['sku'] or candidato.sku in (None, datos['sku'])):
+                    producto = candidato
+
+            if producto is None:
+                pendiente = nuevos_por_nombre.get(datos['nombre'])
+                if pendiente and (not datos['sku'] or pendiente.sku in (None, datos['sku'])):
+                    if sumar_stock:
+                        datos = {**datos, 'cantidad_stock': pendiente.cantidad_stock + datos['cantidad_stock']}
+                    # Igual que con los existentes: un valor que falta no borra el anterior
+                    for campo, valor in datos.items():
+                        if valor is not None:
+                            setattr(pendiente, campo, valor)
+                    continue
+
+                producto = Producto(**{**datos, 'stock_minimo': datos['stock_minimo'] or 0})
+                nuevos.append(producto)
+                nuevos_por_nombre.setdefault(datos['nombre'], producto)
+                continue
+
+            producto = existentes.get(producto.pk, producto)
+            stock_original.setdefault(producto.pk, producto.cantidad_stock)
+            valores = {
+                'descripcion': producto.descripcion if datos['descripcion'] is None else datos['descripcion'],
+                'precio': datos['precio'],
+                'cantidad_stock': (producto.cantidad_stock + datos['cantidad_stock']
+                                   if sumar_stock else datos['cantidad_stock']),
+                'sku': datos['sku'] or producto.sku,
+                'stock_minimo': (producto.stock_minimo if datos['stock_minimo'] is None
+                                 else datos['stock_minimo']),
+                'activo': True,
+            }
+
+            # Solo se actualizan los productos y columnas que realmente cambian
+            for campo, valor in valores.items():
+                if getattr(producto, campo) != valor:
+                    setattr(producto, campo, valor)
+                    campos_modificados.add(campo)
+                    existentes[producto.pk] = producto
+
+            coincidentes.add(producto.pk)
+
+        Producto.objects.bulk_create(nuevos)
+        if existentes:
+            # Las filas están bloqueadas: incrementar la versión en memoria es seguro
+            for producto in existentes.values():
+                producto.version += 1
+            # Producto.todos: Producto.objects excluiría a los archivados que se restauran
+            Producto.todos.bulk_update(
+                list(existentes.values()), sorted(campos_modificados | {'version'})
+            )
+
+        # bulk_create asigna el pk de los productos nuevos (PostgreSQL y SQLite)
+        cambios = {producto.pk: producto.cantidad_stock for producto in nuevos}
+        for producto in existentes.values():
+            cambios[producto.pk] = producto.cantidad_stock - stock_original[producto.pk]
+        registrar_movimientos(cambios, 'importacion', usuario, referencia)
+
+        # bulk_create/bulk_update no emiten señales
+        if nuevos or existentes:
+            invalidar_catalogo(list(cambios))
+
+    return len(nuevos), len(coincidentes)
+
+
+# ==================== IMPORTACIÓN COMPLETA ====================
+
+def importar_archivo(archivo, nombre_archivo, sumar_stock=False,
+                     tamano_lote=TAMANO_LOTE, codificacion='utf-8-sig', usuario=None):
+    """
+    Importa productos desde un archivo CSV o XLSX.
+
+    Las filas inválidas se reportan y se omiten; las válidas se guardan
+    por lotes de 'tamano_lote' filas. La memoria utilizada depende del
+    tamaño del lote, no del tamaño del archivo.
+
+    Si un CSV tiene texto con otra codificación a mitad del archivo, los
+    lotes anteriores ya están guardados: se guardan también las filas
+    leídas hasta ese punto, el corte se reporta como error de fila y el
+    resultado queda marcado como interrumpido.
+
+    Args:
+        archivo: Archivo binario abierto (o UploadedFile de Django)
+        nombre_archivo (str): Nombre del archivo (define el formato)
+        sumar_stock (bool): Sumar cantidades al stock existente en lugar de reemplazarlo
+        tamano_lote (int): Filas válidas por transacción
+        codificacion (str): Codificación para archivos CSV
+        usuario (Usuario): Usuario que importa (opcional, para la bitácora)
+
+    Returns:
+        ResultadoImportacion: Resumen con creados, actualizados y errores
+
+    Raises:
+        ValueError: Si el formato del archivo, su encabezado o su codificación
+            (antes de la primera fila de datos) no son válidos
+    """
+    resultado = ResultadoImportacion()
+    lote = []
+    referencia = f'Importación {nombre_archivo}'
+    ultima_fila = 1
+
+    try:
+        for numero, datos in leer_filas(archivo, nombre_archivo, codificacion):
+            resultado.filas += 1
+            ultima_fila = numero
+
+            limpios, error = validar_fila(datos)
+            if error:
+                resultado.agregar_error(numero, error)
+                continue
+
+            lote.append(limpios)
+
+            if len(lote) >= tamano_lote:
+                creados, actualizados = guardar_lote(lote, sumar_stock, usuario, referencia)
+                resultado.creados += creados
+                resultado.actualizados += actualizados
+                lote = []
+    except UnicodeDecodeError:
+        if not resultado.filas:
+            raise ValueError(f'El archivo no está codificado en {codificacion}.')
+        # Los lotes anteriores ya se guardaron: reportar dónde se cortó la lectura
+        resultado.interrumpido = True
+        resultado.agregar_error(
+            ultima_fila + 1,
+            f'El archivo no es texto {codificacion} válido a partir de esta fila; '
+            'las filas siguientes no se importaron.'
+        )
+
+    if lote:
+        creados, actualizados = guardar_lote(lote, sumar_stock, usuario, referencia)
+        resultado.creados += creados
+        resultado.actualizados += actualizados
+
+    return resultado
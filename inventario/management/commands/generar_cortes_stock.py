@@ -0,0 +1,72 @@
+"""
+Comando de administración: generar_cortes_stock
+
+Genera los cortes periódicos de stock por producto a partir de la bitácora
+de movimientos. Pensado para ejecutarse periódicamente (ej. cron diario).
+
+USO:
+    python manage.py generar_cortes_stock
+    python manage.py generar_cortes_stock --fecha 2025-01-31T23:59:59
+    python manage.py generar_cortes_stock --consultar 15 --fecha 2025-01-31
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from inventario.movimientos import generar_cortes, stock_en_fecha
+
+
+class Command(BaseCommand):
+    """
+    Genera cortes de stock o consulta el stock de un producto en una fecha.
+    """
+
+    help = 'Genera cortes de stock por producto desde la bitácora de movimientos.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fecha',
+            help='Momento del corte o de la consulta, AAAA-MM-DD[THH:MM:SS] en hora local '
+                 '(default: ahora menos el margen de corte)',
+        )
+        parser.add_argument(
+            '--consultar',
+            type=int,
+            metavar='PRODUCTO_ID',
+            help='En lugar de generar cortes, muestra el stock del producto en la fecha',
+        )
+
+    def handle(self, *args, **options):
+        fecha = self.leer_fecha(options['fecha'])
+
+        if options['consultar']:
+            cantidad = stock_en_fecha(options['consultar'], fecha or timezone.now())
+            self.stdout.write(f'Stock del producto {options["consultar"]}: {cantidad}')
+            return
+
+        creados = generar_cortes(fecha)
+        self.stdout.write(self.style.SUCCESS(f'Cortes creados: {creados}.'))
+
+    def leer_fecha(self, valor):
+        """
+        Convierte el argumento --fecha en un datetime con zona horaria.
+        Una fecha sin hora se interpreta como el final de ese día.
+        """
+        if not valor:
+            return None
+
+        try:
+            fecha = parse_datetime(valor)
+            if fecha is None:
+                dia = parse_date(valor)
+                fecha = parse_datetime(f'{dia.isoformat()}T23:59:59.999999') if dia else None
+        except ValueError:
+            fecha = None
+
+        if fecha is None:
+            raise CommandError(f'Fecha inválida: {valor}. Usa el formato AAAA-MM-DD[THH:MM:SS].')
+
+        if timezone.is_naive(fecha):
+            fecha = timezone.make_aware(fecha)
+        return fecha
@@ -0,0 +1,70 @@
+"""
+Comando de administración: importar_productos
+
+Importa productos masivamente desde un archivo CSV o XLSX de proveedor.
+
+USO:
+    python manage.py importar_productos proveedor.xlsx
+    python manage.py importar_productos lista.csv --sumar-stock --lote 2000
+    python manage.py importar_productos lista.csv --codificacion latin-1
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario.importacion import TAMANO_LOTE, importar_archivo
+
+
+class Command(BaseCommand):
+    """
+    Importa productos desde un archivo y muestra el resumen con errores por fila.
+    """
+
+    help = 'Importa productos desde un archivo CSV o XLSX (upsert por SKU o nombre).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Ruta del archivo .csv o .xlsx')
+        parser.add_argument(
+            '--sumar-stock',
+            action='store_true',
+            help='Suma las cantidades al stock actual en lugar de reemplazarlo',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=TAMANO_LOTE,
+            help=f'Filas guardadas por transacción (default: {TAMANO_LOTE})',
+        )
+        parser.add_argument(
+            '--codificacion',
+            default='utf-8-sig',
+            help='Codificación del archivo CSV (default: utf-8-sig)',
+        )
+
+    def handle(self, *args, **options):
+        ruta = options['archivo']
+
+        try:
+            with open(ruta, 'rb') as archivo:
+                resultado = importar_archivo(
+                    archivo,
+                    ruta,
+                    sumar_stock=options['sumar_stock'],
+                    tamano_lote=options['lote'],
+                    codificacion=options['codificacion'],
+                )
+        except OSError as e:
+            raise CommandError(f'No se pudo abrir el archivo: {e}')
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for fila, mensaje in resultado.errores:
+            self.stderr.write(f'Fila {fila}: {mensaje}')
+        if resultado.errores_omitidos:
+            self.stderr.write(f'... y {resultado.errores_omitidos} errores más.')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Filas leídas: {resultado.filas}. '
+            f'Creados: {resultado.creados}. '
+            f'Actualizados: {resultado.actualizados}. '
+            f'Con errores: {resultado.total_errores}.'
+        ))
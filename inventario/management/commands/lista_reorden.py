@@ -0,0 +1,53 @@
+"""
+Comando de administración: lista_reorden
+
+Genera la lista de reorden: productos con stock por debajo de su stock
+mínimo y la cantidad que falta para alcanzarlo. Solo lee el índice parcial
+de stock bajo, por lo que puede programarse con frecuencia (ej. cron diario).
+
+USO:
+    python manage.py lista_reorden
+    python manage.py lista_reorden --formato xlsx --salida reorden.xlsx
+"""
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario.exportacion import FORMATOS, escribir_exportacion
+from inventario.reorden import exportar_reorden
+
+
+class Command(BaseCommand):
+    """
+    Exporta los productos con stock bajo a CSV (salida estándar) o a un archivo.
+    """
+
+    help = 'Genera la lista de reorden de productos con stock bajo.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--formato', choices=sorted(FORMATOS), default='csv')
+        parser.add_argument(
+            '--salida',
+            default='-',
+            help='Archivo de salida (default: "-" para la salida estándar)',
+        )
+
+    def handle(self, *args, **options):
+        formato = options['formato']
+        salida = options['salida']
+        encabezados, filas = exportar_reorden()
+
+        if salida == '-':
+            if formato == 'xlsx':
+                raise CommandError('El formato xlsx requiere --salida con un nombre de archivo.')
+            escribir_exportacion(sys.stdout.buffer, encabezados, filas, formato, titulo='reorden')
+            return
+
+        try:
+            with open(salida, 'wb') as archivo:
+                escribir_exportacion(archivo, encabezados, filas, formato, titulo='reorden')
+        except OSError as e:
+            raise CommandError(f'No se pudo escribir el archivo: {e}')
+
+        self.stdout.write(self.style.SUCCESS(f'Lista de reorden guardada en {salida}'))
@@ -0,0 +1,78 @@
+"""
+MIGRACIÓN: 0003_indices_busqueda_producto.py
+
+PROPÓSITO:
+    Agrega los índices que respaldan la búsqueda de productos
+    (inventario/busqueda.py) compartida por el inventario, el punto de venta
+    y las cotizaciones.
+
+CAMBIOS (solo en PostgreSQL):
+    1. Habilita la extensión pg_trgm
+    2. Índice GIN de trigramas sobre UPPER(nombre): acelera nombre__icontains
+    3. Índice GIN de trigramas sobre UPPER(descripcion): acelera descripcion__icontains
+    4. Índice GIN de texto completo (tsvector 'spanish') sobre nombre + descripción
+
+NOTA:
+    En SQLite u otros motores la migración no realiza cambios; la búsqueda
+    utiliza el filtro icontains como alternativa (fallback).
+    Los índices se crean con el schema_editor de Django para que la expresión
+    indexada sea idéntica a la que generan las consultas del ORM.
+"""
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models.functions import Upper
+
+
+def indices_busqueda():
+    """
+    Define los índices de búsqueda del modelo Producto.
+    """
+    return [
+        GinIndex(OpClass(Upper('nombre'), name='gin_trgm_ops'), name='producto_nombre_trgm'),
+        GinIndex(OpClass(Upper('descripcion'), name='gin_trgm_ops'), name='producto_descripcion_trgm'),
+        GinIndex(SearchVector('nombre', 'descripcion', config='spanish'), name='producto_busqueda_fts'),
+    ]
+
+
+def crear_indices(apps, schema_editor):
+    """
+    Crea la extensión pg_trgm y los índices de búsqueda (solo PostgreSQL).
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    Producto = apps.get_model('inventario', 'Producto')
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    for indice in indices_busqueda():
+        schema_editor.add_index(Producto, indice)
+
+
+def eliminar_indices(apps, schema_editor):
+    """
+    Elimina los índices de búsqueda (solo PostgreSQL).
+    La extensión pg_trgm se conserva por si otras tablas la utilizan.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    Producto = apps.get_model('inventario', 'Producto')
+
+    for indice in indices_busqueda():
+        schema_editor.remove_index(Producto, indice)
+
+
+class Migration(migrations.Migration):
+    """
+    Índices de búsqueda por trigramas y texto completo para Producto.
+    """
+
+    dependencies = [
+        ('inventario', '0002_remove_producto_stock_producto_cantidad_stock'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, eliminar_indices),
+    ]
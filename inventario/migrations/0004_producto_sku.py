@@ -0,0 +1,33 @@
+"""
+MIGRACIÓN: 0004_producto_sku.py
+
+PROPÓSITO:
+    Agrega el código SKU al modelo Producto para identificar productos
+    de los archivos de proveedores en la importación masiva (CSV/XLSX).
+
+CAMBIOS:
+    - Agrega el campo 'sku' (texto hasta 50 caracteres, opcional y único)
+
+IMPACTO:
+    - Los productos existentes quedan con sku NULL (no viola la unicidad)
+"""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Código SKU opcional para productos.
+    """
+
+    dependencies = [
+        ('inventario', '0003_indices_busqueda_producto'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='sku',
+            field=models.CharField(blank=True, max_length=50, null=True, unique=True, verbose_name='SKU'),
+        ),
+    ]
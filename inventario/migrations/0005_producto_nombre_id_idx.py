@@ -0,0 +1,29 @@
+"""
+MIGRACIÓN: 0005_producto_nombre_id_idx.py
+
+PROPÓSITO:
+    Agrega el índice compuesto (nombre, id) que respalda la paginación por
+    cursor (keyset) del listado de inventario.
+
+CAMBIOS:
+    - Crea el índice 'producto_nombre_id_idx' sobre Producto(nombre, id)
+"""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Índice para el listado de inventario ordenado por nombre.
+    """
+
+    dependencies = [
+        ('inventario', '0004_producto_sku'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['nombre', 'id'], name='producto_nombre_id_idx'),
+        ),
+    ]
@@ -0,0 +1,81 @@
+"""
+MIGRACIÓN: 0006_bitacora_stock.py
+
+PROPÓSITO:
+    Agrega la bitácora de movimientos de stock y los cortes periódicos por
+    producto para consultar el stock en cualquier fecha.
+
+CAMBIOS:
+    - Crea el modelo MovimientoStock con índice (producto, fecha)
+    - Crea el modelo CorteStock con restricción única (producto, fecha)
+    - Registra un corte inicial con el stock actual de cada producto, punto
+      de partida de la bitácora (no existe historial anterior a esta migración)
+"""
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def crear_cortes_iniciales(apps, schema_editor):
+    """
+    Crea un corte por producto con su stock al momento de migrar.
+    """
+    Producto = apps.get_model('inventario', 'Producto')
+    CorteStock = apps.get_model('inventario', 'CorteStock')
+    fecha = django.utils.timezone.now()
+
+    lote = []
+    for producto_id, cantidad in Producto.objects.order_by('pk').values_list('pk', 'cantidad_stock').iterator(chunk_size=1000):
+        lote.append(CorteStock(producto_id=producto_id, fecha=fecha, cantidad=cantidad))
+        if len(lote) >= 1000:
+            CorteStock.objects.bulk_create(lote)
+            lote = []
+    CorteStock.objects.bulk_create(lote)
+
+
+class Migration(migrations.Migration):
+    """
+    Bitácora de movimientos y cortes de stock.
+    """
+
+    dependencies = [
+        ('inventario', '0005_producto_nombre_id_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CorteStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateTimeField()),
+                ('cantidad', models.IntegerField()),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cortes', to='inventario.producto')),
+            ],
+            options={
+                'verbose_name': 'Corte de stock',
+                'verbose_name_plural': 'Cortes de stock',
+                'constraints': [models.UniqueConstraint(fields=('producto', 'fecha'), name='corte_producto_fecha_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='MovimientoStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cantidad', models.IntegerField()),
+                ('tipo', models.CharField(choices=[('alta', 'Alta de producto'), ('ajuste', 'Ajuste manual'), ('venta', 'Venta'), ('importacion', 'Importación'), ('servicio', 'Uso en servicio')], max_length=20)),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now)),
+                ('referencia', models.CharField(blank=True, max_length=100)),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='movimientos', to='inventario.producto')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Movimiento de stock',
+                'verbose_name_plural': 'Movimientos de stock',
+                'indexes': [models.Index(fields=['producto', 'fecha'], name='movimiento_producto_fecha_idx')],
+            },
+        ),
+        migrations.RunPython(crear_cortes_iniciales, migrations.RunPython.noop),
+    ]
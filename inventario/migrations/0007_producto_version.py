@@ -0,0 +1,30 @@
+"""
+MIGRACIÓN: 0007_producto_version.py
+
+PROPÓSITO:
+    Agrega la versión de fila a Producto para el control de concurrencia
+    optimista en la edición de productos.
+
+CAMBIOS:
+    - Agrega el campo 'version' (entero, inicia en 1) a Producto
+"""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Versión de fila de Producto.
+    """
+
+    dependencies = [
+        ('inventario', '0006_bitacora_stock'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
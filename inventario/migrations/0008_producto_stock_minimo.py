@@ -0,0 +1,36 @@
+"""
+MIGRACIÓN: 0008_producto_stock_minimo.py
+
+PROPÓSITO:
+    Agrega el punto de reorden por producto y el índice parcial que permite
+    consultar los productos con stock bajo sin recorrer todo el catálogo.
+
+CAMBIOS:
+    - Agrega el campo 'stock_minimo' (default 0) a Producto
+    - Crea el índice parcial 'producto_stock_bajo_idx' sobre (nombre, id)
+      WHERE cantidad_stock < stock_minimo
+"""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Stock mínimo e índice parcial de stock bajo.
+    """
+
+    dependencies = [
+        ('inventario', '0007_producto_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='stock_minimo',
+            field=models.PositiveIntegerField(default=0, verbose_name='Stock mínimo'),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(condition=models.Q(('cantidad_stock__lt', models.F('stock_minimo'))), fields=['nombre', 'id'], name='producto_stock_bajo_idx'),
+        ),
+    ]
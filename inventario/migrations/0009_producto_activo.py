@@ -0,0 +1,53 @@
+"""
+MIGRACIÓN: 0009_producto_activo.py
+
+PROPÓSITO:
+    Reemplaza la eliminación física de productos por una baja lógica
+    (archivado) y limita los índices del listado a productos activos.
+
+CAMBIOS:
+    - Agrega el campo 'activo' (default True) a Producto
+    - Recrea 'producto_nombre_id_idx' y 'producto_stock_bajo_idx' como índices
+      parciales sobre productos activos
+    - Crea 'producto_catalogo_idx' (nombre) para productos activos con stock
+"""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Baja lógica de productos e índices parciales de productos activos.
+    """
+
+    dependencies = [
+        ('inventario', '0008_producto_stock_minimo'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='producto',
+            name='producto_nombre_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='producto',
+            name='producto_stock_bajo_idx',
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='activo',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(condition=models.Q(('activo', True)), fields=['nombre', 'id'], name='producto_nombre_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(condition=models.Q(('activo', True), ('cantidad_stock__gt', 0)), fields=['nombre'], name='producto_catalogo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(condition=models.Q(('activo', True), ('cantidad_stock__lt', models.F('stock_minimo'))), fields=['nombre', 'id'], name='producto_stock_bajo_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+"""
+MIGRACIÓN: 0010_reserva_stock.py
+
+PROPÓSITO:
+    Permite apartar stock para documentos pendientes (cotizaciones de
+    servicio) sin descontarlo todavía de cantidad_stock.
+
+CAMBIOS:
+    - Crea el modelo ReservaStock con restricción única (origen, documento, producto)
+    - Crea el índice (producto, cantidad) para sumar lo reservado por producto
+
+NOTA:
+    Las reservas de las cotizaciones existentes se crean en
+    servicios/0006_reservar_cotizaciones_pendientes.
+"""
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Reservas de stock.
+    """
+
+    dependencies = [
+        ('inventario', '0009_producto_activo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReservaStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cantidad', models.PositiveIntegerField()),
+                ('origen', models.CharField(choices=[('servicio', 'Cotización de servicio')], max_length=20)),
+                ('documento', models.PositiveBigIntegerField()),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now)),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reservas', to='inventario.producto')),
+            ],
+            options={
+                'verbose_name': 'Reserva de stock',
+                'verbose_name_plural': 'Reservas de stock',
+                'indexes': [models.Index(fields=['producto', 'cantidad'], name='reserva_producto_cantidad_idx')],
+                'constraints': [models.UniqueConstraint(fields=('origen', 'documento', 'producto'), name='reserva_documento_producto_unico')],
+            },
+        ),
+    ]
@@ -0,0 +1,50 @@
+"""
+MIGRACIÓN: 0011_reserva_stock_expira.py
+
+PROPÓSITO:
+    Permite que el carrito del POS aparte productos por unos minutos.
+
+CAMBIOS:
+    - Agrega el campo 'expira' a ReservaStock (None = sin vencimiento)
+    - Agrega el origen 'carrito'
+    - Reemplaza el índice (producto, cantidad) por (producto, expira, cantidad)
+      para sumar solo las reservas vigentes
+    - Crea un índice parcial sobre 'expira' para el barrido de reservas vencidas
+"""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Reservas con vencimiento (carrito del POS).
+    """
+
+    dependencies = [
+        ('inventario', '0010_reserva_stock'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='reservastock',
+            name='reserva_producto_cantidad_idx',
+        ),
+        migrations.AddField(
+            model_name='reservastock',
+            name='expira',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='reservastock',
+            name='origen',
+            field=models.CharField(choices=[('servicio', 'Cotización de servicio'), ('carrito', 'Carrito del POS')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='reservastock',
+            index=models.Index(fields=['producto', 'expira', 'cantidad'], name='reserva_producto_expira_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservastock',
+            index=models.Index(condition=models.Q(('expira__isnull', False)), fields=['expira'], name='reserva_expira_idx'),
+        ),
+    ]
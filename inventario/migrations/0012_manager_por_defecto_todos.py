@@ -0,0 +1,40 @@
+"""
+MIGRACIÓN: 0012_manager_por_defecto_todos.py
+
+PROPÓSITO:
+    Hace que el manager por defecto de Producto incluya los productos
+    archivados, para que dumpdata y los formularios del admin no los omitan.
+
+CAMBIOS:
+    - Meta.default_manager_name = 'todos'
+    - Producto.objects sigue mostrando solo los productos activos
+
+NOTA:
+    Solo cambia el estado de los modelos; no modifica la base de datos.
+"""
+
+import django.db.models.manager
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Manager por defecto con los productos archivados.
+    """
+
+    dependencies = [
+        ('inventario', '0011_reserva_stock_expira'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='producto',
+            options={'default_manager_name': 'todos'},
+        ),
+        migrations.AlterModelManagers(
+            name='producto',
+            managers=[
+                ('todos', django.db.models.manager.Manager()),
+            ],
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.3 on 2026-10-18 17:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventario', '0012_manager_por_defecto_todos'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cortestock',
+            name='producto',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='cortes', to='inventario.producto'),
+        ),
+        migrations.AlterField(
+            model_name='movimientostock',
+            name='producto',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='movimientos', to='inventario.producto'),
+        ),
+    ]
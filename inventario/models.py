@@ -1,4 +1,29 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import F, Q
+from django.utils import timezone
+
+
+# ==================== MANAGER: REGISTROS ACTIVOS ====================
+
+class ActivosManager(models.Manager):
+    """
+    Manager que oculta los registros archivados (activo=False).
+    
+    Es el manager 'objects' de Producto y Servicio: las consultas normales
+    (listados, POS, búsquedas) solo ven registros activos. El manager por
+    defecto de Django (Meta.default_manager_name = 'todos') incluye los
+    archivados, para que dumpdata, los formularios del admin y las
+    relaciones desde el historial (DetalleVenta.producto, etc.) sigan
+    resolviéndolos. Las vistas que buscan un registro activo deben usar
+    'objects' explícitamente (ej. get_object_or_404(Producto.objects, pk=pk)).
+    """
+    
+    def get_queryset(self):
+        return super().get_queryset().filter(activo=True)
+
+
+# ==================== MODELO: PRODUCTO ====================
 
 class Producto(models.Model):
     """
@@ -6,11 +31,21 @@ class Producto(models.Model):
     
     Este modelo almacena la información de los productos disponibles para venta,
     incluyendo su nombre, descripción, precio y cantidad en stock.
+    
+    Los productos no se eliminan físicamente: al eliminarlos se archivan
+    (activo=False) para conservar el historial de ventas y servicios.
+    - Producto.objects: Solo productos activos
+    - Producto.todos: Todos los productos, incluidos los archivados
+      (manager por defecto de Django: dumpdata, admin, relaciones)
     """
     
     # Nombre del producto (máximo 100 caracteres)
     nombre = models.CharField(max_length=100)
     
+    # Código SKU del proveedor (opcional, único si se especifica)
+    # Se usa como llave para actualizar productos en la importación masiva
+    sku = models.CharField(max_length=50, unique=True, null=True, blank=True, verbose_name="SKU")
+    
     # Descripción detallada del producto (campo opcional)
     descripcion = models.TextField(blank=True, null=True)
     
@@ -21,6 +56,22 @@ class Producto(models.Model):
     # Cantidad disponible en inventario (solo números positivos)
     # Por defecto inicia en 0
     cantidad_stock = models.PositiveIntegerField(verbose_name="Cantidad en stock", default=0)
+    
+    # Punto de reorden: el producto tiene stock bajo cuando cantidad_stock < stock_minimo
+    # Con 0 (default) el producto nunca se marca con stock bajo
+    stock_minimo = models.PositiveIntegerField(verbose_name="Stock mínimo", default=0)
+    
+    # Versión de la fila para control de concurrencia optimista
+    # Se incrementa en cada escritura (ediciones, ventas, importaciones);
+    # una edición solo se aplica si la versión no cambió desde que se leyó
+    version = models.PositiveIntegerField(default=1, editable=False)
+    
+    # Baja lógica: False = producto archivado (oculto en inventario, POS y cotizaciones)
+    activo = models.BooleanField(default=True)
+    
+    # Managers: 'todos' es el manager por defecto (ver Meta.default_manager_name)
+    objects = ActivosManager()
+    todos = models.Manager()
 
     def __str__(self):
         """
@@ -28,3 +79,173 @@ class Producto(models.Model):
         Retorna el nombre del producto para facilitar su identificación.
         """
         return self.nombre
+
+    class Meta:
+        # Los archivados siguen existiendo para dumpdata, el admin y el historial
+        default_manager_name = 'todos'
+        indexes = [
+            # Listado del inventario paginado por cursor (ver paginacion.py)
+            # Solo productos activos: los archivados no crecen el índice del listado
+            models.Index(fields=['nombre', 'id'], condition=Q(activo=True), name='producto_nombre_id_idx'),
+            # Catálogo del POS y cotizaciones: productos activos con stock
+            models.Index(
+                fields=['nombre'],
+                condition=Q(activo=True, cantidad_stock__gt=0),
+                name='producto_catalogo_idx',
+            ),
+            # Índice parcial: solo contiene los productos con stock bajo (ver reorden.py),
+            # por lo que contarlos o listarlos no recorre el catálogo completo
+            models.Index(
+                fields=['nombre', 'id'],
+                condition=Q(activo=True, cantidad_stock__lt=F('stock_minimo')),
+                name='producto_stock_bajo_idx',
+            ),
+        ]
+
+
+# ==================== MODELO: MOVIMIENTO DE STOCK ====================
+
+class MovimientoStock(models.Model):
+    """
+    Registro (solo de inserción) de cada cambio en el stock de un producto.
+
+    Cada operación que modifica Producto.cantidad_stock (ventas, ajustes
+    manuales, importaciones, uso en servicios) inserta aquí un movimiento
+    con la diferencia aplicada. Los movimientos nunca se editan ni se borran,
+    por lo que permiten auditar mermas y reconstruir el stock en cualquier fecha.
+
+    CAMPOS:
+    - producto: Producto afectado
+    - cantidad: Diferencia aplicada al stock (negativa para salidas)
+    - tipo: Origen del movimiento (ver TIPO_CHOICES)
+    - fecha: Momento del movimiento
+    - usuario: Usuario que lo originó (opcional)
+    - referencia: Texto libre que identifica el documento (ej. "Venta #12")
+
+    Ver inventario/movimientos.py para registrar movimientos y consultar
+    el stock histórico.
+    """
+
+    # Orígenes posibles de un movimiento de stock
+    TIPO_CHOICES = [
+        ('alta', 'Alta de producto'),
+        ('ajuste', 'Ajuste manual'),
+        ('venta', 'Venta'),
+        ('importacion', 'Importación'),
+        ('servicio', 'Uso en servicio'),
+    ]
+
+    # PROTECT: la bitácora es historial; un producto con movimientos solo se archiva
+    producto = models.ForeignKey(Producto, on_delete=models.PROTECT, related_name='movimientos')
+    cantidad = models.IntegerField()
+    tipo = models.CharField(max_length=20, choices=TIPO_CHOICES)
+    fecha = models.DateTimeField(default=timezone.now)
+    usuario = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    referencia = models.CharField(max_length=100, blank=True)
+
+    def __str__(self):
+        return f"{self.producto_id}: {self.cantidad:+d} ({self.get_tipo_display()})"
+
+    class Meta:
+        verbose_name = "Movimiento de stock"
+        verbose_name_plural = "Movimientos de stock"
+        indexes = [
+            # Cola de movimientos de un producto posterior a su último corte
+            models.Index(fields=['producto', 'fecha'], name='movimiento_producto_fecha_idx'),
+        ]
+
+
+# ==================== MODELO: CORTE DE STOCK ====================
+
+class CorteStock(models.Model):
+    """
+    Fotografía periódica del stock de un producto en un momento dado.
+
+    El stock en una fecha X se obtiene con el último corte anterior a X más
+    los movimientos entre ese corte y X, de modo que la consulta lee un solo
+    corte y una cola corta de movimientos sin importar cuánta historia exista.
+
+    Los cortes se generan con el comando 'generar_cortes_stock' (ver
+    movimientos.generar_cortes).
+    """
+
+    # PROTECT: igual que la bitácora, los cortes son historial
+    producto = models.ForeignKey(Producto, on_delete=models.PROTECT, related_name='cortes')
+    fecha = models.DateTimeField()
+    cantidad = models.IntegerField()
+
+    def __str__(self):
+        return f"{self.producto_id} @ {self.fecha:%Y-%m-%d %H:%M}: {self.cantidad}"
+
+    class Meta:
+        verbose_name = "Corte de stock"
+        verbose_name_plural = "Cortes de stock"
+        constraints = [
+            # Un solo corte por producto y fecha; el índice resuelve "último corte <= X"
+            models.UniqueConstraint(fields=['producto', 'fecha'], name='corte_producto_fecha_unico'),
+        ]
+
+
+# ==================== MODELO: RESERVA DE STOCK ====================
+
+class ReservaStock(models.Model):
+    """
+    Unidades de un producto apartadas para un documento pendiente.
+
+    Una cotización de servicio aparta las refacciones que va a utilizar:
+    siguen contando en cantidad_stock hasta que el servicio se paga, pero
+    ya no se pueden vender en el POS ni cotizar en otro servicio.
+
+    El carrito de cada cajero aparta sus productos por unos minutos
+    (expira): otro cajero no puede vender esas unidades mientras tanto.
+
+        disponible = cantidad_stock - suma de las reservas vigentes del producto
+
+    CAMPOS:
+    - producto: Producto apartado
+    - cantidad: Unidades apartadas
+    - origen: Tipo de documento que aparta (ver ORIGEN_CHOICES)
+    - documento: ID del documento (ej. ServicioPagado.id o el usuario del carrito)
+    - fecha: Momento de la reserva
+    - expira: Vencimiento de la reserva (None = hasta que el documento se concrete)
+
+    Ver inventario/reservas.py para reservar, liberar, consumir y consultar
+    el stock disponible.
+    """
+
+    # Tipos de documento que pueden apartar stock
+    ORIGEN_CHOICES = [
+        ('servicio', 'Cotización de servicio'),
+        ('carrito', 'Carrito del POS'),
+    ]
+
+    producto = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='reservas')
+    cantidad = models.PositiveIntegerField()
+    origen = models.CharField(max_length=20, choices=ORIGEN_CHOICES)
+    documento = models.PositiveBigIntegerField()
+    fecha = models.DateTimeField(default=timezone.now)
+    expira = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.producto_id}: {self.cantidad} ({self.get_origen_display()} #{self.documento})"
+
+    class Meta:
+        verbose_name = "Reserva de stock"
+        verbose_name_plural = "Reservas de stock"
+        constraints = [
+            # Una reserva por producto y documento; el índice también resuelve
+            # "reservas de estos documentos" al liberarlas o consumirlas
+            models.UniqueConstraint(
+                fields=['origen', 'documento', 'producto'], name='reserva_documento_producto_unico'
+            ),
+        ]
+        indexes = [
+            # Total reservado vigente por producto: la suma se lee solo del índice
+            models.Index(fields=['producto', 'expira', 'cantidad'], name='reserva_producto_expira_idx'),
+            # Barrido de reservas vencidas (solo las que expiran)
+            models.Index(
+                fields=['expira'],
+                name='reserva_expira_idx',
+                condition=Q(expira__isnull=False),
+            ),
+        ]
@@ -0,0 +1,192 @@
+"""
+Bitácora de movimientos de stock y consultas de stock histórico.
+
+Todas las rutas que modifican Producto.cantidad_stock registran aquí la
+diferencia aplicada (MovimientoStock). Periódicamente se generan cortes
+por producto (CorteStock) para que consultar el stock en una fecha solo
+lea un corte y los pocos movimientos posteriores.
+
+ESTRATEGIA:
+- Los movimientos se insertan con bulk_create (una consulta por operación)
+  dentro de la misma transacción que modifica el stock
+- Un corte se calcula a partir del corte anterior y los movimientos
+  intermedios, nunca desde cantidad_stock, por lo que la bitácora y los
+  cortes siempre son consistentes entre sí
+- Los cortes se generan para una fecha ligeramente en el pasado (ver
+  MARGEN_CORTE) para no omitir movimientos de transacciones aún abiertas
+
+USO:
+    registrar_movimientos({producto.pk: -2}, 'venta', usuario, 'Venta #12')
+    stock = stock_en_fecha(producto.pk, fecha)
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db.models import IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import CorteStock, MovimientoStock, Producto
+
+# Filas insertadas por consulta al generar cortes
+TAMANO_LOTE_CORTES = 1000
+
+# Los cortes se toman hasta este margen antes del momento actual
+MARGEN_CORTE = timedelta(minutes=5)
+
+# Fecha usada como "corte vacío" para productos sin cortes previos
+INICIO_BITACORA = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+# ==================== REGISTRO DE MOVIMIENTOS ====================
+
+def registrar_movimientos(cambios, tipo, usuario=None, referencia=''):
+    """
+    Inserta los movimientos de stock de una operación en una sola consulta.
+
+    Debe llamarse dentro de la misma transacción que modifica el stock.
+
+    Args:
+        cambios (dict): Diferencia aplicada por ID de producto {producto_id: diferencia}
+        tipo (str): Origen del movimiento (ver MovimientoStock.TIPO_CHOICES)
+        usuario (Usuario): Usuario que originó el cambio (se ignora si es anónimo)
+        referencia (str): Documento relacionado (ej. "Venta #12")
+
+    Returns:
+        list: Movimientos creados (se omiten las diferencias en cero)
+    """
+    return registrar_movimientos_documentos({referencia: cambios}, tipo, usuario)
+
+
+def registrar_movimientos_documentos(cambios_por_documento, tipo, usuario=None):
+    """
+    Inserta en una sola consulta los movimientos de varios documentos.
+
+    Se usa cuando una operación afecta varios documentos a la vez (ej. el
+    cobro por lote de servicios), para que cada movimiento conserve la
+    referencia de su propio documento.
+
+    Args:
+        cambios_por_documento (dict): {referencia: {producto_id: diferencia}}
+        tipo (str): Origen del movimiento (ver MovimientoStock.TIPO_CHOICES)
+        usuario (Usuario): Usuario que originó el cambio (se ignora si es anónimo)
+
+    Returns:
+        list: Movimientos creados (se omiten las diferencias en cero)
+    """
+    if usuario is not None and not usuario.is_authenticated:
+        usuario = None
+
+    fecha = timezone.now()
+    movimientos = [
+        MovimientoStock(
+            producto_id=producto_id,
+            cantidad=diferencia,
+            tipo=tipo,
+            fecha=fecha,
+            usuario=usuario,
+            referencia=referencia[:100],
+        )
+        for referencia, cambios in cambios_por_documento.items()
+        for producto_id, diferencia in cambios.items()
+        if diferencia
+    ]
+
+    return MovimientoStock.objects.bulk_create(movimientos)
+
+
+# ==================== STOCK HISTÓRICO ====================
+
+def stock_en_fecha(producto_id, fecha):
+    """
+    Calcula el stock que tenía un producto en una fecha dada.
+
+    Lee el último corte anterior o igual a la fecha (índice único
+    producto+fecha) y suma los movimientos entre ese corte y la fecha
+    (índice producto+fecha de la bitácora).
+
+    Args:
+        producto_id (int): ID del producto
+        fecha (datetime): Momento a consultar (con zona horaria)
+
+    Returns:
+        int: Stock del producto en esa fecha
+    """
+    corte = (
+        CorteStock.objects.filter(producto_id=producto_id, fecha__lte=fecha)
+        .order_by('-fecha')
+        .values('fecha', 'cantidad')
+        .first()
+    )
+
+    movimientos = MovimientoStock.objects.filter(producto_id=producto_id, fecha__lte=fecha)
+    base = 0
+    if corte:
+        base = corte['cantidad']
+        movimientos = movimientos.filter(fecha__gt=corte['fecha'])
+
+    return base + (movimientos.aggregate(total=Sum('cantidad'))['total'] or 0)
+
+
+# ==================== CORTES PERIÓDICOS ====================
+
+def generar_cortes(fecha=None):
+    """
+    Genera un corte de stock por producto con movimientos desde su último corte.
+
+    El cálculo es por conjuntos: una sola consulta obtiene, para cada
+    producto, su último corte y la suma de los movimientos posteriores
+    hasta 'fecha'; los cortes nuevos se insertan por lotes. Los productos
+    sin movimientos desde su último corte no generan un corte nuevo.
+
+    Args:
+        fecha (datetime): Momento del corte (por defecto, ahora menos MARGEN_CORTE)
+
+    Returns:
+        int: Número de cortes creados
+    """
+    if fecha is None:
+        fecha = timezone.now() - MARGEN_CORTE
+
+    ultimo_corte = CorteStock.objects.filter(
+        producto=OuterRef('pk'), fecha__lte=fecha
+    ).order_by('-fecha')
+
+    movimientos = (
+        MovimientoStock.objects.filter(
+            producto=OuterRef('pk'),
+            fecha__gt=OuterRef('corte_fecha'),
+            fecha__lte=fecha,
+        )
+        .order_by()
+        .values('producto')
+        .annotate(total=Sum('cantidad'))
+        .values('total')
+    )
+
+    pendientes = (
+        Producto.todos.annotate(
+            corte_fecha=Coalesce(Subquery(ultimo_corte.values('fecha')[:1]), Value(INICIO_BITACORA)),
+            corte_cantidad=Coalesce(Subquery(ultimo_corte.values('cantidad')[:1]), Value(0)),
+        )
+        .annotate(movido=Subquery(movimientos, output_field=IntegerField()))
+        # Solo productos con movimientos posteriores a su último corte
+        .filter(~Q(movido=0), movido__isnull=False, corte_fecha__lt=fecha)
+        .order_by('pk')
+        .values_list('pk', 'corte_cantidad', 'movido')
+    )
+
+    creados = 0
+    lote = []
+    for producto_id, corte_cantidad, movido in pendientes.iterator(chunk_size=TAMANO_LOTE_CORTES):
+        lote.append(CorteStock(producto_id=producto_id, fecha=fecha, cantidad=corte_cantidad + movido))
+        if len(lote) >= TAMANO_LOTE_CORTES:
+            CorteStock.objects.bulk_create(lote)
+            creados += len(lote)
+            lote = []
+
+    if lote:
+        CorteStock.objects.bulk_create(lote)
+        creados += len(lote)
+
+    return creados
@@ -0,0 +1,86 @@
+"""
+Paginación por cursor (keyset) del listado de productos.
+
+En lugar de OFFSET, cada página continúa a partir del último producto
+mostrado usando la llave ordenada (nombre, id). Con el índice compuesto
+producto_nombre_id_idx, cada página cuesta lo mismo sin importar cuántos
+productos existan ni qué tan avanzada esté la página.
+
+EL CURSOR:
+- Es un texto opaco (base64 de [nombre, id]) que el cliente envía de
+  regreso en el parámetro 'despues' para pedir la siguiente página
+
+USO:
+    productos, siguiente = paginar_productos(queryset, request.GET.get('despues'))
+"""
+
+import base64
+import binascii
+import json
+
+from django.db.models import Q
+
+# Número de productos por página del inventario
+TAMANO_PAGINA = 50
+
+
+# ==================== CURSORES ====================
+
+def codificar_cursor(producto):
+    """
+    Genera el cursor que apunta al producto indicado (último de una página).
+    """
+    datos = json.dumps([producto.nombre, producto.pk], ensure_ascii=False)
+    return base64.urlsafe_b64encode(datos.encode('utf-8')).decode('ascii')
+
+
+def decodificar_cursor(cursor):
+    """
+    Obtiene (nombre, id) a partir de un cursor.
+
+    Returns:
+        tuple: (nombre, id) o None si el cursor está vacío o es inválido
+    """
+    if not cursor:
+        return None
+
+    try:
+        nombre, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return str(nombre), int(pk)
+    except (binascii.Error, UnicodeError, ValueError, TypeError):
+        return None
+
+
+# ==================== PAGINACIÓN ====================
+
+def paginar_productos(queryset, cursor=None, tamano=TAMANO_PAGINA):
+    """
+    Obtiene una página de productos ordenada por (nombre, id).
+
+    Args:
+        queryset (QuerySet): Productos a paginar (puede venir filtrado por búsqueda)
+        cursor (str): Cursor de la página anterior (None para la primera página)
+        tamano (int): Productos por página
+
+    Returns:
+        tuple: (lista de productos, cursor de la siguiente página o None)
+    """
+    queryset = queryset.order_by('nombre', 'pk')
+
+    posicion = decodificar_cursor(cursor)
+    if posicion:
+        nombre, pk = posicion
+        # nombre >= X delimita el rango del índice; el resto desempata por id
+        queryset = queryset.filter(
+            Q(nombre__gte=nombre) & (Q(nombre__gt=nombre) | Q(pk__gt=pk))
+        )
+
+    # Se pide un producto extra para saber si existe una página siguiente
+    productos = list(queryset[:tamano + 1])
+
+    siguiente = None
+    if len(productos) > tamano:
+        productos = productos[:tamano]
+        siguiente = codificar_cursor(productos[-1])
+
+    return productos, siguiente
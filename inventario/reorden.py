@@ -0,0 +1,62 @@
+"""
+Alertas de stock bajo y lista de reorden.
+
+Un producto tiene stock bajo cuando cantidad_stock < stock_minimo. El
+índice parcial producto_stock_bajo_idx solo contiene esas filas, por lo
+que contar o listar los productos con stock bajo lee únicamente el índice
+(unas cuantas filas) sin importar el tamaño del catálogo.
+
+IMPORTANTE: Las consultas deben usar exactamente la condición del índice
+(CONDICION_STOCK_BAJO) para que la base de datos pueda utilizarlo.
+
+USO:
+    total = contar_stock_bajo()
+    encabezados, filas = exportar_reorden()
+"""
+
+from django.db.models import F, Q
+
+from .exportacion import TAMANO_BLOQUE
+from .models import Producto
+
+# Misma condición que el índice parcial producto_stock_bajo_idx
+# (activo=True también lo aplica Producto.objects)
+CONDICION_STOCK_BAJO = Q(activo=True, cantidad_stock__lt=F('stock_minimo'))
+
+
+def productos_stock_bajo():
+    """
+    Productos con stock por debajo de su stock mínimo, ordenados por nombre.
+
+    Returns:
+        QuerySet: Productos anotados con 'faltante' (stock_minimo - cantidad_stock)
+    """
+    return (
+        Producto.objects.filter(CONDICION_STOCK_BAJO)
+        .annotate(faltante=F('stock_minimo') - F('cantidad_stock'))
+        .order_by('nombre', 'pk')
+    )
+
+
+def contar_stock_bajo():
+    """
+    Número de productos con stock bajo (lee solo el índice parcial).
+    Utilizado por el indicador del dashboard.
+    """
+    return Producto.objects.filter(CONDICION_STOCK_BAJO).count()
+
+
+def exportar_reorden():
+    """
+    Define la lista de reorden: productos con stock bajo y la cantidad que falta.
+
+    Returns:
+        tuple: (encabezados, iterador de filas)
+    """
+    encabezados = ['id', 'sku', 'nombre', 'cantidad_stock', 'stock_minimo', 'faltante', 'precio']
+
+    filas = productos_stock_bajo().values_list(
+        'id', 'sku', 'nombre', 'cantidad_stock', 'stock_minimo', 'faltante', 'precio'
+    ).iterator(chunk_size=TAMANO_BLOQUE)
+
+    return encabezados, filas
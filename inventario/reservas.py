@@ -0,0 +1,263 @@
+"""
+Reservas de stock y cálculo del stock disponible.
+
+Las cotizaciones de servicio apartan las refacciones que van a utilizar y
+el carrito de cada cajero aparta sus productos por unos minutos
+(ReservaStock). El POS y las cotizaciones trabajan con el disponible:
+
+    disponible = cantidad_stock - suma de las reservas vigentes del producto
+
+El stock físico (cantidad_stock) solo se descuenta cuando el documento se
+concreta (ej. el pago del servicio o el cobro del carrito); en ese momento
+sus reservas se borran. Las reservas vencidas dejan de contar de inmediato
+y se borran por lotes (liberar_vencidas).
+
+ESTRATEGIA:
+- Quien reserva o vende bloquea primero las filas de los productos
+  (SELECT ... FOR UPDATE, en orden de pk): una reserva y una venta de los
+  mismos productos nunca validan a la vez contra el mismo disponible
+- El total reservado de varios productos se obtiene en una sola consulta
+  agregada, apoyada en el índice (producto, expira, cantidad)
+- Las reservas de un documento se insertan con un solo bulk_create y se
+  liberan con un solo DELETE
+- El stock de todos los productos se descuenta con un único UPDATE
+  condicional (cantidad_stock >= cantidad), igual que en el POS
+- Cada cambio invalida la fotografía del catálogo, que muestra el disponible
+
+USO:
+    disponibles = validar_disponible(productos_bloqueados, {producto_id: cantidad})
+    disponibles = validar_disponible(productos_bloqueados, cantidades, excluir=('carrito', usuario.pk))
+    crear_reservas({producto_id: cantidad}, 'servicio', servicio_pagado.pk)
+    liberar_reservas('servicio', [servicio_pagado.pk])
+    productos = anotar_disponible(Producto.objects.all())
+    liberar_vencidas()    # Programar cada minuto (python manage.py liberar_apartados)
+"""
+
+from django.db.models import Case, ExpressionWrapper, F, IntegerField, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Now
+from django.utils import timezone
+
+from .catalogo import invalidar_catalogo
+from .models import Producto, ReservaStock
+
+
+# ==================== EXCEPCIONES ====================
+
+class StockInsuficienteError(ValueError):
+    """
+    Error lanzado cuando un producto no tiene stock disponible suficiente.
+
+    Hereda de ValueError para que las vistas existentes lo traten como
+    un error de validación (mensaje al usuario, sin error 500).
+    """
+
+
+# Reservas vencidas que se borran por consulta al liberarlas
+TAMANO_LOTE_VENCIDAS = 1000
+
+
+# ==================== STOCK DISPONIBLE ====================
+
+def reservas_vigentes():
+    """
+    Reservas que cuentan contra el disponible: sin vencimiento o aún no vencidas.
+    """
+    return ReservaStock.objects.filter(Q(expira__isnull=True) | Q(expira__gt=Now()))
+
+
+def reservado_por_producto(producto_ids, excluir=None):
+    """
+    Total reservado vigente de cada producto indicado (una sola consulta).
+
+    Args:
+        producto_ids (list): IDs de los productos
+        excluir (tuple): (origen, documento) cuyas reservas no se cuentan
+            (ej. el carrito que se está cobrando)
+
+    Returns:
+        dict: {producto_id: unidades reservadas} (sin los productos sin reservas)
+    """
+    reservas = reservas_vigentes().filter(producto_id__in=producto_ids)
+    if excluir is not None:
+        reservas = reservas.exclude(origen=excluir[0], documento=excluir[1])
+
+    return dict(
+        reservas
+        .order_by()
+        .values('producto_id')
+        .annotate(total=Sum('cantidad'))
+        .values_list('producto_id', 'total')
+    )
+
+
+def anotar_disponible(queryset):
+    """
+    Agrega 'reservado' y 'disponible' a un QuerySet de productos.
+
+    Ejemplo:
+        anotar_disponible(Producto.objects.all()).filter(disponible__gt=0)
+    """
+    reservado = (
+        reservas_vigentes().filter(producto=OuterRef('pk'))
+        .order_by()
+        .values('producto')
+        .annotate(total=Sum('cantidad'))
+        .values('total')
+    )
+    return queryset.annotate(
+        reservado=Coalesce(Subquery(reservado, output_field=IntegerField()), Value(0)),
+        disponible=ExpressionWrapper(F('cantidad_stock') - F('reservado'), output_field=IntegerField()),
+    )
+
+
+def validar_disponible(productos, cantidades, excluir=None):
+    """
+    Verifica que cada producto tenga disponible suficiente para la cantidad pedida.
+
+    Las filas de los productos deben estar bloqueadas (select_for_update)
+    por la transacción actual, para que el disponible no cambie antes de
+    descontarlo o reservarlo.
+
+    Args:
+        productos (list): Productos bloqueados
+        cantidades (dict): Cantidad pedida por ID de producto
+        excluir (tuple): (origen, documento) cuyas reservas no se cuentan: las
+            unidades que el propio documento ya apartó están validadas
+
+    Returns:
+        dict: Disponible de cada producto antes de la operación {producto_id: disponible}
+
+    Raises:
+        StockInsuficienteError: Si algún producto no tiene disponible suficiente
+    """
+    reservado = reservado_por_producto(list(cantidades), excluir)
+    disponibles = {}
+
+    for producto in productos:
+        disponible = producto.cantidad_stock - reservado.get(producto.pk, 0)
+        if disponible < cantidades[producto.pk]:
+            raise StockInsuficienteError(
+                f'Stock insuficiente para {producto.nombre}. '
+                f'Disponible: {max(disponible, 0)}'
+            )
+        disponibles[producto.pk] = disponible
+
+    return disponibles
+
+
+# ==================== DESCUENTO DE STOCK ====================
+
+def descontar_stock(cantidades):
+    """
+    Descuenta el stock de varios productos con un solo UPDATE condicional.
+
+    Debe llamarse dentro de una transacción; si algún producto no tiene
+    stock suficiente no se descuenta ninguno (la transacción debe revertirse).
+
+    Args:
+        cantidades (dict): Cantidad a descontar por ID de producto
+
+    Raises:
+        StockInsuficienteError: Si el UPDATE no alcanzó a todos los productos
+    """
+    # Cantidad por producto como expresión CASE para un solo UPDATE
+    cantidad = Case(
+        *[When(pk=pk, then=Value(valor)) for pk, valor in cantidades.items()],
+        output_field=IntegerField(),
+    )
+
+    # El filtro cantidad_stock >= cantidad garantiza que nunca se descuente
+    # más stock del que existe, aun sin bloqueo de filas
+    # (Producto.todos: un producto archivado también se descuenta)
+    actualizados = Producto.todos.filter(
+        pk__in=cantidades,
+        cantidad_stock__gte=cantidad,
+    ).update(
+        cantidad_stock=F('cantidad_stock') - cantidad,
+        # Invalida las ediciones abiertas sobre estos productos (ver concurrencia.py)
+        version=F('version') + 1,
+    )
+
+    if actualizados != len(cantidades):
+        raise StockInsuficienteError(
+            'Stock insuficiente: el inventario cambió durante la operación.'
+        )
+
+    # El UPDATE masivo no emite señales: actualizar la fotografía del catálogo
+    invalidar_catalogo(list(cantidades))
+
+
+# ==================== RESERVAS ====================
+
+def crear_reservas(cantidades, origen, documento):
+    """
+    Aparta las cantidades indicadas para un documento (un solo INSERT).
+
+    Debe llamarse en la misma transacción que validó el disponible.
+
+    Args:
+        cantidades (dict): Cantidad a apartar por ID de producto
+        origen (str): Tipo de documento (ver ReservaStock.ORIGEN_CHOICES)
+        documento (int): ID del documento
+    """
+    if not cantidades:
+        return
+
+    ReservaStock.objects.bulk_create([
+        ReservaStock(producto_id=producto_id, cantidad=cantidad, origen=origen, documento=documento)
+        for producto_id, cantidad in cantidades.items()
+    ])
+    invalidar_catalogo(list(cantidades))
+
+
+def liberar_reservas(origen, documentos):
+    """
+    Borra las reservas de uno o varios documentos (un solo DELETE).
+
+    Returns:
+        int: Número de reservas borradas
+    """
+    reservas = ReservaStock.objects.filter(origen=origen, documento__in=documentos)
+
+    # Productos cuyo disponible aumenta (para publicarlo); sin reservas no hay DELETE
+    producto_ids = set(reservas.values_list('producto_id', flat=True))
+    if not producto_ids:
+        return 0
+
+    borradas, _ = reservas.delete()
+    invalidar_catalogo(producto_ids)
+    return borradas
+
+
+def liberar_vencidas(tamano_lote=TAMANO_LOTE_VENCIDAS):
+    """
+    Borra por lotes las reservas vencidas (ej. carritos abandonados).
+
+    Cada lote es un DELETE corto sobre el índice parcial de 'expira', en su
+    propia transacción, para no bloquear la tabla mientras los cajeros
+    apartan productos. Una reserva renovada durante el barrido se conserva.
+
+    Las reservas vencidas ya no cuentan contra el disponible; el barrido
+    mantiene la tabla pequeña y actualiza la fotografía del catálogo.
+
+    Returns:
+        int: Número de reservas borradas
+    """
+    ahora = timezone.now()
+    borradas = 0
+    producto_ids = set()
+
+    while True:
+        lote = dict(
+            ReservaStock.objects.filter(expira__lte=ahora)
+            .order_by('expira')
+            .values_list('pk', 'producto_id')[:tamano_lote]
+        )
+        if not lote:
+            break
+        borradas += ReservaStock.objects.filter(pk__in=lote, expira__lte=ahora).delete()[0]
+        producto_ids.update(lote.values())
+
+    if borradas:
+        invalidar_catalogo(producto_ids)
+    return borradas
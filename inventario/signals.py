@@ -0,0 +1,23 @@
+"""
+Señales del módulo de inventario.
+
+Invalidan la fotografía del catálogo (ver catalogo.py) cuando se guarda o
+elimina un producto individualmente (formularios, admin, shell). Las
+actualizaciones masivas (QuerySet.update, bulk_create, bulk_update) no
+emiten señales y llaman a invalidar_catalogo() directamente.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalogo import invalidar_catalogo
+from .models import Producto
+
+
+@receiver(post_save, sender=Producto)
+@receiver(post_delete, sender=Producto)
+def producto_modificado(sender, instance, **kwargs):
+    """
+    Incrementa la versión del catálogo al guardar o eliminar un producto.
+    """
+    invalidar_catalogo([instance.pk])
@@ -0,0 +1,358 @@
+"""
+Pruebas del módulo de inventario.
+
+Cubren las reglas que dependen de la base de datos:
+- Concurrencia optimista al editar productos (respuesta 409)
+- Importación masiva por lotes con upsert por SKU o nombre
+- Archivado de productos y su restauración al importarlos de nuevo
+- Publicación de eventos de stock después del commit
+
+Ejecutar con:
+    python manage.py test inventario
+"""
+
+import io
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.admin.sites import site
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.db.models import ProtectedError
+from django.test import TestCase
+from django.urls import reverse
+
+from usuarios.models import Usuario
+from . import eventos
+from .importacion import importar_archivo
+from .models import MovimientoStock, Producto
+from .reservas import descontar_stock
+
+
+def crear_producto(nombre, stock, precio='100.00', **extra):
+    return Producto.objects.create(nombre=nombre, precio=precio, cantidad_stock=stock, **extra)
+
+
+# ==================== MODIFICAR PRODUCTO ====================
+
+class ModificarProductoTests(TestCase):
+    """
+    Edición de productos con concurrencia optimista (modificar_producto).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user(username='almacen', password='x')
+
+    def setUp(self):
+        self.producto = crear_producto('Laptop', 10, '1500.00')
+        self.url = reverse('modificar_producto', args=[self.producto.pk])
+        self.client.force_login(self.usuario)
+
+    def editar(self, datos):
+        return self.client.post(self.url, datos, HTTP_ACCEPT='application/json')
+
+    def vender(self, cantidad):
+        with transaction.atomic():
+            descontar_stock({self.producto.pk: cantidad})
+
+    def test_edicion_de_stock_con_version_vigente(self):
+        respuesta = self.editar({'version': 1, 'cantidad_stock': 12})
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['producto']['version'], 2)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.cantidad_stock, 12)
+        self.assertEqual(
+            list(MovimientoStock.objects.values_list('tipo', 'cantidad')), [('ajuste', 2)]
+        )
+
+    def test_edicion_de_stock_con_version_vieja_responde_409(self):
+        self.vender(3)
+
+        respuesta = self.editar({'version': 1, 'cantidad_stock': 12})
+
+        self.assertEqual(respuesta.status_code, 409)
+        datos = respuesta.json()
+        self.assertTrue(datos['conflicto'])
+        self.assertEqual(datos['producto']['cantidad_stock'], 7)
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.cantidad_stock, 7)
+        self.assertFalse(MovimientoStock.objects.filter(tipo='ajuste').exists())
+
+    def test_edicion_de_precio_despues_de_una_venta(self):
+        self.vender(3)
+
+        respuesta = self.editar({'version': 1, 'precio': '1400.00', 'original_precio': '1500.00'})
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.producto.refresh_from_db()
+        self.assertEqual(str(self.producto.precio), '1400.00')
+        self.assertEqual(self.producto.cantidad_stock, 7)
+
+    def test_edicion_de_precio_cambiado_por_otro_usuario_responde_409(self):
+        Producto.objects.filter(pk=self.producto.pk).update(precio='1450.00')
+
+        respuesta = self.editar({'version': 1, 'precio': '1400.00', 'original_precio': '1500.00'})
+
+        self.assertEqual(respuesta.status_code, 409)
+        self.assertEqual(respuesta.json()['producto']['precio'], '1450.00')
+
+    def test_edicion_de_precio_sin_valor_leido_usa_la_version(self):
+        self.vender(3)
+
+        respuesta = self.editar({'version': 1, 'precio': '1400.00'})
+
+        self.assertEqual(respuesta.status_code, 409)
+
+
+# ==================== IMPORTACIÓN ====================
+
+def archivo_csv(*filas):
+    contenido = '\n'.join(['nombre,precio,cantidad_stock,sku', *filas])
+    return io.BytesIO(contenido.encode('utf-8'))
+
+
+class ImportarArchivoTests(TestCase):
+    """
+    Importación de productos desde CSV (inventario.importacion).
+    """
+
+    def test_upsert_por_sku_y_por_nombre(self):
+        por_sku = crear_producto('Mouse viejo', 1, sku='M-1')
+        por_nombre = crear_producto('Teclado', 2)
+
+        resultado = importar_archivo(archivo_csv(
+            'Mouse óptico,150.00,5,M-1',
+            'Teclado,300.00,8,',
+            'Monitor,2500.00,3,MON-1',
+        ), 'proveedor.csv', tamano_lote=2)
+
+        self.assertEqual((resultado.creados, resultado.actualizados), (1, 2))
+        por_sku.refresh_from_db()
+        por_nombre.refresh_from_db()
+        # El SKU identifica al producto: se conserva su nombre
+        self.assertEqual((por_sku.nombre, str(por_sku.precio), por_sku.cantidad_stock),
+                         ('Mouse viejo', '150.00', 5))
+        self.assertEqual((str(por_nombre.precio), por_nombre.cantidad_stock), ('300.00', 8))
+        self.assertEqual(Producto.objects.get(sku='MON-1').cantidad_stock, 3)
+        self.assertEqual(
+            dict(MovimientoStock.objects.values_list('producto__nombre', 'cantidad')),
+            {'Mouse viejo': 4, 'Teclado': 6, 'Monitor': 3},
+        )
+
+    def test_sumar_stock_combina_filas_repetidas(self):
+        producto = crear_producto('Cable HDMI', 4, sku='HDMI')
+
+        importar_archivo(archivo_csv(
+            'Cable HDMI,80.00,2,HDMI',
+            'Cable HDMI,80.00,3,HDMI',
+        ), 'proveedor.csv', sumar_stock=True)
+
+        producto.refresh_from_db()
+        self.assertEqual(producto.cantidad_stock, 9)
+
+    def test_producto_nuevo_con_y_sin_sku_se_crea_una_vez(self):
+        resultado = importar_archivo(archivo_csv(
+            'Foo,10.00,2,X1',
+            'Foo,12.00,3,',
+            'Bar,12.00,3,',
+            'Bar,10.00,2,B1',
+        ), 'proveedor.csv')
+
+        self.assertEqual(resultado.creados, 2)
+        # Gana la última fila, igual que con las filas repetidas; el SKU se conserva
+        self.assertEqual(
+            sorted(Producto.objects.values_list('nombre', 'sku', 'precio', 'cantidad_stock')),
+            [('Bar', 'B1', Decimal('10.00'), 2), ('Foo', 'X1', Decimal('12.00'), 3)],
+        )
+
+    def test_producto_nuevo_con_y_sin_sku_suma_stock(self):
+        importar_archivo(archivo_csv('Foo,10.00,2,X1', 'Foo,10.00,3,'), 'proveedor.csv',
+                         sumar_stock=True)
+
+        self.assertEqual(Producto.objects.get(nombre='Foo').cantidad_stock, 5)
+
+    def test_filas_con_otro_sku_no_se_combinan(self):
+        importar_archivo(archivo_csv('Foo,10.00,2,X1', 'Foo,10.00,3,X2'), 'proveedor.csv')
+
+        self.assertEqual(Producto.objects.filter(nombre='Foo').count(), 2)
+
+    def test_codificacion_invalida_a_mitad_del_archivo(self):
+        filas = [f'Producto {numero},10.00,1,' for numero in range(2000)]
+        contenido = '\n'.join(['nombre,precio,cantidad_stock,sku', *filas]).encode('utf-8')
+
+        resultado = importar_archivo(
+            io.BytesIO(contenido + b'\nCaf\xe9,10.00,1,'), 'proveedor.csv', tamano_lote=100
+        )
+
+        # Lo guardado coincide con lo reportado, y el corte se reporta como error de fila
+        self.assertTrue(resultado.interrumpido)
+        self.assertGreater(resultado.creados, 0)
+        self.assertEqual(Producto.objects.count(), resultado.creados)
+        self.assertEqual(resultado.total_errores, 1)
+        self.assertEqual(resultado.errores[0][0], resultado.filas + 2)
+
+    def test_vista_informa_la_importacion_incompleta(self):
+        usuario = Usuario.objects.create_user(username='almacen', password='x')
+        self.client.force_login(usuario)
+        filas = [f'Producto {numero},10.00,1,' for numero in range(2000)]
+        contenido = '\n'.join(['nombre,precio,cantidad_stock,sku', *filas]).encode('utf-8')
+        archivo = SimpleUploadedFile('proveedor.csv', contenido + b'\nCaf\xe9,10.00,1,')
+
+        respuesta = self.client.post(reverse('importar_productos'), {'archivo': archivo})
+
+        mensajes = [(m.level_tag, str(m)) for m in respuesta.context['messages']]
+        self.assertEqual(len(mensajes), 1)
+        self.assertEqual(mensajes[0][0], 'warning')
+        self.assertIn(f'{Producto.objects.count()} creados', mensajes[0][1])
+        self.assertTrue(respuesta.context['resultado'].interrumpido)
+
+    def test_codificacion_invalida_al_inicio(self):
+        with self.assertRaises(ValueError):
+            importar_archivo(io.BytesIO(b'nombre,precio\nCaf\xe9,10.00'), 'proveedor.csv')
+
+        self.assertFalse(Producto.objects.exists())
+
+    def test_filas_invalidas_se_reportan_por_numero(self):
+        resultado = importar_archivo(archivo_csv(
+            'Bocina,120.00,2,',
+            ',120.00,2,',
+            'Audífonos,gratis,2,',
+        ), 'proveedor.csv')
+
+        self.assertEqual(resultado.creados, 1)
+        self.assertEqual(resultado.total_errores, 2)
+        self.assertEqual([fila for fila, _ in resultado.errores], [3, 4])
+
+
+# ==================== ARCHIVADO ====================
+
+class ArchivadoProductoTests(TestCase):
+    """
+    Eliminación lógica de productos y restauración desde la importación.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = Usuario.objects.create_user(username='almacen', password='x')
+
+    def setUp(self):
+        self.producto = crear_producto('Laptop', 10, sku='LAP-1')
+        self.client.force_login(self.usuario)
+
+    def archivar(self):
+        return self.client.post(reverse('eliminar_producto', args=[self.producto.pk]))
+
+    def test_eliminar_archiva_el_producto(self):
+        respuesta = self.archivar()
+
+        self.assertEqual(respuesta.status_code, 302)
+        self.assertFalse(Producto.objects.filter(pk=self.producto.pk).exists())
+        archivado = Producto.todos.get(pk=self.producto.pk)
+        self.assertFalse(archivado.activo)
+        self.assertEqual(archivado.version, 2)
+
+        # Un producto archivado ya no se puede editar ni volver a eliminar
+        self.assertEqual(self.archivar().status_code, 404)
+        respuesta = self.client.get(reverse('modificar_producto', args=[self.producto.pk]))
+        self.assertEqual(respuesta.status_code, 404)
+
+    def test_el_historial_impide_el_borrado_fisico(self):
+        MovimientoStock.objects.create(producto=self.producto, cantidad=10, tipo='alta')
+
+        with self.assertRaises(ProtectedError):
+            self.producto.delete()
+
+        self.assertFalse(site._registry[Producto].has_delete_permission(None))
+
+    def test_importacion_restaura_por_sku(self):
+        self.archivar()
+
+        resultado = importar_archivo(archivo_csv('Laptop,1500.00,4,LAP-1'), 'proveedor.csv')
+
+        self.assertEqual((resultado.creados, resultado.actualizados), (0, 1))
+        self.producto.refresh_from_db()
+        self.assertTrue(self.producto.activo)
+        self.assertEqual(self.producto.cantidad_stock, 4)
+        self.assertEqual(Producto.todos.count(), 1)
+
+    def test_importacion_por_nombre_prefiere_el_activo(self):
+        self.archivar()
+        activo = crear_producto('Laptop', 2)
+
+        importar_archivo(archivo_csv('Laptop,1500.00,6,'), 'proveedor.csv')
+
+        activo.refresh_from_db()
+        self.assertEqual(activo.cantidad_stock, 6)
+        self.assertFalse(Producto.todos.get(pk=self.producto.pk).activo)
+
+    def test_importacion_restaura_por_nombre(self):
+        Producto.todos.filter(pk=self.producto.pk).update(activo=False, sku=None)
+
+        importar_archivo(archivo_csv('Laptop,1500.00,6,'), 'proveedor.csv')
+
+        self.producto.refresh_from_db()
+        self.assertTrue(self.producto.activo)
+        self.assertEqual(self.producto.cantidad_stock, 6)
+
+
+# ==================== EVENTOS ====================
+
+class BusDePrueba:
+    """
+    Bus que guarda los mensajes publicados (o falla, si se indica).
+    """
+
+    def __init__(self, error=None):
+        self.mensajes = []
+        self.error = error
+
+    def publicar(self, mensaje):
+        if self.error:
+            raise self.error
+        self.mensajes.append(mensaje)
+
+
+class PublicacionEventosTests(TestCase):
+    """
+    Eventos de stock publicados al confirmar la transacción (inventario.eventos).
+    """
+
+    def setUp(self):
+        self.producto = crear_producto('Laptop', 5)
+
+    def test_publica_el_disponible_al_confirmar(self):
+        bus = BusDePrueba()
+
+        with mock.patch.object(eventos, 'obtener_bus', return_value=bus):
+            with self.captureOnCommitCallbacks(execute=True):
+                descontar_stock({self.producto.pk: 2})
+                self.assertEqual(bus.mensajes, [])
+
+        self.assertEqual(bus.mensajes, [{'stock': {str(self.producto.pk): 3}}])
+
+    def test_error_al_publicar_no_revierte_la_operacion(self):
+        bus = BusDePrueba(error=RuntimeError('bus caído'))
+
+        with mock.patch.object(eventos, 'obtener_bus', return_value=bus):
+            with self.assertLogs('inventario.eventos', level='ERROR'):
+                with self.captureOnCommitCallbacks(execute=True):
+                    descontar_stock({self.producto.pk: 2})
+                    eventos.publicar_servicios({1: 'pagado'})
+
+        self.producto.refresh_from_db()
+        self.assertEqual(self.producto.cantidad_stock, 3)
+
+    def test_escucha_perdida_cierra_la_conexion(self):
+        bus = eventos.BusPostgres()
+        bus._escuchando = True
+        conexion = mock.Mock()
+        conexion.ensure_connection.side_effect = RuntimeError('servidor caído')
+
+        with mock.patch.object(eventos.connections, 'create_connection', return_value=conexion):
+            with self.assertLogs('inventario.eventos', level='ERROR'):
+                bus._escuchar()
+
+        conexion.close.assert_called_once_with()
+        self.assertFalse(bus._escuchando)
@@ -1,7 +1,21 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.forms import modelform_factory
+from django.http import JsonResponse
 from .models import Producto
-from .forms import ProductoForm
+from .forms import ProductoForm, EditarProductoForm, ImportarProductosForm
+from .busqueda import filtrar_productos
+from .paginacion import paginar_productos
+from .importacion import importar_archivo
+from .exportacion import exportar_productos, respuesta_exportacion
+from .movimientos import registrar_movimientos
+from .concurrencia import ConflictoVersionError, actualizar_producto
+from .reorden import exportar_reorden, productos_stock_bajo
+from .catalogo import invalidar_catalogo
 
 # ==================== VISTA PRINCIPAL DE INVENTARIO ====================
 
@@ -10,11 +24,14 @@ def inventario_view(request):
     Vista principal que muestra el listado de productos del inventario.
     
     Funcionalidades:
-    - Lista todos los productos disponibles
-    - Permite buscar productos por nombre (búsqueda insensible a mayúsculas/minúsculas)
+    - Lista los productos por páginas de tamaño fijo (paginación por cursor)
+    - Permite buscar productos por nombre o descripción (búsqueda indexada, ver busqueda.py)
     - Ordena los productos alfabéticamente por nombre
     - Incluye un formulario para agregar productos rápidamente
     
+    Solo se renderiza la primera página; las siguientes y los resultados de
+    búsqueda mientras el usuario escribe se cargan con inventario_filas.
+    
     Args:
         request: Objeto HttpRequest con los datos de la petición
         
@@ -25,16 +42,8 @@ def inventario_view(request):
     # Si no existe, usar cadena vacía y eliminar espacios en blanco
     buscar = request.GET.get("buscar", "").strip()
     
-    # Obtener todos los productos de la base de datos
-    productos = Producto.objects.all()
-    
-    # Si hay término de búsqueda, filtrar productos que contengan el término en su nombre
-    # icontains: búsqueda case-insensitive (ignora mayúsculas/minúsculas)
-    if buscar:
-        productos = productos.filter(nombre__icontains=buscar)
-    
-    # Ordenar los productos alfabéticamente por nombre
-    productos = productos.order_by("nombre")
+    # Primera página de productos (ordenados por nombre)
+    productos, siguiente = listar_productos(buscar, request.GET.get("despues"))
     
     # Crear una instancia del formulario para agregar productos
     form_agregar = ProductoForm()
@@ -42,11 +51,61 @@ def inventario_view(request):
     # Renderizar la plantilla con los datos
     return render(request, "inventario/inventario.html", {
         "productos": productos, 
+        "siguiente": siguiente,
         "buscar": buscar, 
         "form_agregar": form_agregar
     })
 
 
+def inventario_filas(request):
+    """
+    Vista parcial que retorna solo las filas (<tr>) de una página del inventario.
+    
+    Utilizada por inventario.js para la búsqueda mientras se escribe y para
+    el botón "Cargar más", sin volver a renderizar la página completa.
+    
+    PARÁMETROS GET:
+    - buscar: Término de búsqueda (opcional)
+    - despues: Cursor de la página anterior (opcional)
+    
+    Args:
+        request: Objeto HttpRequest con los datos de la petición
+        
+    Returns:
+        HttpResponse: Fragmento HTML con las filas de la página
+    """
+    buscar = request.GET.get("buscar", "").strip()
+    productos, siguiente = listar_productos(buscar, request.GET.get("despues"))
+    
+    return render(request, "inventario/filas_productos.html", {
+        "productos": productos,
+        "siguiente": siguiente,
+        "buscar": buscar
+    })
+
+
+def listar_productos(buscar, despues=None):
+    """
+    Obtiene una página del listado de productos, filtrada por búsqueda.
+    
+    Args:
+        buscar (str): Término de búsqueda (puede estar vacío)
+        despues (str): Cursor de la página anterior
+        
+    Returns:
+        tuple: (lista de productos, cursor de la siguiente página o None)
+    """
+    productos = Producto.objects.all()
+    
+    # Si hay término de búsqueda, filtrar productos por nombre o descripción
+    # Usa los índices de trigramas/texto completo en PostgreSQL
+    if buscar:
+        productos = filtrar_productos(productos, buscar)
+    
+    # Página ordenada por (nombre, id) a partir del cursor
+    return paginar_productos(productos, despues)
+
+
 # ==================== AGREGAR PRODUCTO ====================
 
 def agregar_producto(request):
@@ -70,8 +129,10 @@ def agregar_producto(request):
         
         # Validar los datos del formulario
         if form.is_valid():
-            # Guardar el nuevo producto en la base de datos
-            form.save()
+            # Guardar el nuevo producto y registrar su stock inicial en la bitácora
+            with transaction.atomic():
+                producto = form.save()
+                registrar_movimientos({producto.pk: producto.cantidad_stock}, "alta", request.user)
             
             # Mostrar mensaje de éxito al usuario
             messages.success(request, "Producto agregado correctamente.")
@@ -98,34 +159,97 @@ def modificar_producto(request, pk):
     Busca el producto por su ID (pk) y permite editarlo. Si el producto no existe,
     retorna un error 404. Valida los cambios antes de guardar.
     
+    CONCURRENCIA OPTIMISTA:
+    - El formulario incluye la versión del producto que leyó el usuario y,
+      por cada campo editado, el valor que leyó (original_<campo>)
+    - Solo se validan y escriben los campos enviados que cambiaron
+      (editar el precio nunca sobrescribe el stock)
+    - Si se edita el stock y el producto cambió mientras tanto (ej. una
+      venta descontó stock), la edición se rechaza con estado 409 y los
+      valores actuales; si no se edita el stock, solo hay conflicto cuando
+      otro usuario cambió alguno de los campos editados
+    
+    Si la petición acepta JSON (modal de inventario.js) la respuesta es JSON;
+    si no, se redirige al inventario o se muestra el formulario.
+    
     Args:
         request: Objeto HttpRequest con los datos de la petición
         pk: Primary key (ID) del producto a modificar
         
     Returns:
         HttpResponse: Redirige al inventario si es exitoso, o muestra el formulario con datos
+        JsonResponse: Resultado de la edición para peticiones JSON
     """
     # Buscar el producto por su ID, o retornar 404 si no existe
-    producto = get_object_or_404(Producto, pk=pk)
+    producto = get_object_or_404(Producto.objects, pk=pk)
+    es_json = "application/json" in request.headers.get("Accept", "")
     
     # Verificar si la petición es POST (envío de formulario)
     if request.method == "POST":
-        # Crear formulario con los datos enviados y la instancia del producto a modificar
-        form = ProductoForm(request.POST, instance=producto)
+        # Valores antes de la edición (el formulario modifica la instancia al validar)
+        originales = {campo: getattr(producto, campo) for campo in ProductoForm.Meta.fields}
+        
+        # Formulario solo con los campos enviados (edición parcial)
+        campos = [campo for campo in ProductoForm.Meta.fields if campo in request.POST]
+        Formulario = modelform_factory(Producto, form=EditarProductoForm, fields=campos)
+        form = Formulario(request.POST, instance=producto)
         
         # Validar los datos del formulario
         if form.is_valid():
-            # Guardar los cambios en la base de datos
-            form.save()
+            cambios = {
+                campo: form.cleaned_data[campo]
+                for campo in campos
+                if form.cleaned_data[campo] != originales[campo]
+            }
+            
+            # Valores que leyó el usuario de cada campo editado (modal de inventario.js)
+            leidos = {}
+            for campo in cambios:
+                if f"original_{campo}" in request.POST:
+                    try:
+                        leidos[campo] = form.fields[campo].clean(request.POST[f"original_{campo}"])
+                    except ValidationError:
+                        pass
+            
+            try:
+                if cambios:
+                    # UPDATE condicionado a la versión (o a los valores) leídos por el usuario
+                    producto.version = actualizar_producto(
+                        producto.pk, form.cleaned_data["version"], cambios, request.user,
+                        leidos=leidos if len(leidos) == len(cambios) else None
+                    )
+                elif form.cleaned_data["version"] != producto.version:
+                    raise ConflictoVersionError(producto)
+            except ConflictoVersionError as e:
+                if es_json:
+                    return JsonResponse({
+                        "success": False,
+                        "conflicto": True,
+                        "error": str(e),
+                        "producto": datos_producto(e.producto)
+                    }, status=409)
+                
+                # Mostrar el formulario con los valores actuales del producto
+                messages.error(request, str(e))
+                return render(request, "inventario/form_producto.html", {
+                    "form": EditarProductoForm(instance=e.producto), 
+                    "accion": "Modificar"
+                }, status=409)
+            
+            if es_json:
+                return JsonResponse({"success": True, "producto": datos_producto(producto)})
             
             # Mostrar mensaje de éxito al usuario
             messages.success(request, "Producto modificado correctamente.")
             
             # Redirigir a la vista principal del inventario
             return redirect("inventario")
+        
+        if es_json:
+            return JsonResponse({"success": False, "errores": form.errors}, status=400)
     else:
         # Si es GET, crear formulario pre-llenado con los datos actuales del producto
-        form = ProductoForm(instance=producto)
+        form = EditarProductoForm(instance=producto)
     
     # Renderizar el formulario (pre-llenado o con errores)
     return render(request, "inventario/form_producto.html", {
@@ -134,14 +258,34 @@ def modificar_producto(request, pk):
     })
 
 
+def datos_producto(producto):
+    """
+    Representación JSON de un producto para el modal de edición.
+    """
+    return {
+        "id": producto.pk,
+        "nombre": producto.nombre,
+        "descripcion": producto.descripcion or "",
+        "precio": str(producto.precio),
+        "cantidad_stock": producto.cantidad_stock,
+        "stock_minimo": producto.stock_minimo,
+        "version": producto.version
+    }
+
+
 # ==================== ELIMINAR PRODUCTO ====================
 
 def eliminar_producto(request, pk):
     """
-    Vista para eliminar un producto del inventario.
+    Vista para eliminar (archivar) un producto del inventario.
     
     Implementa el patrón de confirmación antes de eliminar. Muestra una página
-    de confirmación (GET) y procesa la eliminación definitiva (POST).
+    de confirmación (GET) y procesa la eliminación (POST).
+    
+    La eliminación es lógica: un solo UPDATE marca el producto como inactivo,
+    sin cargar ni borrar su historial de ventas y servicios. El producto deja
+    de aparecer en el inventario, el POS y las cotizaciones, y puede
+    restaurarse desde el panel de administración.
     
     Args:
         request: Objeto HttpRequest con los datos de la petición
@@ -151,12 +295,15 @@ def eliminar_producto(request, pk):
         HttpResponse: Redirige al inventario si se elimina, o muestra página de confirmación
     """
     # Buscar el producto por su ID, o retornar 404 si no existe
-    producto = get_object_or_404(Producto, pk=pk)
+    producto = get_object_or_404(Producto.objects, pk=pk)
     
     # Verificar si la petición es POST (confirmación de eliminación)
     if request.method == "POST":
-        # Eliminar el producto de la base de datos
-        producto.delete()
+        # Archivar el producto (la versión invalida las ediciones abiertas)
+        Producto.objects.filter(pk=producto.pk).update(activo=False, version=F("version") + 1)
+        
+        # El UPDATE no emite señales: actualizar la fotografía del catálogo
+        invalidar_catalogo([producto.pk])
         
         # Mostrar mensaje de éxito al usuario
         messages.success(request, "Producto eliminado correctamente.")
@@ -167,4 +314,119 @@ def eliminar_producto(request, pk):
     # Si es GET, mostrar página de confirmación con los datos del producto
     return render(request, "inventario/confirmar_eliminar.html", {
         "producto": producto
-    })
\ No newline at end of file
+    })
+
+
+# ==================== IMPORTAR PRODUCTOS ====================
+
+@login_required
+def importar_productos(request):
+    """
+    Vista para importar productos masivamente desde un archivo CSV o XLSX.
+    
+    GET: Muestra el formulario de carga del archivo
+    POST: Procesa el archivo y muestra el resumen de la importación
+    
+    El archivo se lee en streaming y se guarda por lotes (ver importacion.py),
+    por lo que archivos grandes no incrementan el uso de memoria.
+    
+    Args:
+        request: Objeto HttpRequest con el archivo en FILES
+        
+    Returns:
+        HttpResponse: Formulario de importación con el resultado (si existe)
+    """
+    resultado = None
+    
+    if request.method == "POST":
+        form = ImportarProductosForm(request.POST, request.FILES)
+        
+        if form.is_valid():
+            archivo = form.cleaned_data["archivo"]
+            
+            try:
+                resultado = importar_archivo(
+                    archivo,
+                    archivo.name,
+                    sumar_stock=form.cleaned_data["sumar_stock"],
+                    usuario=request.user
+                )
+                resumen = (
+                    f"{resultado.creados} creados, "
+                    f"{resultado.actualizados} actualizados, "
+                    f"{resultado.total_errores} filas con errores."
+                )
+                if resultado.interrumpido:
+                    # Las filas anteriores al error ya se guardaron
+                    messages.warning(request, f"Importación incompleta: {resumen}")
+                else:
+                    messages.success(request, f"Importación terminada: {resumen}")
+            except ValueError as e:
+                # Formato, encabezado o codificación inválidos
+                messages.error(request, f"No se pudo importar el archivo: {e}")
+    else:
+        form = ImportarProductosForm()
+    
+    return render(request, "inventario/importar_productos.html", {
+        "form": form,
+        "resultado": resultado
+    })
+
+
+# ==================== EXPORTAR PRODUCTOS ====================
+
+@login_required
+def exportar_inventario(request):
+    """
+    Vista para descargar el catálogo de productos en CSV o XLSX.
+    
+    Las filas se leen por bloques y se envían en streaming, por lo que la
+    memoria utilizada no depende del número de productos.
+    
+    PARÁMETROS GET:
+    - formato: 'csv' (default) o 'xlsx'
+    
+    Args:
+        request: Objeto HttpRequest
+        
+    Returns:
+        StreamingHttpResponse: Archivo de productos como adjunto
+    """
+    encabezados, filas = exportar_productos()
+    return respuesta_exportacion(
+        "productos", encabezados, filas, request.GET.get("formato", "csv"), request
+    )
+
+
+# ==================== STOCK BAJO ====================
+
+@login_required
+def stock_bajo(request):
+    """
+    Vista con los productos cuyo stock está por debajo de su stock mínimo.
+    
+    Solo lee el índice parcial de stock bajo (ver reorden.py). El listado se
+    pagina por cursor igual que el inventario.
+    
+    PARÁMETROS GET:
+    - despues: Cursor de la página anterior (opcional)
+    - formato: 'csv' o 'xlsx' para descargar la lista de reorden completa
+    
+    Args:
+        request: Objeto HttpRequest
+        
+    Returns:
+        HttpResponse: Listado de productos con stock bajo
+        StreamingHttpResponse: Lista de reorden como adjunto (si se indica formato)
+    """
+    formato = request.GET.get("formato")
+    if formato:
+        encabezados, filas = exportar_reorden()
+        return respuesta_exportacion("reorden", encabezados, filas, formato, request)
+    
+    productos, siguiente = paginar_productos(productos_stock_bajo(), request.GET.get("despues"))
+    
+    return render(request, "inventario/stock_bajo.html", {
+        "productos": productos,
+        "siguiente": siguiente
+    })
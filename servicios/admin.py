@@ -34,16 +34,31 @@ class ServicioAdmin(admin.ModelAdmin):
     """
     
     # Columnas a mostrar en la lista principal
-    list_display = ('nombre', 'costo', 'fecha')
+    list_display = ('nombre', 'costo', 'fecha', 'activo')
     
     # Campos por los que se puede buscar
     search_fields = ('nombre', 'descripcion')
     
     # Filtros laterales disponibles
-    list_filter = ('fecha',)
+    list_filter = ('activo', 'fecha')
     
     # Ordenamiento por defecto (más recientes primero)
     ordering = ('-fecha',)
+    
+    # Acciones masivas de baja lógica
+    actions = ('archivar', 'restaurar')
+    
+    def get_queryset(self, request):
+        # Incluir servicios archivados para poder restaurarlos
+        return Servicio.todos.all()
+    
+    @admin.action(description='Archivar servicios seleccionados')
+    def archivar(self, request, queryset):
+        queryset.update(activo=False)
+    
+    @admin.action(description='Restaurar servicios seleccionados')
+    def restaurar(self, request, queryset):
+        queryset.update(activo=True)
 
 
 # ==================== ADMIN: SERVICIO PAGADO ====================
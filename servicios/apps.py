@@ -20,3 +20,9 @@ class ServiciosConfig(AppConfig):
     
     # Nombre de la aplicación (debe coincidir con el nombre del directorio)
     name = 'servicios'
+    
+    def ready(self):
+        """
+        Conecta las señales de la aplicación (liberación de reservas de stock).
+        """
+        from . import signals  # noqa: F401
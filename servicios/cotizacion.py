@@ -0,0 +1,148 @@
+"""
+Registro de cotizaciones de servicios.
+
+Convierte el servicio seleccionado y la lista de productos enviada por
+la pantalla de cotización en un ServicioPagado (estado 'cotizado') con
+sus ProductoServicioPagado.
+
+ESTRATEGIA:
+- Carga y bloquea todos los productos de la cotización en una sola consulta
+  (SELECT ... FOR UPDATE en orden de pk, igual que el cobro del POS)
+- Valida contra el stock disponible y aparta las cantidades cotizadas
+  (ReservaStock, ver inventario/reservas.py): el POS ya no puede vender
+  las refacciones de un servicio pendiente de pago
+- Calcula los precios con Decimal, igual que los campos del modelo
+- Inserta todas las líneas con un solo bulk_create
+- Todo ocurre en una transacción: si algo falla no queda una cotización
+  a medias (encabezado sin productos o con totales incorrectos)
+
+El número de consultas es constante sin importar cuántos productos tenga
+la cotización.
+
+USO:
+    cotizacion = crear_cotizacion(servicio, nombre_cliente, productos_data)
+"""
+
+from decimal import Decimal
+
+from django.db import transaction
+
+from inventario.eventos import publicar_servicios
+from inventario.models import Producto
+from inventario.reservas import crear_reservas, validar_disponible
+from .models import ProductoServicioPagado, ServicioPagado
+
+
+# ==================== NORMALIZACIÓN DE PRODUCTOS ====================
+
+def agrupar_productos(productos_data):
+    """
+    Normaliza los productos de la cotización a un diccionario {producto_id: cantidad}.
+
+    Si un producto aparece varias veces, sus cantidades se suman en una
+    sola línea. Se conserva el orden en que se agregaron.
+
+    Args:
+        productos_data (list): Lista de items [{"producto_id": 1, "cantidad": 2}, ...]
+
+    Returns:
+        dict: Cantidades agrupadas por ID de producto
+
+    Raises:
+        ValueError: Si algún item tiene un ID o cantidad inválidos
+    """
+    if not isinstance(productos_data, list):
+        raise ValueError('La lista de productos no es válida.')
+
+    cantidades = {}
+
+    for item in productos_data:
+        try:
+            producto_id = int(item['producto_id'])
+            cantidad = int(item['cantidad'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('La cotización contiene un producto inválido.')
+
+        if cantidad <= 0:
+            raise ValueError('Las cantidades de los productos deben ser mayores a cero.')
+
+        cantidades[producto_id] = cantidades.get(producto_id, 0) + cantidad
+
+    return cantidades
+
+
+# ==================== CREAR COTIZACIÓN ====================
+
+def crear_cotizacion(servicio, nombre_cliente, productos_data):
+    """
+    Registra la cotización de un servicio con sus productos.
+
+    FLUJO (dentro de una transacción atómica):
+    1. SELECT ... FOR UPDATE de todos los productos, ordenados por pk
+    2. Validación de existencia y del stock disponible
+    3. Cálculo de totales en memoria (Decimal)
+    4. INSERT del ServicioPagado con sus totales
+    5. INSERT masivo (bulk_create) de los ProductoServicioPagado
+    6. INSERT masivo de las reservas de stock
+
+    Los precios unitarios se guardan tal como estaban al cotizar.
+
+    Args:
+        servicio (Servicio): Servicio base a cotizar
+        nombre_cliente (str): Cliente que solicita el servicio
+        productos_data (list): Items [{"producto_id": 1, "cantidad": 2}, ...]
+
+    Returns:
+        ServicioPagado: Cotización creada (estado 'cotizado')
+
+    Raises:
+        ValueError: Si algún producto no existe o los datos son inválidos
+        StockInsuficienteError: Si algún producto no tiene stock disponible suficiente
+    """
+    cantidades = agrupar_productos(productos_data)
+
+    with transaction.atomic():
+        # Bloquear en orden de pk, igual que el POS, para no interbloquearse
+        productos = {
+            producto.pk: producto
+            for producto in Producto.objects.select_for_update()
+            .filter(pk__in=cantidades)
+            .order_by('pk')
+        } if cantidades else {}
+
+        faltantes = [str(producto_id) for producto_id in cantidades if producto_id not in productos]
+        if faltantes:
+            raise ValueError(f'Producto no encontrado (ID: {", ".join(faltantes)}).')
+
+        validar_disponible(productos.values(), cantidades)
+
+        precio_productos = sum(
+            (productos[producto_id].precio * cantidad for producto_id, cantidad in cantidades.items()),
+            Decimal('0'),
+        )
+
+        servicio_pagado = ServicioPagado.objects.create(
+            servicio=servicio,
+            nombre_cliente=nombre_cliente,
+            precio_servicio=servicio.costo,
+            precio_productos=precio_productos,
+            precio_total=servicio.costo + precio_productos,
+            estado='cotizado',
+        )
+
+        ProductoServicioPagado.objects.bulk_create([
+            ProductoServicioPagado(
+                servicio_pagado=servicio_pagado,
+                producto=productos[producto_id],
+                cantidad=cantidad,
+                precio_unitario=productos[producto_id].precio,  # Precio al momento de cotizar
+            )
+            for producto_id, cantidad in cantidades.items()
+        ])
+
+        crear_reservas(cantidades, 'servicio', servicio_pagado.pk)
+
+        # Las pantallas de cobro conectadas ven la nueva cotización pendiente
+        publicar_servicios({servicio_pagado.pk: 'cotizado'})
+
+    return servicio_pagado
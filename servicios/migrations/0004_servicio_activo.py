@@ -0,0 +1,51 @@
+"""
+MIGRACIÓN: 0004_servicio_activo.py
+
+PROPÓSITO:
+    Reemplaza la eliminación física de servicios por una baja lógica y
+    protege el historial de cotizaciones y pagos.
+
+CAMBIOS:
+    - Agrega el campo 'activo' (default True) a Servicio
+    - Crea el índice parcial 'servicio_activo_fecha_idx' (-fecha) de servicios activos
+    - ServicioPagado.servicio: CASCADE → PROTECT
+    - ProductoServicioPagado.producto: CASCADE → PROTECT
+"""
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Baja lógica de servicios y protección del historial.
+    """
+
+    dependencies = [
+        ('inventario', '0009_producto_activo'),
+        ('servicios', '0003_serviciopagado_productoserviciopagado'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='servicio',
+            name='activo',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='productoserviciopagado',
+            name='producto',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='inventario.producto'),
+        ),
+        migrations.AlterField(
+            model_name='serviciopagado',
+            name='servicio',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='servicios.servicio'),
+        ),
+        migrations.AddIndex(
+            model_name='servicio',
+            index=models.Index(condition=models.Q(('activo', True)), fields=['-fecha'], name='servicio_activo_fecha_idx'),
+        ),
+    ]
@@ -0,0 +1,109 @@
+"""
+MIGRACIÓN: 0005_indices_cobro_servicios.py
+
+PROPÓSITO:
+    Agrega los índices de las dos colas del cobro de servicios
+    (ventas.cobrar_servicios) y de su buscador, sin bloquear la tabla:
+    se puede aplicar con el sistema en uso.
+
+CAMBIOS:
+    1. Índice parcial 'servicio_cotizado_fecha_idx' (-fecha_creacion, -id)
+       de las cotizaciones pendientes (estado='cotizado')
+    2. Índice parcial 'servicio_pagado_fecha_idx' (-fecha_pago, -id)
+       del historial de pagos (estado='pagado')
+    3. Solo en PostgreSQL: índice GIN de trigramas sobre UPPER(nombre_cliente),
+       que acelera nombre_cliente__icontains (extensión pg_trgm)
+
+NOTA:
+    En PostgreSQL los índices se crean con CREATE INDEX CONCURRENTLY, que no
+    puede ejecutarse dentro de una transacción: la migración no es atómica.
+    Si se interrumpe, puede quedar un índice inválido; se debe eliminar
+    (DROP INDEX CONCURRENTLY) antes de volver a aplicarla.
+    En SQLite u otros motores los índices parciales se crean de forma normal
+    y el índice de trigramas se omite.
+"""
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import migrations, models
+from django.db.models.functions import Upper
+
+
+def indices_colas():
+    """
+    Índices parciales de las colas de cotizados y pagados (también en el estado del modelo).
+    """
+    return [
+        models.Index(
+            fields=['-fecha_creacion', '-id'], condition=models.Q(estado='cotizado'),
+            name='servicio_cotizado_fecha_idx',
+        ),
+        models.Index(
+            fields=['-fecha_pago', '-id'], condition=models.Q(estado='pagado'),
+            name='servicio_pagado_fecha_idx',
+        ),
+    ]
+
+
+def indices_busqueda():
+    """
+    Índice de trigramas del buscador por cliente (solo PostgreSQL).
+    """
+    return [
+        GinIndex(OpClass(Upper('nombre_cliente'), name='gin_trgm_ops'), name='servicio_cliente_trgm'),
+    ]
+
+
+def crear_indices(apps, schema_editor):
+    """
+    Crea los índices; en PostgreSQL sin bloquear escrituras (CONCURRENTLY).
+    """
+    ServicioPagado = apps.get_model('servicios', 'ServicioPagado')
+
+    if schema_editor.connection.vendor != 'postgresql':
+        for indice in indices_colas():
+            schema_editor.add_index(ServicioPagado, indice)
+        return
+
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for indice in indices_colas() + indices_busqueda():
+        schema_editor.add_index(ServicioPagado, indice, concurrently=True)
+
+
+def eliminar_indices(apps, schema_editor):
+    """
+    Elimina los índices. La extensión pg_trgm se conserva (la usa inventario).
+    """
+    ServicioPagado = apps.get_model('servicios', 'ServicioPagado')
+
+    if schema_editor.connection.vendor != 'postgresql':
+        for indice in indices_colas():
+            schema_editor.remove_index(ServicioPagado, indice)
+        return
+
+    for indice in indices_colas() + indices_busqueda():
+        schema_editor.remove_index(ServicioPagado, indice, concurrently=True)
+
+
+class Migration(migrations.Migration):
+    """
+    Índices de las colas de cobro y del buscador de ServicioPagado (sin bloqueo).
+    """
+
+    # CREATE INDEX CONCURRENTLY no se permite dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ('servicios', '0004_servicio_activo'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='serviciopagado', index=indice)
+                for indice in indices_colas()
+            ],
+            database_operations=[
+                migrations.RunPython(crear_indices, eliminar_indices),
+            ],
+        ),
+    ]
@@ -0,0 +1,69 @@
+"""
+MIGRACIÓN: 0006_reservar_cotizaciones_pendientes.py
+
+PROPÓSITO:
+    Aparta el stock de las cotizaciones que ya estaban pendientes de pago
+    al introducir las reservas de stock (inventario.ReservaStock).
+
+CAMBIOS:
+    - Crea una reserva por cotización 'cotizado' y producto, con la suma de
+      las cantidades de sus ProductoServicioPagado
+
+NOTA:
+    Las cotizaciones ya pagadas no se reservan. Revertir la migración borra
+    todas las reservas de cotizaciones de servicio.
+"""
+
+from django.db import migrations
+from django.db.models import Sum
+
+
+def reservar_cotizaciones(apps, schema_editor):
+    """
+    Crea las reservas de las cotizaciones pendientes, en lotes de 1000.
+    """
+    ProductoServicioPagado = apps.get_model('servicios', 'ProductoServicioPagado')
+    ReservaStock = apps.get_model('inventario', 'ReservaStock')
+
+    lineas = (
+        ProductoServicioPagado.objects.filter(servicio_pagado__estado='cotizado')
+        .values('servicio_pagado_id', 'producto_id')
+        .annotate(total=Sum('cantidad'))
+        .order_by('servicio_pagado_id', 'producto_id')
+    )
+
+    lote = []
+    for linea in lineas.iterator(chunk_size=1000):
+        lote.append(ReservaStock(
+            producto_id=linea['producto_id'],
+            cantidad=linea['total'],
+            origen='servicio',
+            documento=linea['servicio_pagado_id'],
+        ))
+        if len(lote) >= 1000:
+            ReservaStock.objects.bulk_create(lote)
+            lote = []
+    ReservaStock.objects.bulk_create(lote)
+
+
+def borrar_reservas(apps, schema_editor):
+    """
+    Borra las reservas de cotizaciones de servicio.
+    """
+    ReservaStock = apps.get_model('inventario', 'ReservaStock')
+    ReservaStock.objects.filter(origen='servicio').delete()
+
+
+class Migration(migrations.Migration):
+    """
+    Reservas de stock de las cotizaciones pendientes.
+    """
+
+    dependencies = [
+        ('servicios', '0005_indices_cobro_servicios'),
+        ('inventario', '0010_reserva_stock'),
+    ]
+
+    operations = [
+        migrations.RunPython(reservar_cotizaciones, borrar_reservas),
+    ]
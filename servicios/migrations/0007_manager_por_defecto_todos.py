@@ -0,0 +1,40 @@
+"""
+MIGRACIÓN: 0007_manager_por_defecto_todos.py
+
+PROPÓSITO:
+    Hace que el manager por defecto de Servicio incluya los servicios
+    archivados, para que dumpdata y los formularios del admin no los omitan.
+
+CAMBIOS:
+    - Meta.default_manager_name = 'todos'
+    - Servicio.objects sigue mostrando solo los servicios activos
+
+NOTA:
+    Solo cambia el estado de los modelos; no modifica la base de datos.
+"""
+
+import django.db.models.manager
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Manager por defecto con los servicios archivados.
+    """
+
+    dependencies = [
+        ('servicios', '0006_reservar_cotizaciones_pendientes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='servicio',
+            options={'default_manager_name': 'todos'},
+        ),
+        migrations.AlterModelManagers(
+            name='servicio',
+            managers=[
+                ('todos', django.db.models.manager.Manager()),
+            ],
+        ),
+    ]
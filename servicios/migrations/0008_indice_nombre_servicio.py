@@ -0,0 +1,66 @@
+"""
+MIGRACIÓN: 0008_indice_nombre_servicio.py
+
+PROPÓSITO:
+    Permite que el buscador del cobro de servicios (ventas.cobrar_servicios)
+    use índices en ambos lados de la búsqueda: por cliente
+    (servicio_cliente_trgm, ver 0005) y por nombre del servicio.
+
+CAMBIOS:
+    - Solo en PostgreSQL: índice GIN de trigramas sobre UPPER(nombre) de
+      Servicio, que acelera nombre__icontains (extensión pg_trgm)
+
+NOTA:
+    Se crea con CREATE INDEX CONCURRENTLY, que no puede ejecutarse dentro de
+    una transacción: la migración no es atómica. En SQLite u otros motores
+    no hace nada.
+"""
+
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.db import migrations
+from django.db.models.functions import Upper
+
+
+def indice_nombre():
+    """
+    Índice de trigramas del nombre del servicio (solo PostgreSQL).
+    """
+    return GinIndex(OpClass(Upper('nombre'), name='gin_trgm_ops'), name='servicio_nombre_trgm')
+
+
+def crear_indice(apps, schema_editor):
+    """
+    Crea el índice sin bloquear escrituras (CONCURRENTLY).
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.add_index(apps.get_model('servicios', 'Servicio'), indice_nombre(), concurrently=True)
+
+
+def eliminar_indice(apps, schema_editor):
+    """
+    Elimina el índice. La extensión pg_trgm se conserva (la usa inventario).
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.remove_index(apps.get_model('servicios', 'Servicio'), indice_nombre(), concurrently=True)
+
+
+class Migration(migrations.Migration):
+    """
+    Índice de trigramas del nombre de Servicio (sin bloqueo).
+    """
+
+    # CREATE INDEX CONCURRENTLY no se permite dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ('servicios', '0007_manager_por_defecto_todos'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indice, eliminar_indice),
+    ]
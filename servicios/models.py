@@ -1,6 +1,6 @@
 from django.db import models
 from usuarios.models import Usuario
-from inventario.models import Producto
+from inventario.models import ActivosManager, Producto
 
 # ==================== MODELO PRINCIPAL: SERVICIO ====================
 
@@ -11,6 +11,12 @@ class Servicio(models.Model):
     Define los servicios disponibles en el catálogo (ej: "Reparación de laptop",
     "Instalación de Windows", etc.). Cada servicio tiene un precio base y puede
     requerir productos adicionales del inventario.
+    
+    Los servicios no se eliminan físicamente: se archivan (activo=False)
+    para conservar sus cotizaciones y pagos.
+    - Servicio.objects: Solo servicios activos
+    - Servicio.todos: Todos los servicios, incluidos los archivados
+      (manager por defecto de Django: dumpdata, admin, relaciones)
     """
     
     # Nombre identificativo del servicio (máximo 200 caracteres)
@@ -41,11 +47,26 @@ class Servicio(models.Model):
     # Relación Many-to-Many con productos del inventario
     # Permite asociar productos que típicamente se usan en este servicio
     productos = models.ManyToManyField(Producto, blank=True)
+    
+    # Baja lógica: False = servicio archivado (oculto en el catálogo de servicios)
+    activo = models.BooleanField(default=True)
+    
+    # Managers: 'todos' es el manager por defecto (ver Meta.default_manager_name)
+    objects = ActivosManager()
+    todos = models.Manager()
 
     def __str__(self):
         """Representación en string del servicio."""
         return self.nombre
 
+    class Meta:
+        # Los archivados siguen existiendo para dumpdata, el admin y el historial
+        default_manager_name = 'todos'
+        indexes = [
+            # Listado de servicios activos, más recientes primero
+            models.Index(fields=['-fecha'], condition=models.Q(activo=True), name='servicio_activo_fecha_idx'),
+        ]
+
 
 # ==================== MODELO: SERVICIO PAGADO/COTIZADO ====================
 
@@ -69,8 +90,9 @@ class ServicioPagado(models.Model):
     ]
     
     # Relación con el tipo de servicio realizado
-    # CASCADE: Si se elimina el servicio base, se eliminan también sus registros de venta
-    servicio = models.ForeignKey(Servicio, on_delete=models.CASCADE)
+    # PROTECT: Un servicio con cotizaciones o pagos no puede eliminarse físicamente;
+    # se archiva (Servicio.activo=False) y el historial se conserva
+    servicio = models.ForeignKey(Servicio, on_delete=models.PROTECT)
     
     # Nombre del cliente que solicita el servicio
     nombre_cliente = models.CharField(max_length=200)
@@ -103,6 +125,19 @@ class ServicioPagado(models.Model):
     class Meta:
         verbose_name = "Servicio Pagado"
         verbose_name_plural = "Servicios Pagados"
+        indexes = [
+            # Colas del cobro de servicios (ventas.cobrar_servicios), paginadas por (fecha, id):
+            # cotizaciones pendientes, más recientes primero
+            models.Index(
+                fields=['-fecha_creacion', '-id'], condition=models.Q(estado='cotizado'),
+                name='servicio_cotizado_fecha_idx',
+            ),
+            # Historial de pagos, más recientes primero
+            models.Index(
+                fields=['-fecha_pago', '-id'], condition=models.Q(estado='pagado'),
+                name='servicio_pagado_fecha_idx',
+            ),
+        ]
 
 
 # ==================== MODELO: PRODUCTO EN SERVICIO ====================
@@ -128,8 +163,8 @@ class ProductoServicioPagado(models.Model):
     )
     
     # Relación con el producto del inventario
-    # CASCADE: Si se elimina el producto, se eliminan también estos registros
-    producto = models.ForeignKey(Producto, on_delete=models.CASCADE)
+    # PROTECT: Los productos se archivan en lugar de eliminarse (historial intacto)
+    producto = models.ForeignKey(Producto, on_delete=models.PROTECT)
     
     # Cantidad de unidades utilizadas del producto
     cantidad = models.PositiveIntegerField(default=1)
@@ -0,0 +1,24 @@
+"""
+Señales del módulo de servicios.
+
+Liberan el stock apartado por una cotización (ver inventario/reservas.py)
+cuando se elimina individualmente (admin, shell) y lo anuncian a las
+pantallas conectadas (ver inventario/eventos.py). El pago de cotizaciones
+(ventas/cobro_servicios.py) consume y borra sus reservas directamente.
+"""
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from inventario.eventos import publicar_servicios
+from inventario.reservas import liberar_reservas
+from .models import ServicioPagado
+
+
+@receiver(post_delete, sender=ServicioPagado)
+def cotizacion_eliminada(sender, instance, **kwargs):
+    """
+    Borra las reservas de stock de la cotización eliminada y lo anuncia.
+    """
+    liberar_reservas('servicio', [instance.pk])
+    publicar_servicios({instance.pk: 'eliminado'})
@@ -2,12 +2,16 @@ from django.http import HttpResponseRedirect, Http404, JsonResponse
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
-from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET
 from django.utils import timezone
 import json
-from .models import Servicio, ServicioPagado, ProductoServicioPagado
+from .models import Servicio
+from .cotizacion import crear_cotizacion
 from usuarios.models import Usuario
 from inventario.models import Producto
+from inventario.busqueda import buscar_productos
+from inventario.catalogo import aestado_catalogo, agregar_validadores, condicion_catalogo, obtener_catalogo
+from inventario.reservas import anotar_disponible
 
 # ==================== VISTAS CRUD BÁSICAS ====================
 
@@ -98,10 +102,11 @@ def modificar_servicio(request, pk):
 @login_required
 def eliminar_servicio(request, pk):
     """
-    Vista para eliminar un servicio del catálogo.
+    Vista para eliminar (archivar) un servicio del catálogo.
     
-    Elimina permanentemente un servicio de la base de datos.
-    NOTA: Debido al CASCADE, también eliminará todos los ServicioPagado asociados.
+    La eliminación es lógica: un solo UPDATE marca el servicio como inactivo.
+    Sus cotizaciones y pagos (ServicioPagado) se conservan; la relación es
+    PROTECT, por lo que el historial nunca se borra en cascada.
     
     Args:
         request: Objeto HttpRequest con confirmación POST
@@ -118,7 +123,7 @@ def eliminar_servicio(request, pk):
     
     if request.method == 'POST':
         try:
-            servicio.delete()
+            Servicio.objects.filter(pk=servicio.pk).update(activo=False)
             messages.success(request, f'Servicio eliminado exitosamente.')
         except Exception as e:
             messages.error(request, f'Error al eliminar el servicio: {str(e)}')
@@ -225,6 +230,7 @@ def cotizar_servicio(request, servicio_id):
     - Productos adicionales del inventario (opcional)
     - Cálculo automático de totales
     - Guardado como ServicioPagado con estado 'cotizado'
+    - Reserva del stock de los productos hasta que el servicio se pague
     
     El flujo es:
     1. Mostrar formulario con servicio y productos disponibles (GET)
@@ -238,15 +244,12 @@ def cotizar_servicio(request, servicio_id):
         HttpResponse: Renderiza formulario de cotización o redirige tras guardar
     """
     # Obtener el servicio a cotizar o retornar 404
-    servicio = get_object_or_404(Servicio, id=servicio_id)
-    
-    # Obtener productos disponibles (con stock mayor a 0) ordenados alfabéticamente
-    productos = Producto.objects.filter(cantidad_stock__gt=0).order_by('nombre')
+    servicio = get_object_or_404(Servicio.objects, id=servicio_id)
     
     if request.method == 'POST':
         try:
             # ========== Obtener datos del formulario ==========
-            nombre_cliente = request.POST.get('nombre_cliente')
+            nombre_cliente = request.POST.get('nombre_cliente', '').strip()
             
             # Los productos vienen en formato JSON desde JavaScript
             productos_data = json.loads(request.POST.get('productos_json', '[]'))
@@ -256,40 +259,14 @@ def cotizar_servicio(request, servicio_id):
                 messages.error(request, 'El nombre del cliente es obligatorio.')
                 return redirect('cotizar_servicio', servicio_id=servicio_id)
             
-            # ========== Calcular totales ==========
-            precio_productos = 0
-            
-            # Sumar el precio de todos los productos seleccionados
-            for item in productos_data:
-                producto = Producto.objects.get(id=item['producto_id'])
-                precio_productos += float(producto.precio) * int(item['cantidad'])
-            
-            # Precio total = servicio base + productos
-            precio_total = float(servicio.costo) + precio_productos
-            
-            # ========== Crear el registro de servicio cotizado ==========
-            servicio_pagado = ServicioPagado.objects.create(
-                servicio=servicio,
-                nombre_cliente=nombre_cliente,
-                precio_servicio=servicio.costo,
-                precio_productos=precio_productos,
-                precio_total=precio_total,
-                estado='cotizado'  # Estado inicial
-            )
-            
-            # ========== Agregar productos utilizados ==========
-            # Crear registros individuales para cada producto en la cotización
-            for item in productos_data:
-                producto = Producto.objects.get(id=item['producto_id'])
-                ProductoServicioPagado.objects.create(
-                    servicio_pagado=servicio_pagado,
-                    producto=producto,
-                    cantidad=item['cantidad'],
-                    precio_unitario=producto.precio  # Guardar precio actual
-                )
+            # ========== Registrar cotización ==========
+            # Productos en una consulta, totales en Decimal, líneas y reservas
+            # de stock en un solo INSERT cada una, todo en una transacción
+            # (ver servicios/cotizacion.py)
+            servicio_pagado = crear_cotizacion(servicio, nombre_cliente, productos_data)
             
             # Mensaje de éxito con total de la cotización
-            messages.success(request, f'Cotización creada exitosamente. Total: ${precio_total:.2f}')
+            messages.success(request, f'Cotización creada exitosamente. Total: ${servicio_pagado.precio_total:.2f}')
             return redirect('servicios')
             
         except Exception as e:
@@ -297,9 +274,13 @@ def cotizar_servicio(request, servicio_id):
             messages.error(request, f'Error al crear la cotización: {str(e)}')
     
     # ========== Preparar contexto para el formulario ==========
+    # Productos disponibles (stock sin apartar mayor a 0) ordenados alfabéticamente,
+    # desde la fotografía del catálogo en caché
+    version, productos = obtener_catalogo()
     context = {
         'servicio': servicio,
         'productos': productos,
+        'version_catalogo': version,
     }
     
     return render(request, 'servicios/cotizar.html', context)
@@ -307,46 +288,111 @@ def cotizar_servicio(request, servicio_id):
 
 # ==================== VISTA AJAX PARA INFORMACIÓN DE PRODUCTOS ====================
 
-@csrf_exempt
+# IDs máximos por consulta de obtener_producto_info
+MAXIMO_PRODUCTOS_INFO = 100
+
+
 @login_required
-def obtener_producto_info(request):
+@require_GET
+async def obtener_producto_info(request):
     """
-    Vista AJAX que retorna información de un producto específico.
+    Vista AJAX asíncrona que retorna información de productos.
     
-    Utilizada desde JavaScript para obtener datos del producto sin recargar
+    Utilizada desde JavaScript para obtener datos de productos sin recargar
     la página. Útil para mostrar información dinámica al seleccionar productos.
     
+    Es un GET cacheable: responde con ETag / Last-Modified (versión del
+    catálogo) y un cliente que ya tiene la versión actual recibe un 304 sin
+    consultar la base de datos. Usa el ORM asíncrono, por lo que bajo un
+    servidor ASGI no ocupa un hilo por petición.
+    
+    MODOS (parámetros GET):
+    - ids: Varios productos en una sola consulta, separados por comas o
+      repetidos (ids=1,2,3 o ids=1&ids=2), hasta MAXIMO_PRODUCTOS_INFO
+    - producto_id: Retorna los datos de un producto específico
+    - q: Busca productos con stock (búsqueda compartida de inventario/busqueda.py)
+      y retorna hasta 10 resultados ordenados por relevancia
+    
+    RESPUESTA JSON:
+    - ids / q: {"success": true, "productos": [{"id", "nombre", "precio", "stock"}]}
+      (con ids, además "no_encontrados": [ids inexistentes])
+    - producto_id: {"success": true, "nombre", "precio", "stock"}
+    
     Args:
-        request: Objeto HttpRequest POST con producto_id
+        request: Objeto HttpRequest GET con ids, producto_id o q
         
     Returns:
-        JsonResponse: Datos del producto (nombre, precio, stock) o error
+        JsonResponse: Datos de los productos (nombre, precio, stock) o error
     """
-    if request.method == 'POST':
-        try:
-            # Obtener el ID del producto desde el POST
-            producto_id = request.POST.get('producto_id')
-            
-            # Buscar el producto en la base de datos
-            producto = Producto.objects.get(id=producto_id)
-            
-            # Preparar respuesta JSON con los datos del producto
-            data = {
-                'success': True,
-                'nombre': producto.nombre,
-                'precio': str(producto.precio),  # Convertir a string para JSON
-                'stock': producto.cantidad_stock
-            }
-            
-            return JsonResponse(data)
-            
-        except Producto.DoesNotExist:
+    try:
+        ids = [
+            int(valor)
+            for parametro in request.GET.getlist('ids')
+            for valor in parametro.split(',')
+            if valor.strip()
+        ]
+        producto_id = request.GET.get('producto_id')
+        if producto_id:
+            ids = [int(producto_id)]
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'IDs de producto inválidos'}, status=400)
+    
+    if len(ids) > MAXIMO_PRODUCTOS_INFO:
+        return JsonResponse({
+            'success': False,
+            'error': f'Máximo {MAXIMO_PRODUCTOS_INFO} productos por consulta'
+        }, status=400)
+    
+    # Término de búsqueda (opcional) para el selector de productos
+    termino = request.GET.get('q', '').strip()
+    
+    if not ids and not termino:
+        return JsonResponse({'success': False, 'error': 'Indica ids, producto_id o q'}, status=400)
+    
+    # El cliente ya tiene esta consulta con la versión actual del catálogo
+    version, modificado = await aestado_catalogo()
+    no_modificado = condicion_catalogo(request, version, modificado)
+    if no_modificado is not None:
+        return no_modificado
+    
+    if termino:
+        productos = buscar_productos(
+            termino,
+            anotar_disponible(Producto.objects.filter(cantidad_stock__gt=0)).filter(disponible__gt=0)
+        )[:10]
+    else:
+        productos = anotar_disponible(Producto.objects.filter(pk__in=ids)).order_by('nombre')
+    
+    # Una sola consulta; el stock es el disponible (sin las unidades apartadas)
+    datos = [
+        {
+            'id': producto['id'],
+            'nombre': producto['nombre'],
+            'precio': str(producto['precio']),  # Convertir a string para JSON
+            'stock': producto['disponible'],
+        }
+        async for producto in productos.values('id', 'nombre', 'precio', 'disponible')
+    ]
+    
+    if termino:
+        data = {'success': True, 'productos': datos}
+    elif producto_id:
+        if not datos:
             # Producto no encontrado en la base de datos
-            return JsonResponse({
-                'success': False, 
-                'error': 'Producto no encontrado'
-            })
-        except Exception as e:
-            return JsonResponse({'success': False, 'error': str(e)})
+            return JsonResponse({'success': False, 'error': 'Producto no encontrado'}, status=404)
+        producto = datos[0]
+        data = {
+            'success': True,
+            'nombre': producto['nombre'],
+            'precio': producto['precio'],
+            'stock': producto['stock'],
+        }
+    else:
+        encontrados = {producto['id'] for producto in datos}
+        data = {
+            'success': True,
+            'productos': datos,
+            'no_encontrados': [pk for pk in dict.fromkeys(ids) if pk not in encontrados],
+        }
     
-    return JsonResponse({'success': False, 'error': 'Método no permitido'})
+    return agregar_validadores(JsonResponse(data), version, modificado)
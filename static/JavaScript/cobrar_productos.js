@@ -1,48 +1,115 @@
-let carrito = [];
+// Líneas del carrito tal como las envía el servidor (precio como texto)
+function leerCarrito(lineas) {
+    return lineas.map(item => ({ ...item, precio: parseFloat(item.precio) }));
+}
 
-function agregarAlCarrito(id, nombre, precio, stockDisponible) {
-    const itemExistente = carrito.find(item => item.producto_id === id);
+// El carrito vive en el servidor (apartados): al abrir el POS se restaura
+// el que el cajero ya tenía, en lugar de liberarlo
+let carrito = leerCarrito(JSON.parse(document.getElementById('carritoInicial').textContent));
 
-    if (itemExistente) {
-        if (itemExistente.cantidad < stockDisponible) {
-            itemExistente.cantidad++;
-        } else {
-            alert('No hay más stock disponible de este producto');
-            return;
-        }
-    } else {
-        carrito.push({
-            producto_id: id,
-            nombre: nombre,
-            precio: parseFloat(precio),
-            cantidad: 1,
-            stock_disponible: stockDisponible
+// Los cambios del carrito y el cobro se envían al servidor uno tras otro, en
+// el orden en que el cajero los hizo (ver ventas/carrito.py): el cobro nunca
+// se adelanta a un apartado pendiente ni un apartado llega después del cobro
+let colaApartados = Promise.resolve();
+let tareasPendientes = 0;
+let cobrando = false;
+
+function enCola(tarea) {
+    tareasPendientes++;
+    actualizarBotonCobrar();
+    colaApartados = colaApartados.then(tarea, tarea).finally(() => {
+        tareasPendientes--;
+        actualizarBotonCobrar();
+    });
+    return colaApartados;
+}
+
+// Cobrar solo se habilita con el carrito apartado por completo en el servidor
+function actualizarBotonCobrar() {
+    document.getElementById('btnCobrar').disabled = carrito.length === 0 || tareasPendientes > 0 || cobrando;
+}
+
+// Fija en el servidor la cantidad apartada de una línea (0 la libera)
+// Retorna {apartado, disponible} o null si no se pudo apartar
+async function apartarProducto(id, cantidad) {
+    const form = document.getElementById('formVenta');
+    const datos = new FormData();
+    datos.append('csrfmiddlewaretoken', form.elements.csrfmiddlewaretoken.value);
+    datos.append('producto_id', id);
+    datos.append('cantidad', cantidad);
+
+    try {
+        const response = await fetch(form.dataset.urlApartar, {
+            method: 'POST',
+            headers: { 'Accept': 'application/json' },
+            body: datos
         });
+        const data = await response.json();
+        if (!data.success) {
+            alert(data.error);
+            return null;
+        }
+        mostrarDisponible(id, data.disponible);
+        return data;
+    } catch (error) {
+        alert('No se pudo apartar el producto. Revisa la conexión.');
+        return null;
     }
+}
 
-    actualizarCarrito();
+function agregarAlCarrito(id, nombre, precio) {
+    return enCola(async () => {
+        const itemExistente = carrito.find(item => item.producto_id === id);
+        const data = await apartarProducto(id, (itemExistente ? itemExistente.cantidad : 0) + 1);
+        if (!data) return;
+
+        if (itemExistente) {
+            itemExistente.cantidad = data.apartado;
+            itemExistente.stock_disponible = data.apartado + data.disponible;
+        } else {
+            carrito.push({
+                producto_id: id,
+                nombre: nombre,
+                precio: parseFloat(precio),
+                cantidad: data.apartado,
+                stock_disponible: data.apartado + data.disponible
+            });
+        }
+
+        actualizarCarrito();
+    });
 }
 
 function actualizarCantidad(id, nuevaCantidad) {
-    const item = carrito.find(item => item.producto_id === id);
-    if (item) {
-        if (nuevaCantidad > 0 && nuevaCantidad <= item.stock_disponible) {
-            item.cantidad = nuevaCantidad;
-            actualizarCarrito();
-        } else if (nuevaCantidad > item.stock_disponible) {
+    return enCola(async () => {
+        const item = carrito.find(item => item.producto_id === id);
+        if (!item || !(nuevaCantidad > 0)) return;
+
+        if (nuevaCantidad > item.stock_disponible) {
             alert('No hay suficiente stock disponible');
+            actualizarCarrito();
+            return;
         }
-    }
+
+        const data = await apartarProducto(id, nuevaCantidad);
+        if (data) {
+            item.cantidad = data.apartado;
+            item.stock_disponible = data.apartado + data.disponible;
+        }
+        actualizarCarrito();
+    });
 }
 
 function eliminarDelCarrito(id) {
-    carrito = carrito.filter(item => item.producto_id !== id);
-    actualizarCarrito();
+    return enCola(async () => {
+        if (!await apartarProducto(id, 0)) return;
+        carrito = carrito.filter(item => item.producto_id !== id);
+        actualizarCarrito();
+    });
 }
 
 function actualizarCarrito() {
     const carritoItems = document.getElementById('carritoItems');
-    const btnCobrar = document.getElementById('btnCobrar');
 
     if (carrito.length === 0) {
         carritoItems.innerHTML = `
@@ -51,7 +118,6 @@ function actualizarCarrito() {
                 <p>El carrito está vacío<br>Selecciona productos para comenzar</p>
             </div>
         `;
-        btnCobrar.disabled = true;
     } else {
         carritoItems.innerHTML = carrito.map(item => {
             const subtotal = item.precio * item.cantidad;
@@ -76,8 +142,8 @@ function actualizarCarrito() {
                 </div>
             `;
         }).join('');
-        btnCobrar.disabled = false;
     }
+    actualizarBotonCobrar();
 
     const total = carrito.reduce((sum, item) => sum + (item.precio * item.cantidad), 0);
     document.getElementById('subtotalDisplay').textContent = `$${total.toFixed(2)}`;
@@ -89,14 +155,139 @@ function actualizarCarrito() {
 function confirmarVenta() {
     const total = carrito.reduce((sum, item) => sum + (item.precio * item.cantidad), 0);
     if (confirm(`¿Confirmar venta por $${total.toFixed(2)} en efectivo?`)) {
-        document.getElementById('formVenta').submit();
+        // Evitar un segundo envío mientras se procesa el cobro
+        cobrando = true;
+        enCola(registrarVenta);
+    }
+}
+
+function terminarCobro() {
+    cobrando = false;
+    actualizarBotonCobrar();
+}
+
+// Cobra vía AJAX y actualiza la página en su lugar (sin recargar el catálogo)
+// Si la red falla se puede reintentar: la clave de idempotencia evita duplicar la venta
+async function registrarVenta() {
+    const form = document.getElementById('formVenta');
+
+    let data;
+    try {
+        const response = await fetch(form.dataset.urlRegistrar, {
+            method: 'POST',
+            headers: { 'Accept': 'application/json' },
+            body: new FormData(form)
+        });
+        data = await response.json();
+    } catch (error) {
+        mostrarMensajeVenta('danger', 'No se pudo confirmar la venta. Revisa la conexión e intenta cobrar de nuevo.');
+        terminarCobro();
+        return;
+    }
+
+    if (data.conflicto) {
+        // Otra pestaña cambió el carrito: mostrar el apartado vigente antes de cobrar
+        carrito = leerCarrito(data.carrito);
+        cobrando = false;
+        actualizarCarrito();
+        mostrarMensajeVenta('warning', data.error);
+        return;
+    }
+
+    if (!data.success) {
+        mostrarMensajeVenta('danger', data.error);
+        terminarCobro();
+        return;
+    }
+
+    data.productos.forEach(producto => actualizarStockProducto(producto.id, producto.disponible));
+
+    // Clave nueva para el siguiente cobro
+    document.getElementById('claveIdempotencia').value = data.clave_idempotencia;
+    carrito = [];
+    cobrando = false;
+    actualizarCarrito();
+
+    if (data.repetida) {
+        mostrarMensajeVenta('info', `La venta #${data.venta.id} ya estaba registrada. Total: $${data.venta.total}`);
+    } else {
+        mostrarMensajeVenta('success', `Venta #${data.venta.id} realizada con éxito. Total: $${data.venta.total}`);
     }
+    agregarEnlaceTicket(data.ticket_url);
+}
+
+// Enlace para imprimir el ticket de la última venta (PDF)
+function agregarEnlaceTicket(url) {
+    const enlace = document.createElement('a');
+    enlace.href = url;
+    enlace.target = '_blank';
+    enlace.className = 'alert-link ms-2';
+    enlace.textContent = 'Imprimir ticket';
+    document.querySelector('#mensajesVenta .alert').insertBefore(enlace, document.querySelector('#mensajesVenta .btn-close'));
+}
+
+// Muestra en la tarjeta de un producto el disponible para los demás carritos
+// (la tarjeta se conserva aunque el carrito propio haya apartado todo)
+function mostrarDisponible(id, disponible) {
+    const card = document.querySelector(`.producto-card[data-id="${id}"]`);
+    if (!card) return;
+
+    card.dataset.stock = disponible;
+    card.querySelector('.stock').innerHTML = `<i class="bi bi-box"></i> Stock: ${disponible} unidades`;
+}
+
+// Actualiza la tarjeta de un producto con su nuevo stock (se quita si se agotó)
+function actualizarStockProducto(id, stock) {
+    const card = document.querySelector(`.producto-card[data-id="${id}"]`);
+    if (!card) return;
+
+    if (stock <= 0) {
+        card.remove();
+        return;
+    }
+    card.dataset.stock = stock;
+    card.querySelector('.stock').innerHTML = `<i class="bi bi-box"></i> Stock: ${stock} unidades`;
+}
+
+function mostrarMensajeVenta(tipo, texto) {
+    const alerta = document.createElement('div');
+    alerta.className = `alert alert-${tipo} alert-dismissible fade show`;
+    alerta.setAttribute('role', 'alert');
+    alerta.textContent = texto;
+
+    const cerrar = document.createElement('button');
+    cerrar.type = 'button';
+    cerrar.className = 'btn-close';
+    cerrar.dataset.bsDismiss = 'alert';
+    alerta.appendChild(cerrar);
+
+    const contenedor = document.getElementById('mensajesVenta');
+    contenedor.innerHTML = '';
+    contenedor.appendChild(alerta);
 }
 
 function limpiarCarrito() {
     if (carrito.length > 0 && confirm('¿Estás seguro de limpiar el carrito?')) {
-        carrito = [];
-        actualizarCarrito();
+        enCola(async () => {
+            const form = document.getElementById('formVenta');
+            const datos = new FormData();
+            datos.append('csrfmiddlewaretoken', form.elements.csrfmiddlewaretoken.value);
+            datos.append('vaciar', '1');
+
+            try {
+                await fetch(form.dataset.urlApartar, { method: 'POST', body: datos });
+            } catch (error) {
+                // Si no se pudo liberar, los apartados vencen solos
+            }
+
+            // Las unidades liberadas vuelven a estar disponibles
+            carrito.forEach(item => {
+                const card = document.querySelector(`.producto-card[data-id="${item.producto_id}"]`);
+                if (card) mostrarDisponible(item.producto_id, parseInt(card.dataset.stock) + item.cantidad);
+            });
+            carrito = [];
+            actualizarCarrito();
+        });
     }
 }
 
@@ -109,9 +300,8 @@ document.addEventListener('click', function(e) {
         const id = parseInt(productoCard.dataset.id);
         const nombre = productoCard.dataset.nombre;
         const precio = productoCard.dataset.precio;
-        const stockDisponible = parseInt(productoCard.dataset.stock);
         
-        agregarAlCarrito(id, nombre, precio, stockDisponible);
+        agregarAlCarrito(id, nombre, precio);
     }
 });
 
@@ -128,4 +318,119 @@ document.getElementById('searchInput').addEventListener('input', function(e) {
             producto.style.display = 'none';
         }
     });
-});
\ No newline at end of file
+});
+
+// ==================== STOCK EN VIVO ====================
+// Una sola conexión SSE por terminal recibe el disponible de los productos que
+// cambian (ventas y carritos de otros cajeros, cotizaciones, ediciones);
+// ver inventario/eventos.py
+
+// Aplica el disponible recibido a la tarjeta y a la línea del carrito
+function aplicarDisponible(id, disponible) {
+    const item = carrito.find(item => item.producto_id === id);
+    if (item) item.stock_disponible = item.cantidad + disponible;
+
+    const card = document.querySelector(`.producto-card[data-id="${id}"]`);
+    if (!card) {
+        // Producto que volvió a tener stock: se pide al catálogo (nombre, precio)
+        if (disponible > 0) programarSincronizacion();
+        return;
+    }
+    if (disponible <= 0 && !item) {
+        card.remove();
+    } else {
+        mostrarDisponible(id, Math.max(disponible, 0));
+    }
+}
+
+function crearTarjeta(producto) {
+    const card = document.createElement('div');
+    card.className = 'producto-card';
+    card.dataset.id = producto.id;
+    card.dataset.nombre = producto.nombre;
+    card.dataset.precio = producto.precio;
+    card.dataset.stock = producto.disponible;
+    card.innerHTML = `
+        <div class="d-flex justify-content-between align-items-start mb-2">
+            <div style="flex: 1;">
+                <h5></h5>
+                <div class="stock"><i class="bi bi-box"></i> Stock: ${producto.disponible} unidades</div>
+            </div>
+            <div class="precio"></div>
+        </div>
+        <button type="button" class="btn-agregar w-100 btn-agregar-producto">
+            <i class="bi bi-cart-plus"></i> Agregar al Carrito
+        </button>
+    `;
+    card.querySelector('h5').textContent = producto.nombre;
+    card.querySelector('.precio').textContent = `$${producto.precio}`;
+    return card;
+}
+
+// Trae la fotografía del catálogo solo si su versión cambió y la aplica
+async function sincronizarCatalogo() {
+    const lista = document.getElementById('productosLista');
+    let data;
+    try {
+        const response = await fetch(`${lista.dataset.urlCatalogo}?version=${lista.dataset.versionCatalogo}`, {
+            headers: { 'Accept': 'application/json' }
+        });
+        data = await response.json();
+    } catch (error) {
+        return;
+    }
+    if (!data.cambio) return;
+
+    lista.dataset.versionCatalogo = data.version;
+    const recibidos = new Set();
+    data.productos.forEach(producto => {
+        recibidos.add(producto.id);
+        if (!document.querySelector(`.producto-card[data-id="${producto.id}"]`)) {
+            lista.querySelector('.alert')?.remove();
+            lista.appendChild(crearTarjeta(producto));
+        }
+        aplicarDisponible(producto.id, producto.disponible);
+    });
+    // Los productos que ya no aparecen en el catálogo se agotaron
+    document.querySelectorAll('.producto-card').forEach(card => {
+        const id = parseInt(card.dataset.id);
+        if (!recibidos.has(id)) aplicarDisponible(id, 0);
+    });
+}
+
+let sincronizacionPendiente = null;
+
+function programarSincronizacion() {
+    clearTimeout(sincronizacionPendiente);
+    sincronizacionPendiente = setTimeout(sincronizarCatalogo, 500);
+}
+
+function conectarEventos() {
+    const lista = document.getElementById('productosLista');
+    if (!window.EventSource || !lista.dataset.urlEventos) return;
+
+    const fuente = new EventSource(lista.dataset.urlEventos);
+    let desconectado = false;
+
+    fuente.onmessage = function(e) {
+        const mensaje = JSON.parse(e.data);
+        if (mensaje.recargar) {
+            programarSincronizacion();
+            return;
+        }
+        if (mensaje.stock) {
+            Object.entries(mensaje.stock).forEach(([id, disponible]) => aplicarDisponible(parseInt(id), disponible));
+        }
+    };
+    // El navegador se reconecta solo; al volver se recuperan los cambios perdidos
+    fuente.onerror = function() { desconectado = true; };
+    fuente.onopen = function() {
+        if (desconectado) {
+            desconectado = false;
+            programarSincronizacion();
+        }
+    };
+}
+
+conectarEventos();
+if (carrito.length > 0) actualizarCarrito();
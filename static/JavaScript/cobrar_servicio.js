@@ -78,13 +78,13 @@ document.addEventListener('DOMContentLoaded', function() {
     });
 
     // Funcionalidad para copiar información al portapapeles (útil para detalles)
-    const detalleItems = document.querySelectorAll('.detalle-item');
-    detalleItems.forEach(item => {
-        item.style.cursor = 'pointer';
-        item.title = 'Click para copiar información';
-        item.addEventListener('click', function() {
-            const text = this.textContent;
-            navigator.clipboard.writeText(text).then(function() {
+    // Delegada en el modal: los productos se agregan al abrirlo
+    const detalleModal = document.getElementById('detalleModal');
+    if (detalleModal) {
+        detalleModal.addEventListener('click', function(e) {
+            const item = e.target.closest('.detalle-item');
+            if (!item) return;
+            navigator.clipboard.writeText(item.textContent.trim()).then(function() {
                 // Mostrar feedback visual
                 const originalBg = item.style.backgroundColor;
                 item.style.backgroundColor = '#d4edda';
@@ -93,8 +93,285 @@ document.addEventListener('DOMContentLoaded', function() {
                 }, 300);
             });
         });
+    }
+
+    // ==================== DETALLE BAJO DEMANDA ====================
+    // La lista no incluye el detalle de cada servicio: se pide al abrir un modal
+    // (data-url-detalle del botón) y se guarda aquí para las siguientes aperturas.
+    const detallesServicios = new Map();
+
+    function obtenerDetalle(url) {
+        if (!detallesServicios.has(url)) {
+            const peticion = fetch(url, { headers: { 'Accept': 'application/json' } })
+                .then(response => response.json())
+                .then(data => {
+                    if (!data.success) {
+                        throw new Error(data.error || 'No se pudo cargar el detalle');
+                    }
+                    return data;
+                })
+                .catch(error => {
+                    // No guardar errores: el siguiente intento vuelve a pedirlo
+                    detallesServicios.delete(url);
+                    throw error;
+                });
+            detallesServicios.set(url, peticion);
+        }
+        return detallesServicios.get(url);
+    }
+
+    // Llena los elementos [data-campo] del modal con los datos del servicio
+    function llenarCampos(modal, servicio) {
+        modal.querySelectorAll('[data-campo]').forEach(elemento => {
+            let valor = servicio[elemento.dataset.campo];
+            if (elemento.dataset.campo === 'tecnico' && !valor) valor = 'Sin asignar';
+            if (elemento.dataset.campo === 'fecha_pago' && !valor) valor = 'Pendiente de pago';
+            elemento.textContent = valor;
+        });
+    }
+
+    function mostrarDetalle(modal, data) {
+        const servicio = data.servicio;
+        llenarCampos(modal, servicio);
+
+        const estado = modal.querySelector('[data-campo="estado_display"]');
+        estado.className = 'badge ' + (servicio.estado === 'cotizado' ? 'badge-cotizado' : 'badge-pagado');
+
+        // Productos utilizados
+        const contenedor = modal.querySelector('.detalle-productos');
+        const lista = modal.querySelector('.detalle-productos-lista');
+        lista.replaceChildren();
+        data.productos.forEach(producto => {
+            const item = document.createElement('div');
+            item.className = 'detalle-item';
+            item.title = 'Click para copiar información';
+            item.style.cursor = 'pointer';
+
+            const fila = document.createElement('div');
+            fila.className = 'd-flex justify-content-between';
+            const nombre = document.createElement('span');
+            nombre.textContent = producto.nombre;
+            const importe = document.createElement('span');
+            importe.textContent = `${producto.cantidad} x $${producto.precio_unitario} = $${producto.subtotal}`;
+
+            fila.append(nombre, importe);
+            item.appendChild(fila);
+            lista.appendChild(item);
+        });
+        contenedor.classList.toggle('d-none', data.productos.length === 0);
+
+        modal.querySelector('.detalle-cargando').classList.add('d-none');
+        modal.querySelector('.detalle-contenido').classList.remove('d-none');
+    }
+
+    if (detalleModal) {
+        detalleModal.addEventListener('show.bs.modal', function(e) {
+            const boton = e.relatedTarget;
+            if (!boton) return;
+
+            // Mostrar el indicador de carga mientras llega el detalle
+            this.querySelector('.detalle-cargando').classList.remove('d-none');
+            this.querySelector('.detalle-contenido').classList.add('d-none');
+            this.querySelector('.modal-title [data-campo="id"]').textContent = '';
+
+            // El PDF de la cotización está junto al botón "Ver" en la fila
+            const enlacePdf = boton.parentElement.querySelector('a[href*="cotizacion"]');
+            this.querySelector('.enlace-cotizacion').href = enlacePdf ? enlacePdf.href : '#';
+
+            const mensaje = this.querySelector('.detalle-cargando p');
+            mensaje.textContent = 'Cargando detalle...';
+
+            const url = boton.dataset.urlDetalle;
+            this.dataset.url = url;
+            obtenerDetalle(url)
+                .then(data => {
+                    // Ignorar respuestas de un servicio que ya no es el mostrado
+                    if (detalleModal.dataset.url === url) mostrarDetalle(detalleModal, data);
+                })
+                .catch(error => {
+                    mensaje.textContent = error.message;
+                });
+        });
+    }
+
+    const pagarModal = document.getElementById('pagarModal');
+    if (pagarModal) {
+        pagarModal.addEventListener('show.bs.modal', function(e) {
+            const boton = e.relatedTarget;
+            if (!boton) return;
+
+            const form = document.getElementById('formPagar');
+            const confirmar = form.querySelector('button[type="submit"]');
+            form.action = boton.dataset.urlPagar;
+            confirmar.disabled = true;
+            this.querySelectorAll('[data-campo]').forEach(elemento => elemento.textContent = '...');
+
+            const url = boton.dataset.urlDetalle;
+            this.dataset.url = url;
+            obtenerDetalle(url)
+                .then(data => {
+                    if (pagarModal.dataset.url !== url) return;
+                    llenarCampos(pagarModal, data.servicio);
+                    confirmar.disabled = false;
+                })
+                .catch(error => {
+                    pagarModal.querySelector('[data-campo="nombre_cliente"]').textContent = error.message;
+                });
+        });
+    }
+
+    // ==================== COBRO POR LOTE ====================
+    // Los servicios seleccionados se pagan en una sola petición (un solo UPDATE
+    // en el servidor); las filas pagadas se quitan de la lista sin recargar.
+    const barraLote = document.getElementById('barraLote');
+    const seleccionarTodos = document.getElementById('seleccionarTodos');
+    const btnPagarLote = document.getElementById('btnPagarLote');
+
+    function seleccionados() {
+        return Array.from(document.querySelectorAll('.seleccion-servicio:checked'));
+    }
+
+    function actualizarLote() {
+        if (!barraLote) return;
+        const marcados = seleccionados();
+        const total = marcados.reduce((suma, casilla) => suma + parseFloat(casilla.dataset.total), 0);
+        document.getElementById('loteCantidad').textContent = marcados.length;
+        document.getElementById('loteTotal').textContent = total.toFixed(2);
+        btnPagarLote.disabled = marcados.length === 0;
+    }
+
+    function mostrarMensajeCobro(tipo, texto) {
+        const alerta = document.createElement('div');
+        alerta.className = `alert alert-${tipo} alert-dismissible fade show`;
+        alerta.setAttribute('role', 'alert');
+        alerta.textContent = texto;
+        const cerrar = document.createElement('button');
+        cerrar.type = 'button';
+        cerrar.className = 'btn-close';
+        cerrar.setAttribute('data-bs-dismiss', 'alert');
+        alerta.appendChild(cerrar);
+        document.getElementById('mensajesCobro').replaceChildren(alerta);
+    }
+
+    // Quita de la lista los servicios que ya no están pendientes y ajusta los contadores
+    function quitarServicios(ids) {
+        ids.forEach(id => {
+            const fila = document.querySelector(`tr[data-servicio="${id}"]`);
+            if (fila) fila.remove();
+        });
+        const contador = document.querySelector('.nav-link.active .badge-count');
+        if (contador) {
+            contador.textContent = Math.max(0, parseInt(contador.textContent, 10) - ids.length);
+        }
+    }
+
+    if (seleccionarTodos) {
+        seleccionarTodos.addEventListener('change', function() {
+            document.querySelectorAll('.seleccion-servicio').forEach(casilla => {
+                casilla.checked = this.checked;
+            });
+            actualizarLote();
+        });
+    }
+
+    document.querySelectorAll('.seleccion-servicio').forEach(casilla => {
+        casilla.addEventListener('change', actualizarLote);
     });
 
+    if (btnPagarLote) {
+        btnPagarLote.addEventListener('click', function() {
+            const marcados = seleccionados();
+            if (marcados.length === 0) return;
+
+            const monto = document.getElementById('loteTotal').textContent;
+            const confirmacion = confirm(`¿Registrar el pago de ${marcados.length} servicio(s) por $${monto} en efectivo?\n\nEsta acción no se puede deshacer.`);
+            if (!confirmacion) return;
+
+            const datos = new FormData();
+            marcados.forEach(casilla => datos.append('ids', casilla.value));
+            const csrf = barraLote.querySelector('[name="csrfmiddlewaretoken"]').value;
+
+            btnPagarLote.disabled = true;
+            fetch(barraLote.dataset.urlLote, {
+                method: 'POST',
+                body: datos,
+                headers: { 'X-CSRFToken': csrf },
+            })
+                .then(response => response.json())
+                .then(data => {
+                    if (!data.success) {
+                        mostrarMensajeCobro('danger', data.error);
+                        return;
+                    }
+
+                    // Pagados ahora o antes (por otro cajero): ya no están pendientes
+                    const resueltos = data.resultados
+                        .filter(r => r.resultado === 'pagado' || r.resultado === 'ya_pagado')
+                        .map(r => r.id);
+                    const yaPagados = data.resultados.filter(r => r.resultado === 'ya_pagado').length;
+                    quitarServicios(resueltos);
+
+                    let texto = `${data.pagados} servicio(s) pagado(s). Total: $${data.importe}`;
+                    if (yaPagados) texto += ` — ${yaPagados} ya estaba(n) pagado(s)`;
+                    mostrarMensajeCobro(data.pagados ? 'success' : 'warning', texto);
+                })
+                .catch(() => {
+                    mostrarMensajeCobro('danger', 'Error de conexión al registrar el pago. Puedes reintentar: un servicio ya pagado no se cobra dos veces.');
+                })
+                .finally(() => {
+                    if (seleccionarTodos) seleccionarTodos.checked = false;
+                    actualizarLote();
+                });
+        });
+    }
+
+    // ==================== COTIZACIONES EN VIVO ====================
+    // Una conexión SSE avisa los cambios de estado de las cotizaciones
+    // (ver inventario/eventos.py): los servicios que otro cajero cobró o que
+    // se eliminaron se quitan de la lista y las cotizaciones nuevas se anuncian.
+    const mensajesCobro = document.getElementById('mensajesCobro');
+    let nuevos = 0;
+
+    function anunciarNuevos() {
+        const aviso = document.createElement('div');
+        aviso.className = 'alert alert-info d-flex justify-content-between align-items-center';
+        aviso.setAttribute('role', 'status');
+        aviso.textContent = nuevos === 1 ? 'Hay 1 servicio nuevo.' : `Hay ${nuevos} servicios nuevos.`;
+        const actualizar = document.createElement('a');
+        actualizar.href = window.location.href;
+        actualizar.className = 'alert-link';
+        actualizar.textContent = 'Actualizar lista';
+        aviso.appendChild(actualizar);
+        document.getElementById('avisoNuevos')?.remove();
+        aviso.id = 'avisoNuevos';
+        mensajesCobro.before(aviso);
+    }
+
+    if (window.EventSource && mensajesCobro && mensajesCobro.dataset.urlEventos) {
+        const mostrar = mensajesCobro.dataset.mostrar === 'pagados' ? 'pagado' : 'cotizado';
+        const fuente = new EventSource(mensajesCobro.dataset.urlEventos);
+
+        fuente.onmessage = function(e) {
+            const mensaje = JSON.parse(e.data);
+            if (!mensaje.servicios) return;
+
+            const quitados = [];
+            Object.entries(mensaje.servicios).forEach(([id, estado]) => {
+                const fila = document.querySelector(`tr[data-servicio="${id}"]`);
+                if (fila && estado !== mostrar) {
+                    quitados.push(id);
+                } else if (!fila && estado === mostrar) {
+                    nuevos++;
+                }
+            });
+            if (quitados.length) {
+                quitarServicios(quitados);
+                actualizarLote();
+            }
+            if (nuevos) anunciarNuevos();
+        };
+    }
+
     // Agregar funcionalidad de confirmación adicional para pagos
     const confirmarPagoButtons = document.querySelectorAll('button[type="submit"]');
     confirmarPagoButtons.forEach(button => {
@@ -1,6 +1,5 @@
 // Variables globales
 let productosAgregados = [];
-const precioServicio = parseFloat("{{ servicio.costo|floatformat:2 }}");
 
 // Referencias a elementos DOM
 const selectProducto = document.getElementById('select_producto');
@@ -12,6 +11,9 @@ const precioTotalSpan = document.getElementById('precio_total');
 const productosJsonInput = document.getElementById('productos_json');
 const formCotizar = document.getElementById('formCotizar');
 
+// Precio base del servicio (los archivos estáticos no pasan por las plantillas de Django)
+const precioServicio = parseFloat(formCotizar.dataset.precioServicio);
+
 // Función para actualizar el display de productos
 function actualizarProductosDisplay() {
     if (productosAgregados.length === 0) {
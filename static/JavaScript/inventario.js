@@ -1,4 +1,6 @@
-const filas = document.querySelectorAll('tbody tr');
+const tablaProductos = document.getElementById('tablaProductos');
+const formBuscar = document.getElementById('formBuscar');
+const inputBuscar = document.getElementById('inputBuscar');
 let seleccionado = null;
 const btnEditar = document.getElementById('btnEditarSeleccion');
 const btnEliminar = document.getElementById('btnEliminarSeleccion');
@@ -8,21 +10,98 @@ const btnGuardarEditar = document.getElementById('btnGuardarEditar');
 const eliminarBody = document.getElementById('eliminarBody');
 const formEliminar = document.getElementById('formEliminar');
 const btnConfirmarEliminar = document.getElementById('btnConfirmarEliminar');
+const contenedorToasts = document.getElementById('contenedorToasts');
 
-filas.forEach(fila => {
-    fila.addEventListener('click', () => {
-        filas.forEach(f => f.classList.remove('table-primary'));
-        fila.classList.add('table-primary');
-        seleccionado = {
-            id: fila.children[0].innerText.trim(),
-            nombre: fila.children[1].innerText.trim(),
-            descripcion: fila.children[2].getAttribute('data-full') || fila.children[2].innerText.trim(),
-            precio: fila.children[3].innerText.replace('$','').trim(),
-            cantidad: fila.children[4].innerText.trim()
-        };
-        btnEditar.disabled = false;
-        btnEliminar.disabled = false;
-    });
+// Campos editables del producto: nombre del input → clave en 'seleccionado'
+const CAMPOS_EDITABLES = {
+    nombre: 'nombre',
+    descripcion: 'descripcion',
+    precio: 'precio',
+    cantidad_stock: 'cantidad',
+    stock_minimo: 'minimo'
+};
+
+// Retardo antes de buscar mientras el usuario escribe (ms)
+const RETARDO_BUSQUEDA = 250;
+let temporizadorBusqueda = null;
+let peticionBusqueda = null;
+
+function limpiarSeleccion() {
+    seleccionado = null;
+    btnEditar.disabled = true;
+    btnEliminar.disabled = true;
+}
+
+// Pide al servidor un fragmento de filas (<tr>) para la búsqueda y el cursor dados
+function obtenerFilas(buscar, despues, signal) {
+    const params = new URLSearchParams({ buscar: buscar });
+    if (despues) params.set('despues', despues);
+    return fetch(`${formBuscar.dataset.urlFilas}?${params}`, { signal: signal })
+        .then(respuesta => {
+            if (!respuesta.ok) throw new Error(`Error ${respuesta.status}`);
+            return respuesta.text();
+        });
+}
+
+// Selección de filas (delegación: funciona también con filas cargadas después)
+tablaProductos.addEventListener('click', (e) => {
+    const botonMas = e.target.closest('.btn-cargar-mas');
+    if (botonMas) {
+        cargarMas(botonMas);
+        return;
+    }
+
+    const fila = e.target.closest('tr[data-id]');
+    if (!fila) return;
+
+    tablaProductos.querySelectorAll('tr.table-primary').forEach(f => f.classList.remove('table-primary'));
+    fila.classList.add('table-primary');
+    seleccionado = {
+        fila: fila,
+        id: fila.dataset.id,
+        nombre: fila.dataset.nombre,
+        descripcion: fila.children[2].getAttribute('data-full') || '',
+        precio: fila.dataset.precio,
+        cantidad: fila.dataset.cantidad,
+        minimo: fila.dataset.minimo,
+        version: fila.dataset.version
+    };
+    btnEditar.disabled = false;
+    btnEliminar.disabled = false;
+});
+
+// Botón "Cargar más": agrega la siguiente página al final de la tabla
+function cargarMas(boton) {
+    boton.disabled = true;
+    obtenerFilas(inputBuscar.value.trim(), boton.dataset.siguiente)
+        .then(html => {
+            boton.closest('tr').remove();
+            tablaProductos.insertAdjacentHTML('beforeend', html);
+        })
+        .catch(() => { boton.disabled = false; });
+}
+
+// Búsqueda mientras se escribe: reemplaza las filas de la tabla
+inputBuscar.addEventListener('input', () => {
+    clearTimeout(temporizadorBusqueda);
+    temporizadorBusqueda = setTimeout(() => {
+        // Cancelar la búsqueda anterior si todavía no termina
+        if (peticionBusqueda) peticionBusqueda.abort();
+        peticionBusqueda = new AbortController();
+
+        const buscar = inputBuscar.value.trim();
+        obtenerFilas(buscar, null, peticionBusqueda.signal)
+            .then(html => {
+                tablaProductos.innerHTML = html;
+                limpiarSeleccion();
+                // Mantener la URL sincronizada con la búsqueda actual
+                const url = new URL(window.location);
+                if (buscar) url.searchParams.set('buscar', buscar);
+                else url.searchParams.delete('buscar');
+                history.replaceState(null, '', url);
+            })
+            .catch(() => {});
+    }, RETARDO_BUSQUEDA);
 });
 
 // Al abrir modal editar
@@ -30,30 +109,144 @@ document.getElementById('modalEditar').addEventListener('show.bs.modal', () => {
     if (!seleccionado) return;
     formEditar.action = `/inventario/modificar/${seleccionado.id}/`;
     editarBody.innerHTML = `
+        <div class="alert alert-warning d-none" id="avisoEditar"></div>
         <div class="mb-3">
             <label class="form-label">Nombre</label>
-            <input name="nombre" class="form-control" value="${seleccionado.nombre}" required />
+            <input name="nombre" class="form-control" required />
         </div>
         <div class="mb-3">
             <label class="form-label">Descripción</label>
-            <textarea name="descripcion" class="form-control">${seleccionado.descripcion || ''}</textarea>
+            <textarea name="descripcion" class="form-control"></textarea>
         </div>
         <div class="mb-3">
             <label class="form-label">Precio</label>
-            <input name="precio" type="number" step="0.01" class="form-control" value="${seleccionado.precio}" required />
+            <input name="precio" type="number" step="0.01" class="form-control" required />
         </div>
         <div class="mb-3">
             <label class="form-label">Cantidad en stock</label>
-            <input name="cantidad_stock" type="number" min="0" class="form-control" value="${seleccionado.cantidad}" required />
+            <input name="cantidad_stock" type="number" min="0" class="form-control" required />
+        </div>
+        <div class="mb-3">
+            <label class="form-label">Stock mínimo</label>
+            <input name="stock_minimo" type="number" min="0" class="form-control" required />
         </div>
     `;
+    // Asignar valores como propiedades (evita interpretar el texto como HTML)
+    formEditar.elements.nombre.value = seleccionado.nombre;
+    formEditar.elements.descripcion.value = seleccionado.descripcion;
+    formEditar.elements.precio.value = seleccionado.precio;
+    formEditar.elements.cantidad_stock.value = seleccionado.cantidad;
+    formEditar.elements.stock_minimo.value = seleccionado.minimo;
     btnGuardarEditar.disabled = false;
 });
 
+// Guardar edición: envía solo los campos modificados, el valor leído de cada uno
+// (original_<campo>) y la versión leída. Si otro usuario cambió alguno de esos
+// campos (o, al editar el stock, si hubo una venta), el servidor responde 409
+// con los valores actuales y no se sobrescribe nada.
+formEditar.addEventListener('submit', (e) => {
+    e.preventDefault();
+    if (!seleccionado) return;
+
+    const datos = new FormData();
+    datos.append('csrfmiddlewaretoken', formEditar.elements.csrfmiddlewaretoken.value);
+    datos.append('version', seleccionado.version);
+    let modificados = 0;
+    for (const [campo, clave] of Object.entries(CAMPOS_EDITABLES)) {
+        const valor = formEditar.elements[campo].value;
+        if (valor !== String(seleccionado[clave])) {
+            datos.append(campo, valor);
+            datos.append(`original_${campo}`, seleccionado[clave]);
+            modificados++;
+        }
+    }
+
+    if (!modificados) {
+        bootstrap.Modal.getInstance(document.getElementById('modalEditar')).hide();
+        return;
+    }
+
+    btnGuardarEditar.disabled = true;
+    fetch(formEditar.action, {
+        method: 'POST',
+        body: datos,
+        headers: { 'Accept': 'application/json' }
+    })
+        .then(respuesta => respuesta.json().then(resultado => ({ estado: respuesta.status, resultado: resultado })))
+        .then(({ estado, resultado }) => {
+            if (resultado.success) {
+                actualizarFila(seleccionado.fila, resultado.producto);
+                bootstrap.Modal.getInstance(document.getElementById('modalEditar')).hide();
+                mostrarAviso('Producto modificado correctamente.');
+                return;
+            }
+
+            if (estado === 409) {
+                // Conservar lo que escribió el usuario, pero tomar los valores y versión actuales
+                actualizarFila(seleccionado.fila, resultado.producto);
+                mostrarAvisoEditar(`${resultado.error} Valores actuales: precio $${resultado.producto.precio}, ` +
+                    `stock ${resultado.producto.cantidad_stock}.`);
+            } else {
+                const errores = Object.values(resultado.errores || {}).flat();
+                mostrarAvisoEditar(errores.join(' ') || resultado.error || 'No se pudo guardar.');
+            }
+        })
+        .catch(() => mostrarAvisoEditar('No se pudo guardar. Intenta de nuevo.'))
+        .finally(() => { btnGuardarEditar.disabled = false; });
+});
+
+// Actualiza la fila de la tabla y la selección con los valores del servidor
+function actualizarFila(fila, producto) {
+    fila.dataset.nombre = producto.nombre;
+    fila.dataset.precio = producto.precio;
+    fila.dataset.cantidad = producto.cantidad_stock;
+    fila.dataset.minimo = producto.stock_minimo;
+    fila.dataset.version = producto.version;
+
+    const celdaDescripcion = fila.children[2];
+    celdaDescripcion.setAttribute('data-full', producto.descripcion);
+    celdaDescripcion.title = producto.descripcion;
+    celdaDescripcion.textContent = producto.descripcion.length > 60
+        ? producto.descripcion.slice(0, 59) + '…'
+        : producto.descripcion;
+    fila.children[1].textContent = producto.nombre;
+    fila.children[3].textContent = `$${producto.precio}`;
+    fila.children[4].textContent = producto.cantidad_stock;
+
+    if (seleccionado && seleccionado.fila === fila) {
+        Object.assign(seleccionado, {
+            nombre: producto.nombre,
+            descripcion: producto.descripcion,
+            precio: producto.precio,
+            cantidad: String(producto.cantidad_stock),
+            minimo: String(producto.stock_minimo),
+            version: String(producto.version)
+        });
+    }
+}
+
+function mostrarAvisoEditar(texto) {
+    const aviso = document.getElementById('avisoEditar');
+    aviso.textContent = texto;
+    aviso.classList.remove('d-none');
+}
+
+// Toast de éxito (mismo formato que los mensajes del servidor)
+function mostrarAviso(texto) {
+    const toast = document.createElement('div');
+    toast.className = 'toast align-items-center text-bg-success border-0 mb-2 show';
+    toast.setAttribute('role', 'alert');
+    toast.innerHTML = '<div class="d-flex"><div class="toast-body"></div>' +
+        '<button type="button" class="btn-close btn-close-white me-2 m-auto" data-bs-dismiss="toast" aria-label="Close"></button></div>';
+    toast.querySelector('.toast-body').textContent = texto;
+    contenedorToasts.appendChild(toast);
+}
+
 // Al abrir modal eliminar
 document.getElementById('modalEliminar').addEventListener('show.bs.modal', () => {
     if (!seleccionado) return;
     formEliminar.action = `/inventario/eliminar/${seleccionado.id}/`;
-    eliminarBody.innerHTML = `<p>¿Seguro que deseas eliminar <strong>${seleccionado.nombre}</strong>? Esta acción no se puede deshacer.</p>`;
+    eliminarBody.innerHTML = '<p>¿Seguro que deseas eliminar <strong></strong>? El producto se archivará y su historial de ventas se conservará.</p>';
+    eliminarBody.querySelector('strong').textContent = seleccionado.nombre;
     btnConfirmarEliminar.disabled = false;
-});
\ No newline at end of file
+});
@@ -51,7 +51,7 @@ document.getElementById('modalEditar').addEventListener('show.bs.modal', () => {
 document.getElementById('modalEliminar').addEventListener('show.bs.modal', () => {
     if (!seleccionado) return;
     formEliminar.action = `/servicios/eliminar/${seleccionado.id}/`;
-    eliminarBody.innerHTML = `<p>¿Seguro que deseas eliminar <strong>${seleccionado.nombre}</strong>? Esta acción no se puede deshacer.</p>`;
+    eliminarBody.innerHTML = `<p>¿Seguro que deseas eliminar <strong>${seleccionado.nombre}</strong>? El servicio se archivará y sus cotizaciones y pagos se conservarán.</p>`;
     btnConfirmarEliminar.disabled = false;
 });
 
@@ -18,6 +18,9 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.utils import timezone
+from inventario.reorden import contar_stock_bajo
+from ventas.acumulados import ZONA_REPORTES, ventas_por_hora
 from .forms import UsuarioForm
 from .models import Usuario
 
@@ -108,7 +111,16 @@ def dashboard(request):
     Returns:
         HttpResponse: Renderiza el template del dashboard
     """
-    return render(request, "usuarios/dashboard.html")
+    # Ventas del día desde los acumulados por hora (ver ventas/acumulados.py)
+    hoy = timezone.localdate(timezone=ZONA_REPORTES)
+    horas = ventas_por_hora(hoy, hoy)
+    
+    # Indicador de stock bajo: solo lee el índice parcial (ver inventario/reorden.py)
+    return render(request, "usuarios/dashboard.html", {
+        "stock_bajo": contar_stock_bajo(),
+        "ventas_hoy": sum(fila['ventas'] for fila in horas),
+        "importe_hoy": sum(fila['importe'] for fila in horas)
+    })
 
 # ==================== GESTIÓN DE USUARIOS (SOLO ADMIN) ====================
 
@@ -0,0 +1,297 @@
+"""
+Acumulados de ventas para reportes y tableros.
+
+Agrupar todo DetalleVenta por día en cada reporte cuesta tanto como el
+historial completo. En su lugar se mantienen dos tablas de acumulados:
+ventas por (día, producto) y por (hora, cajero), ambas en la hora de
+México (ZONA_REPORTES), y los reportes solo leen las filas del rango.
+
+ESTRATEGIA:
+- MarcaAcumulado guarda hasta qué fecha están incluidas las ventas
+- Cada ejecución de acumular_ventas recalcula desde el inicio del día (y
+  de la hora) de la marca hasta ahora menos MARGEN_ACUMULADO: solo se
+  procesa el día en curso, no el historial, y repetirla no duplica nada
+- Las consultas combinan los acumulados con las pocas ventas posteriores
+  a la marca (la "cola"), por lo que siempre reflejan las ventas recientes
+- La primera ejecución acumula todo el historial
+- Corregir ventas ya acumuladas (ej. VentaQuerySet.recalcular_totales)
+  retrocede la marca al inicio del día de la venta más antigua corregida
+  (retroceder_marca): la siguiente ejecución reconstruye esos días
+
+USO:
+    acumular_ventas()                        # Comando: acumular_ventas (ej. cada 15 min)
+    retroceder_marca(venta.fecha)            # Tras corregir ventas anteriores a la marca
+    filas = ventas_por_dia(desde, hasta)     # desde/hasta: date, inclusivos
+    filas = ventas_por_hora(desde, hasta)
+"""
+
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+
+from .models import DetalleVenta, MarcaAcumulado, Venta, VentaDiaProducto, VentaHoraCajero
+
+# Zona horaria de los días y horas de los reportes
+ZONA_REPORTES = ZoneInfo('America/Mexico_City')
+
+# Los acumulados se actualizan hasta este margen antes del momento actual,
+# para no omitir ventas de transacciones aún abiertas
+MARGEN_ACUMULADO = timedelta(minutes=5)
+
+# Marca inicial: la primera ejecución acumula todo el historial
+INICIO_ACUMULADOS = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+# Nombre de la marca de agua de los acumulados de ventas
+MARCA_VENTAS = 'ventas'
+
+# Filas insertadas por consulta
+TAMANO_LOTE_ACUMULADOS = 1000
+
+
+# ==================== LÍMITES DE DÍAS Y HORAS ====================
+
+def inicio_dia(fecha):
+    """
+    Inicio (00:00 en ZONA_REPORTES) del día local al que pertenece 'fecha'.
+    """
+    return datetime.combine(fecha.astimezone(ZONA_REPORTES).date(), time.min, tzinfo=ZONA_REPORTES)
+
+
+def inicio_hora(fecha):
+    """
+    Inicio de la hora local a la que pertenece 'fecha'.
+    """
+    return fecha.astimezone(ZONA_REPORTES).replace(minute=0, second=0, microsecond=0)
+
+
+def limites_dias(desde, hasta):
+    """
+    Convierte un rango de días inclusivo en límites datetime [inicio, fin).
+
+    Args:
+        desde (date): Primer día
+        hasta (date): Último día (inclusivo)
+
+    Returns:
+        tuple: (inicio, fin) con zona horaria ZONA_REPORTES
+    """
+    inicio = datetime.combine(desde, time.min, tzinfo=ZONA_REPORTES)
+    fin = datetime.combine(hasta + timedelta(days=1), time.min, tzinfo=ZONA_REPORTES)
+    return inicio, fin
+
+
+# ==================== CONSULTAS DE AGREGACIÓN ====================
+
+def agrupar_por_dia(inicio, fin):
+    """
+    Ventas por (día, producto) con fecha en [inicio, fin), calculadas desde DetalleVenta.
+    """
+    return (
+        DetalleVenta.objects.filter(venta__fecha__gte=inicio, venta__fecha__lt=fin)
+        .annotate(dia=TruncDate('venta__fecha', tzinfo=ZONA_REPORTES))
+        .values('dia', 'producto_id')
+        .annotate(cantidad=Sum('cantidad'), importe=Sum('subtotal'))
+        .order_by()
+    )
+
+
+def agrupar_por_hora(inicio, fin):
+    """
+    Ventas por (hora, cajero) con fecha en [inicio, fin), calculadas desde Venta.
+    """
+    return (
+        Venta.objects.filter(fecha__gte=inicio, fecha__lt=fin)
+        .annotate(hora=TruncHour('fecha', tzinfo=ZONA_REPORTES))
+        .values('hora', 'usuario_id')
+        .annotate(ventas=Count('pk'), importe=Sum('total'))
+        .order_by()
+    )
+
+
+# ==================== ACTUALIZACIÓN INCREMENTAL ====================
+
+def fecha_marca():
+    """
+    Fecha hasta la que las ventas están incluidas en los acumulados.
+    """
+    fecha = MarcaAcumulado.objects.filter(nombre=MARCA_VENTAS).values_list('fecha', flat=True).first()
+    return fecha or INICIO_ACUMULADOS
+
+
+def insertar_por_lotes(modelo, objetos):
+    """
+    Inserta los objetos de un iterador por lotes de TAMANO_LOTE_ACUMULADOS.
+
+    Returns:
+        int: Número de filas insertadas
+    """
+    creados = 0
+    lote = []
+    for objeto in objetos:
+        lote.append(objeto)
+        if len(lote) >= TAMANO_LOTE_ACUMULADOS:
+            modelo.objects.bulk_create(lote)
+            creados += len(lote)
+            lote = []
+
+    if lote:
+        modelo.objects.bulk_create(lote)
+        creados += len(lote)
+
+    return creados
+
+
+def acumular_ventas(hasta=None):
+    """
+    Actualiza los acumulados con las ventas desde la marca de agua hasta 'hasta'.
+
+    El día y la hora de la marca se recalculan completos desde las ventas
+    (borrar e insertar), de modo que el resultado es el mismo sin importar
+    cuántas veces se ejecute. Todo ocurre en una transacción con la marca
+    bloqueada, así que dos ejecuciones simultáneas no se mezclan.
+
+    Args:
+        hasta (datetime): Límite (exclusivo) de las ventas a acumular
+                          (por defecto, ahora menos MARGEN_ACUMULADO)
+
+    Returns:
+        tuple: (filas por día/producto, filas por hora/cajero) insertadas
+    """
+    if hasta is None:
+        hasta = timezone.now() - MARGEN_ACUMULADO
+
+    with transaction.atomic():
+        MarcaAcumulado.objects.get_or_create(
+            nombre=MARCA_VENTAS, defaults={'fecha': INICIO_ACUMULADOS}
+        )
+        marca = MarcaAcumulado.objects.select_for_update().get(nombre=MARCA_VENTAS)
+
+        if hasta <= marca.fecha:
+            return 0, 0
+
+        desde_dia = inicio_dia(marca.fecha)
+        VentaDiaProducto.objects.filter(dia__gte=desde_dia.date()).delete()
+        dias = insertar_por_lotes(VentaDiaProducto, (
+            VentaDiaProducto(
+                dia=fila['dia'], producto_id=fila['producto_id'],
+                cantidad=fila['cantidad'], importe=fila['importe'],
+            )
+            for fila in agrupar_por_dia(desde_dia, hasta).iterator(chunk_size=TAMANO_LOTE_ACUMULADOS)
+        ))
+
+        desde_hora = inicio_hora(marca.fecha)
+        VentaHoraCajero.objects.filter(hora__gte=desde_hora).delete()
+        horas = insertar_por_lotes(VentaHoraCajero, (
+            VentaHoraCajero(
+                hora=fila['hora'], usuario_id=fila['usuario_id'],
+                ventas=fila['ventas'], importe=fila['importe'],
+            )
+            for fila in agrupar_por_hora(desde_hora, hasta).iterator(chunk_size=TAMANO_LOTE_ACUMULADOS)
+        ))
+
+        marca.fecha = hasta
+        marca.save(update_fields=['fecha'])
+
+    return dias, horas
+
+
+def retroceder_marca(fecha):
+    """
+    Hace que los acumulados se reconstruyan desde el día de 'fecha'.
+
+    Si 'fecha' ya está incluida en los acumulados, se borran los acumulados
+    desde el inicio de su día y la marca retrocede a ese inicio, en la misma
+    transacción: mientras tanto las consultas cubren esos días con la cola,
+    y la siguiente ejecución de acumular_ventas los vuelve a acumular.
+
+    Args:
+        fecha (datetime): Fecha de la venta más antigua que se corrigió
+
+    Returns:
+        bool: True si la marca retrocedió
+    """
+    inicio = inicio_dia(fecha)
+
+    with transaction.atomic():
+        marca = MarcaAcumulado.objects.select_for_update().filter(nombre=MARCA_VENTAS).first()
+        if marca is None or marca.fecha <= fecha:
+            # La venta aún no está acumulada
+            return False
+
+        VentaDiaProducto.objects.filter(dia__gte=inicio.date()).delete()
+        VentaHoraCajero.objects.filter(hora__gte=inicio).delete()
+        marca.fecha = inicio
+        marca.save(update_fields=['fecha'])
+
+    return True
+
+
+# ==================== LECTURA DE ACUMULADOS ====================
+
+def combinar(acumulado, cola, claves, campos):
+    """
+    Suma las filas de la cola a las filas acumuladas con la misma clave.
+
+    Returns:
+        list: Filas combinadas ordenadas por clave
+    """
+    filas = {tuple(fila[clave] for clave in claves): dict(fila) for fila in acumulado}
+    for fila in cola:
+        llave = tuple(fila[clave] for clave in claves)
+        if llave in filas:
+            for campo in campos:
+                filas[llave][campo] += fila[campo]
+        else:
+            filas[llave] = dict(fila)
+
+    # Las claves nulas (ej. cajero eliminado) van al final
+    orden = lambda llave: tuple((valor is None, valor or 0) for valor in llave)
+    return [filas[llave] for llave in sorted(filas, key=orden)]
+
+
+def ventas_por_dia(desde, hasta):
+    """
+    Ventas por día y producto en un rango de días (acumulados + cola).
+
+    Args:
+        desde (date): Primer día
+        hasta (date): Último día (inclusivo)
+
+    Returns:
+        list: Dicts {dia, producto_id, cantidad, importe} ordenados por día y producto
+    """
+    inicio, fin = limites_dias(desde, hasta)
+    marca = fecha_marca()
+
+    acumulado = VentaDiaProducto.objects.filter(dia__gte=desde, dia__lte=hasta).values(
+        'dia', 'producto_id', 'cantidad', 'importe'
+    )
+    cola = agrupar_por_dia(max(inicio, marca), fin) if marca < fin else []
+
+    return combinar(acumulado, cola, ('dia', 'producto_id'), ('cantidad', 'importe'))
+
+
+def ventas_por_hora(desde, hasta):
+    """
+    Ventas por hora y cajero en un rango de días (acumulados + cola).
+
+    Args:
+        desde (date): Primer día
+        hasta (date): Último día (inclusivo)
+
+    Returns:
+        list: Dicts {hora, usuario_id, ventas, importe} ordenados por hora y cajero
+    """
+    inicio, fin = limites_dias(desde, hasta)
+    marca = fecha_marca()
+
+    acumulado = VentaHoraCajero.objects.filter(hora__gte=inicio, hora__lt=fin).values(
+        'hora', 'usuario_id', 'ventas', 'importe'
+    )
+    cola = agrupar_por_hora(max(inicio, marca), fin) if marca < fin else []
+
+    return combinar(acumulado, cola, ('hora', 'usuario_id'), ('ventas', 'importe'))
@@ -2,21 +2,54 @@
 Configuración del administrador de Django para el módulo de ventas.
 
 Este módulo registra los modelos de ventas en el panel de administración
-de Django para permitir su gestión.
+de Django para permitir su consulta.
 
 MODELOS DISPONIBLES:
-- Venta: Encabezados de ventas realizadas
-- DetalleVenta: Detalles de productos vendidos en cada venta
-
-NOTA: Actualmente los modelos no están registrados en el admin.
-Para registrarlos, descomentar y agregar:
-    from .models import Venta, DetalleVenta
-    admin.site.register(Venta)
-    admin.site.register(DetalleVenta)
+- Venta: Encabezados de ventas realizadas, con sus detalles en línea
+
+NOTA: Las ventas son de solo lectura en el admin y no se pueden borrar
+(el stock y la bitácora solo se modifican desde el punto de venta; borrar
+una venta eliminaría sus detalles sin devolver el stock ni registrar
+movimientos). El total puede recalcularse
+desde sus detalles con la acción "Recalcular totales".
 """
 
 from django.contrib import admin
+from .models import Venta, DetalleVenta
+
+
+class DetalleVentaInline(admin.TabularInline):
+    model = DetalleVenta
+    fields = ('producto', 'cantidad', 'precio_unitario', 'subtotal')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(Venta)
+class VentaAdmin(admin.ModelAdmin):
+    """
+    Consulta de ventas con sus detalles.
+    La acción de recálculo actualiza todas las ventas seleccionadas con un solo UPDATE.
+    """
+
+    list_display = ('id', 'fecha', 'usuario', 'metodo_pago', 'total')
+    list_filter = ('metodo_pago',)
+    date_hierarchy = 'fecha'
+    readonly_fields = ('usuario', 'fecha', 'total', 'metodo_pago')
+    inlines = (DetalleVentaInline,)
+    actions = ('recalcular_totales',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
 
-# Register your models here.
-# Los modelos de Venta y DetalleVenta pueden registrarse aquí
-# para gestión desde el panel de administración de Django
+    @admin.action(description='Recalcular totales desde los detalles')
+    def recalcular_totales(self, request, queryset):
+        actualizadas = queryset.recalcular_totales()
+        self.message_user(request, f'Totales recalculados: {actualizadas} ventas.')
@@ -0,0 +1,190 @@
+"""
+Apartado de productos del carrito del POS.
+
+Cada línea que el cajero agrega al carrito se aparta en el servidor
+(ReservaStock con origen 'carrito' y el usuario como documento) durante
+DURACION_APARTADO. Mientras tanto otro cajero no puede vender esas unidades:
+el rechazo por falta de stock ocurre al agregar el producto y no al cobrar.
+
+ESTRATEGIA:
+- Cada cambio de cantidad bloquea solo la fila de ese producto, valida el
+  disponible sin contar el propio carrito y fija la cantidad con un solo
+  INSERT ... ON CONFLICT (restricción única origen, documento, producto)
+- Cada cambio renueva el vencimiento de todo el carrito con un solo UPDATE
+- Al cobrar (checkout.py) se vende exactamente lo apartado: si el carrito
+  enviado no coincide con los apartados vigentes (pestaña desactualizada)
+  el cobro se rechaza; el cobro descuenta el stock y borra solo las
+  reservas de los productos vendidos
+- Un carrito abandonado deja de contar al vencer y el barrido
+  (python manage.py liberar_apartados) borra sus reservas por lotes
+
+Un cajero tiene un solo carrito. Abrir el POS (otra pestaña, otra
+terminal o recargar) no lo vacía: la página muestra las líneas apartadas
+vigentes (lineas), de modo que nunca se liberan unidades que otra pantalla
+sigue mostrando. Solo se vacía al cobrar (las líneas vendidas), con el
+botón "Limpiar carrito" (POST explícito) o al vencer.
+
+USO:
+    resultado = apartar(request.user, producto_id, cantidad)  # 0 quita la línea
+    carrito = lineas(request.user)                            # Al abrir el POS
+    vaciar(request.user)
+"""
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from inventario.catalogo import invalidar_catalogo
+from inventario.models import Producto, ReservaStock
+from inventario.reservas import anotar_disponible, liberar_reservas, reservas_vigentes, validar_disponible
+
+# Origen de las reservas del carrito (ver ReservaStock.ORIGEN_CHOICES)
+ORIGEN_CARRITO = 'carrito'
+
+# Tiempo que se conserva un apartado sin actividad en el carrito
+DURACION_APARTADO = timedelta(minutes=10)
+
+
+class CarritoDesactualizadoError(ValueError):
+    """
+    Error lanzado al cobrar un carrito distinto del que está apartado
+    (ej. otra pestaña del mismo cajero lo modificó).
+
+    Hereda de ValueError, igual que StockInsuficienteError, para que las
+    vistas existentes lo traten como un error de validación.
+    """
+
+
+def carrito_de(usuario):
+    """
+    Identifica las reservas del carrito de un usuario: (origen, documento).
+    """
+    return ORIGEN_CARRITO, usuario.pk
+
+
+def apartados(usuario):
+    """
+    Cantidades apartadas vigentes del carrito del usuario (una consulta).
+
+    Returns:
+        dict: {producto_id: cantidad}
+    """
+    origen, documento = carrito_de(usuario)
+    return dict(
+        reservas_vigentes().filter(origen=origen, documento=documento)
+        .values_list('producto_id', 'cantidad')
+    )
+
+
+def apartar(usuario, producto_id, cantidad):
+    """
+    Fija la cantidad apartada de un producto en el carrito del usuario.
+
+    FLUJO (dentro de una transacción atómica):
+    1. SELECT ... FOR UPDATE del producto
+    2. Validación del disponible sin contar el propio carrito
+    3. INSERT ... ON CONFLICT de la línea (o DELETE si la cantidad es 0)
+    4. UPDATE del vencimiento de todas las líneas del carrito
+
+    Args:
+        usuario (Usuario): Cajero dueño del carrito
+        producto_id (int): Producto de la línea
+        cantidad (int): Cantidad total de la línea (0 la quita del carrito)
+
+    Returns:
+        dict: {'apartado': cantidad de la línea, 'disponible': disponible
+        restante para los demás, 'expira': vencimiento del carrito}
+
+    Raises:
+        ValueError: Si el producto no existe o la cantidad es inválida
+        StockInsuficienteError: Si no hay disponible suficiente
+    """
+    if cantidad < 0:
+        raise ValueError('La cantidad no puede ser negativa.')
+
+    origen, documento = carrito_de(usuario)
+    expira = timezone.now() + DURACION_APARTADO
+
+    with transaction.atomic():
+        producto = Producto.objects.select_for_update().filter(pk=producto_id).first()
+        if producto is None:
+            raise ValueError(f'Producto no encontrado: {producto_id}')
+
+        # Disponible para este carrito (sus propias unidades ya apartadas cuentan como suyas)
+        disponible = validar_disponible(
+            [producto], {producto.pk: cantidad}, excluir=(origen, documento)
+        )[producto.pk]
+
+        if cantidad:
+            ReservaStock.objects.bulk_create(
+                [ReservaStock(
+                    producto=producto, cantidad=cantidad, origen=origen,
+                    documento=documento, expira=expira,
+                )],
+                update_conflicts=True,
+                unique_fields=['origen', 'documento', 'producto'],
+                update_fields=['cantidad', 'expira'],
+            )
+        else:
+            ReservaStock.objects.filter(origen=origen, documento=documento, producto=producto).delete()
+
+        # Cualquier actividad renueva el carrito completo
+        ReservaStock.objects.filter(origen=origen, documento=documento).update(expira=expira)
+        invalidar_catalogo([producto.pk])
+
+    return {'apartado': cantidad, 'disponible': disponible - cantidad, 'expira': expira}
+
+
+def lineas(usuario):
+    """
+    Líneas vigentes del carrito del usuario, en el formato del carrito del POS.
+
+    Dos consultas: las reservas vigentes del carrito y el disponible de sus
+    productos (los productos archivados se omiten; sus reservas vencen solas).
+
+    Returns:
+        list: Dicts {producto_id, nombre, precio, cantidad, stock_disponible}
+        ordenados por nombre; stock_disponible incluye lo apartado por la línea
+    """
+    cantidades = apartados(usuario)
+    if not cantidades:
+        return []
+
+    productos = anotar_disponible(Producto.objects.filter(pk__in=cantidades)).order_by('nombre')
+    return [
+        {
+            'producto_id': pk,
+            'nombre': nombre,
+            'precio': str(precio),
+            'cantidad': cantidades[pk],
+            'stock_disponible': cantidades[pk] + max(disponible, 0),
+        }
+        for pk, nombre, precio, disponible in productos.values_list('id', 'nombre', 'precio', 'disponible')
+    ]
+
+
+def vaciar(usuario):
+    """
+    Libera todas las reservas del carrito del usuario (un solo DELETE).
+
+    Returns:
+        int: Número de líneas liberadas
+    """
+    origen, documento = carrito_de(usuario)
+    return liberar_reservas(origen, [documento])
+
+
+def quitar_vendidos(usuario, producto_ids):
+    """
+    Borra del carrito las líneas de los productos vendidos (un solo DELETE).
+
+    Debe llamarse en la transacción del cobro, que ya descontó su stock
+    (el disponible no cambia: no hay nada que publicar). Las líneas de
+    otros productos, apartadas mientras tanto desde otra pestaña, se
+    conservan.
+    """
+    origen, documento = carrito_de(usuario)
+    ReservaStock.objects.filter(
+        origen=origen, documento=documento, producto_id__in=producto_ids
+    ).delete()
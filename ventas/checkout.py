@@ -0,0 +1,265 @@
+"""
+Motor de cobro del punto de venta.
+
+Este módulo concentra la lógica transaccional para convertir un carrito
+del POS en una Venta con sus DetalleVenta, descontando el stock de los
+productos vendidos.
+
+ESTRATEGIA:
+- Carga todos los productos del carrito en una sola consulta
+- Bloquea las filas (SELECT ... FOR UPDATE) en orden de primary key
+  para evitar interbloqueos entre cajeros que venden los mismos productos
+- Valida contra el stock disponible: las unidades apartadas por
+  cotizaciones de servicio o por el carrito de otro cajero (ReservaStock)
+  no se pueden vender; las que apartó el propio carrito ya están validadas
+  (ver carrito.py) y sus reservas se borran en la misma transacción
+- Si el cajero tiene apartados vigentes, el carrito enviado debe coincidir
+  con ellos: una pestaña desactualizada no vende cantidades distintas de
+  las apartadas (CarritoDesactualizadoError)
+- Descuenta el stock con un único UPDATE condicional basado en conjuntos
+  (cantidad_stock >= cantidad vendida), por lo que nunca se sobrevende
+- Inserta todas las líneas de detalle con un solo bulk_create
+- Registra la salida de cada producto en la bitácora de movimientos
+- Idempotente por clave: un reintento con la misma clave_idempotencia
+  retorna la venta original sin volver a descontar stock
+
+El número de consultas es constante sin importar el tamaño del carrito.
+
+USO:
+    venta = procesar_venta(request.user, carrito, 'efectivo', clave_idempotencia)
+    if venta.repetida: ...  # Reintento de un cobro ya registrado
+"""
+
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+
+from inventario.models import Producto
+from inventario.movimientos import registrar_movimientos
+from inventario.reservas import descontar_stock, validar_disponible
+from .carrito import CarritoDesactualizadoError, apartados, carrito_de, quitar_vendidos
+from .models import Venta, DetalleVenta
+
+# Longitud máxima de la clave de idempotencia (ver Venta.clave_idempotencia)
+LONGITUD_CLAVE = 64
+
+
+# ==================== NORMALIZACIÓN DEL CARRITO ====================
+
+def agrupar_carrito(carrito):
+    """
+    Normaliza el carrito enviado por el POS a un diccionario {producto_id: cantidad}.
+
+    Si un mismo producto aparece varias veces en el carrito, sus cantidades
+    se suman para que el descuento de stock se haga una sola vez por producto.
+
+    Args:
+        carrito (list): Lista de items [{"producto_id": 1, "cantidad": 2}, ...]
+
+    Returns:
+        dict: Cantidades agrupadas por ID de producto
+
+    Raises:
+        ValueError: Si algún item tiene un ID o cantidad inválidos
+    """
+    cantidades = {}
+
+    for item in carrito:
+        try:
+            producto_id = int(item['producto_id'])
+            cantidad = int(item['cantidad'])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError('El carrito contiene un producto inválido.')
+
+        if cantidad <= 0:
+            raise ValueError('Las cantidades del carrito deben ser mayores a cero.')
+
+        cantidades[producto_id] = cantidades.get(producto_id, 0) + cantidad
+
+    return cantidades
+
+
+# ==================== IDEMPOTENCIA ====================
+
+def normalizar_clave(clave):
+    """
+    Valida la clave de idempotencia enviada por el POS.
+
+    Args:
+        clave (str): Clave recibida (puede ser None o vacía)
+
+    Returns:
+        str | None: Clave sin espacios, o None si no se envió
+
+    Raises:
+        ValueError: Si la clave excede LONGITUD_CLAVE
+    """
+    clave = (clave or '').strip()
+    if len(clave) > LONGITUD_CLAVE:
+        raise ValueError('La clave de la venta no es válida.')
+    return clave or None
+
+
+def venta_por_clave(clave):
+    """
+    Busca la venta registrada con una clave de idempotencia (índice único).
+
+    Returns:
+        Venta | None: Venta original marcada como repetida, o None
+    """
+    venta = Venta.objects.filter(clave_idempotencia=clave).first()
+    if venta is not None:
+        venta.repetida = True
+    return venta
+
+
+# ==================== PROCESAR VENTA ====================
+
+def procesar_venta(usuario, carrito, metodo_pago='efectivo', clave_idempotencia=None):
+    """
+    Registra una venta completa a partir del carrito del POS.
+
+    Si se indica una clave de idempotencia y ya existe una venta con ella,
+    se retorna esa venta sin repetir ningún paso (ni validar el stock, que
+    la venta original ya descontó). Si dos peticiones con la misma clave
+    llegan a la vez, la segunda espera los bloqueos de la primera y vuelve
+    a buscar la clave; como último recurso el índice único rechaza su
+    INSERT, su transacción se revierte completa y se retorna la original.
+
+    FLUJO (dentro de una transacción atómica):
+    1. SELECT ... FOR UPDATE de todos los productos, ordenados por pk
+    2. Validación de existencia, del carrito contra los apartados del
+       cajero y del stock disponible (descontando reservas)
+    3. UPDATE condicional que descuenta el stock de todos los productos
+    4. INSERT de la Venta con su total ya calculado
+    5. INSERT masivo (bulk_create) de los DetalleVenta
+    6. INSERT masivo de los movimientos de stock (salidas por venta)
+    7. DELETE de las reservas del carrito de los productos vendidos
+
+    Args:
+        usuario (Usuario): Usuario que registra la venta
+        carrito (list): Items del carrito [{"producto_id": 1, "cantidad": 2}, ...]
+        metodo_pago (str): Forma de pago de la venta
+        clave_idempotencia (str): Clave única del cobro generada por el POS
+
+    Returns:
+        Venta: Venta creada (o la original si es un reintento) con el
+        atributo 'repetida' indicando si ya estaba registrada; las ventas
+        nuevas incluyen 'stock_restante' {producto_id: stock disponible}
+
+    Raises:
+        ValueError: Si el carrito está vacío o un producto no existe
+        CarritoDesactualizadoError: Si el carrito no coincide con los apartados vigentes
+        StockInsuficienteError: Si algún producto no tiene stock suficiente
+    """
+    clave_idempotencia = normalizar_clave(clave_idempotencia)
+
+    # Reintento de un cobro ya registrado: retornar la venta original
+    if clave_idempotencia:
+        venta = venta_por_clave(clave_idempotencia)
+        if venta is not None:
+            return venta
+
+    cantidades = agrupar_carrito(carrito)
+
+    if not cantidades:
+        raise ValueError('El carrito está vacío.')
+
+    try:
+        venta = _registrar_venta(usuario, cantidades, metodo_pago, clave_idempotencia)
+    except IntegrityError:
+        # Otra petición con la misma clave confirmó primero
+        venta = venta_por_clave(clave_idempotencia) if clave_idempotencia else None
+        if venta is None:
+            raise
+
+    return venta
+
+
+def _registrar_venta(usuario, cantidades, metodo_pago, clave_idempotencia):
+    """
+    Ejecuta la transacción de la venta (ver procesar_venta).
+    """
+    with transaction.atomic():
+        # Bloquear las filas en orden de pk: dos cajeros que venden los mismos
+        # productos adquieren los bloqueos en el mismo orden y no se interbloquean
+        productos = list(
+            Producto.objects.select_for_update()
+            .filter(pk__in=cantidades)
+            .order_by('pk')
+        )
+
+        # Un reintento concurrente con la misma clave espera los bloqueos
+        # anteriores: si la venta original ya confirmó, retornarla
+        if clave_idempotencia:
+            venta = venta_por_clave(clave_idempotencia)
+            if venta is not None:
+                return venta
+
+        if len(productos) != len(cantidades):
+            encontrados = {producto.pk for producto in productos}
+            faltantes = sorted(set(cantidades) - encontrados)
+            raise ValueError(f'Producto no encontrado: {faltantes[0]}')
+
+        # Con los productos bloqueados ninguna otra pestaña cambia estas líneas:
+        # se vende exactamente lo apartado (sin apartados, p. ej. vencidos, se
+        # valida el carrito enviado contra el disponible)
+        apartado = apartados(usuario)
+        if apartado and apartado != cantidades:
+            raise CarritoDesactualizadoError(
+                'El carrito cambió en otra pantalla. Revisa el carrito antes de cobrar.'
+            )
+
+        # Las unidades apartadas por cotizaciones u otros carritos no se pueden
+        # vender; las del propio carrito ya se validaron al apartarlas
+        disponibles = validar_disponible(productos, cantidades, excluir=carrito_de(usuario))
+
+        # UPDATE condicional único; también actualiza la fotografía del catálogo
+        descontar_stock(cantidades)
+
+        # Construir los detalles con el precio vigente de cada producto
+        # bulk_create no llama a save(), por eso el subtotal se calcula aquí
+        # El total se acumula con los mismos subtotales que se insertan, por lo
+        # que coincide con Venta.objects.recalcular_totales() sin otro UPDATE
+        detalles = []
+        total_venta = Decimal('0')
+
+        for producto in productos:
+            cantidad = cantidades[producto.pk]
+            subtotal = cantidad * producto.precio
+            total_venta += subtotal
+
+            detalles.append(DetalleVenta(
+                producto=producto,
+                cantidad=cantidad,
+                precio_unitario=producto.precio,
+                subtotal=subtotal,
+            ))
+
+        venta = Venta.objects.create(
+            usuario=usuario,
+            metodo_pago=metodo_pago,
+            total=total_venta,
+            clave_idempotencia=clave_idempotencia,
+        )
+        venta.repetida = False
+        # Disponible resultante de cada producto (filas bloqueadas: es exacto)
+        venta.stock_restante = {
+            pk: disponibles[pk] - cantidad for pk, cantidad in cantidades.items()
+        }
+
+        for detalle in detalles:
+            detalle.venta = venta
+
+        DetalleVenta.objects.bulk_create(detalles)
+
+        registrar_movimientos(
+            {pk: -cantidad for pk, cantidad in cantidades.items()},
+            'venta', usuario, f'Venta #{venta.pk}',
+        )
+
+        # Las unidades vendidas salen del carrito: sus reservas ya no aplican
+        # (las líneas que otra pestaña apartó después se conservan)
+        quitar_vendidos(usuario, list(cantidades))
+
+    return venta
@@ -0,0 +1,162 @@
+"""
+Cobro de servicios cotizados, uno o varios a la vez.
+
+Marcar N cotizaciones como pagadas cuesta un solo UPDATE condicional
+(WHERE estado='cotizado'), sin importar N: una cotización que otro cajero
+ya cobró simplemente no cumple la condición y no se vuelve a pagar.
+
+Todas las cotizaciones de un mismo cobro comparten la misma fecha_pago,
+que identifica cuáles se pagaron en este cobro (resultado por ID).
+
+Al pagarse, las refacciones de las cotizaciones salen del inventario: el
+stock de todos los productos del lote se descuenta con un solo UPDATE
+condicional, se registra un movimiento por servicio y producto, y se
+borran las reservas que las apartaban (ver inventario/reservas.py).
+
+USO:
+    ids = leer_ids(request.POST.getlist('ids'))
+    cobro = pagar_servicios(ids, request.user)
+    cobro['resultados'][7]    # 'pagado', 'ya_pagado' o 'no_encontrado'
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from inventario.eventos import publicar_servicios
+from inventario.models import Producto
+from inventario.movimientos import registrar_movimientos_documentos
+from inventario.reservas import descontar_stock, liberar_reservas
+from servicios.models import ProductoServicioPagado, ServicioPagado
+
+# Máximo de servicios por cobro (el cierre del día suele ser de decenas)
+MAXIMO_SERVICIOS_POR_COBRO = 200
+
+# Resultados por servicio
+PAGADO = 'pagado'               # Se pagó en este cobro
+YA_PAGADO = 'ya_pagado'         # Ya estaba pagado (ej. otro cajero lo cobró antes)
+NO_ENCONTRADO = 'no_encontrado'
+
+
+def leer_ids(valores):
+    """
+    Valida la lista de IDs de ServicioPagado enviada por el cliente.
+
+    Args:
+        valores (list): IDs como texto (ej. request.POST.getlist('ids'))
+
+    Returns:
+        list: IDs únicos, en el orden recibido
+
+    Raises:
+        ValueError: Si la lista está vacía, es demasiado larga o tiene IDs inválidos
+    """
+    ids = []
+    for valor in valores:
+        try:
+            pk = int(valor)
+        except (TypeError, ValueError):
+            raise ValueError(f'ID de servicio inválido: {valor}')
+        if pk not in ids:
+            ids.append(pk)
+
+    if not ids:
+        raise ValueError('Selecciona al menos un servicio para cobrar.')
+    if len(ids) > MAXIMO_SERVICIOS_POR_COBRO:
+        raise ValueError(f'No se pueden cobrar más de {MAXIMO_SERVICIOS_POR_COBRO} servicios a la vez.')
+
+    return ids
+
+
+def pagar_servicios(ids, usuario=None):
+    """
+    Marca como pagados los servicios cotizados indicados y descuenta sus productos.
+
+    Si algún producto ya no tiene stock suficiente, ningún servicio del
+    lote se paga (la transacción se revierte completa).
+
+    Args:
+        ids (list): IDs de ServicioPagado
+        usuario (Usuario): Usuario que cobra (para la bitácora de movimientos)
+
+    Returns:
+        dict: {
+            'fecha_pago': datetime compartida por los servicios pagados,
+            'pagados': número de servicios pagados en este cobro,
+            'importe': suma de precio_total de los servicios pagados,
+            'resultados': {id: PAGADO | YA_PAGADO | NO_ENCONTRADO},
+        }
+
+    Raises:
+        StockInsuficienteError: Si algún producto no tiene stock suficiente
+    """
+    ahora = timezone.now()
+
+    with transaction.atomic():
+        # Un solo UPDATE para todo el lote; la condición de estado evita cobrar dos veces
+        ServicioPagado.objects.filter(pk__in=ids, estado='cotizado').update(
+            estado='pagado', fecha_pago=ahora
+        )
+        filas = ServicioPagado.objects.filter(pk__in=ids).values_list(
+            'pk', 'estado', 'fecha_pago', 'precio_total'
+        )
+
+        resultados = {pk: NO_ENCONTRADO for pk in ids}
+        importe = 0
+        for pk, estado, fecha_pago, precio_total in filas:
+            if estado == 'pagado' and fecha_pago == ahora:
+                resultados[pk] = PAGADO
+                importe += precio_total
+            elif estado == 'pagado':
+                resultados[pk] = YA_PAGADO
+
+        pagados = [pk for pk, resultado in resultados.items() if resultado == PAGADO]
+        if pagados:
+            consumir_productos(pagados, usuario)
+            # Las demás pantallas de cobro quitan estos servicios de su lista
+            publicar_servicios(dict.fromkeys(pagados, 'pagado'))
+
+    return {
+        'fecha_pago': ahora,
+        'pagados': len(pagados),
+        'importe': importe,
+        'resultados': resultados,
+    }
+
+
+def consumir_productos(servicio_ids, usuario=None):
+    """
+    Descuenta del inventario los productos de los servicios recién pagados.
+
+    Debe llamarse dentro de la transacción del pago. Consultas constantes:
+    líneas de los servicios, bloqueo de productos, UPDATE de stock, INSERT
+    de movimientos y DELETE de reservas.
+
+    Args:
+        servicio_ids (list): IDs de ServicioPagado pagados en este cobro
+        usuario (Usuario): Usuario que cobra
+
+    Raises:
+        StockInsuficienteError: Si algún producto no tiene stock suficiente
+    """
+    cantidades = {}
+    por_servicio = {}
+    for servicio_id, producto_id, cantidad in ProductoServicioPagado.objects.filter(
+        servicio_pagado_id__in=servicio_ids
+    ).values_list('servicio_pagado_id', 'producto_id', 'cantidad'):
+        cantidades[producto_id] = cantidades.get(producto_id, 0) + cantidad
+        cambios = por_servicio.setdefault(f'Servicio #{servicio_id}', {})
+        cambios[producto_id] = cambios.get(producto_id, 0) - cantidad
+
+    if cantidades:
+        # Bloquear en orden de pk, igual que el POS y las cotizaciones
+        # (Producto.todos: un producto archivado después de cotizar también sale)
+        list(
+            Producto.todos.select_for_update()
+            .filter(pk__in=cantidades)
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        descontar_stock(cantidades)
+        registrar_movimientos_documentos(por_servicio, 'servicio', usuario)
+
+    liberar_reservas('servicio', servicio_ids)
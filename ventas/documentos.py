@@ -0,0 +1,257 @@
+"""
+Tickets de venta y cotizaciones de servicio en PDF (reportlab).
+
+Cada Venta imprime un ticket y cada ServicioPagado una cotización (o
+comprobante de pago). Los PDF se generan con un formato de ticket de
+80 mm y se guardan en la caché de Django, de modo que una reimpresión
+no vuelve a generar el documento.
+
+ESTRATEGIA:
+- La plantilla (ancho, márgenes, fuentes, encabezado del negocio) se
+  define una sola vez al importar el módulo
+- Se usan las fuentes estándar de PDF (Helvetica), que no se incrustan
+  en el archivo: no se leen archivos de fuentes en cada documento
+- Se dibuja directamente sobre el canvas, sin motor de maquetación
+- La clave de caché incluye el ID del documento y una huella de los
+  datos que pueden cambiar (total, estado, fecha de pago): si cambian,
+  la huella cambia y el documento se genera de nuevo
+- Una reimpresión cuesta una consulta del encabezado y una lectura de la caché
+
+USO:
+    pdf = ticket_venta_pdf(venta.pk)            # bytes o None si no existe
+    pdf = cotizacion_pdf(servicio_pagado.pk)
+"""
+
+import hashlib
+from io import BytesIO
+
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from reportlab.lib.units import mm
+from reportlab.lib.utils import simpleSplit
+from reportlab.pdfgen import canvas
+
+from servicios.models import ProductoServicioPagado, ServicioPagado
+from .models import DetalleVenta, Venta
+
+# Segundos que se conserva cada documento generado
+DURACION_DOCUMENTOS = 60 * 60 * 24
+
+# ==================== PLANTILLA DEL TICKET ====================
+
+NOMBRE_NEGOCIO = 'TodoLaptops'
+
+ANCHO_TICKET = 80 * mm
+MARGEN = 4 * mm
+ANCHO_UTIL = ANCHO_TICKET - 2 * MARGEN
+ALTO_RENGLON = 4.2 * mm
+
+FUENTE = 'Helvetica'
+FUENTE_NEGRITA = 'Helvetica-Bold'
+TAMANO_FUENTE = 8
+TAMANO_TITULO = 11
+
+# Renglones fijos al inicio y al final de todos los documentos
+ENCABEZADO = [('titulo', NOMBRE_NEGOCIO), ('linea',)]
+PIE = [('linea',), ('centro', 'Gracias por su preferencia')]
+
+
+def dinero(valor):
+    """Formato de moneda de los documentos."""
+    return f'${valor:,.2f}'
+
+
+def renglones_texto(texto):
+    """
+    Divide un texto largo en renglones que caben en el ancho del ticket.
+    """
+    return [('texto', parte) for parte in simpleSplit(str(texto), FUENTE, TAMANO_FUENTE, ANCHO_UTIL)]
+
+
+def dibujar(renglones, titulo):
+    """
+    Genera el PDF de un documento a partir de sus renglones.
+
+    Tipos de renglón:
+    - ('titulo', texto): Centrado, en negrita y tamaño grande
+    - ('centro', texto): Centrado
+    - ('texto', texto): Alineado a la izquierda
+    - ('par', izquierda, derecha[, negrita]): Texto a la izquierda y monto a la derecha
+    - ('linea',): Separador
+
+    Args:
+        renglones (list): Contenido del documento (sin encabezado ni pie)
+        titulo (str): Título de los metadatos del PDF
+
+    Returns:
+        bytes: Documento PDF
+    """
+    renglones = ENCABEZADO + renglones + PIE
+
+    # La altura de la página depende del número de renglones (papel continuo)
+    alto = 2 * MARGEN + len(renglones) * ALTO_RENGLON + ALTO_RENGLON
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=(ANCHO_TICKET, alto), pageCompression=0)
+    pdf.setTitle(titulo)
+    pdf.setAuthor(NOMBRE_NEGOCIO)
+
+    y = alto - MARGEN - ALTO_RENGLON
+    centro = ANCHO_TICKET / 2
+    derecha = ANCHO_TICKET - MARGEN
+
+    for renglon in renglones:
+        tipo = renglon[0]
+        if tipo == 'titulo':
+            pdf.setFont(FUENTE_NEGRITA, TAMANO_TITULO)
+            pdf.drawCentredString(centro, y, renglon[1])
+        elif tipo == 'centro':
+            pdf.setFont(FUENTE, TAMANO_FUENTE)
+            pdf.drawCentredString(centro, y, renglon[1])
+        elif tipo == 'texto':
+            pdf.setFont(FUENTE, TAMANO_FUENTE)
+            pdf.drawString(MARGEN, y, renglon[1])
+        elif tipo == 'par':
+            negrita = len(renglon) > 3 and renglon[3]
+            pdf.setFont(FUENTE_NEGRITA if negrita else FUENTE, TAMANO_FUENTE)
+            pdf.drawString(MARGEN, y, renglon[1])
+            pdf.drawRightString(derecha, y, renglon[2])
+        elif tipo == 'linea':
+            pdf.setDash(1, 2)
+            pdf.line(MARGEN, y + ALTO_RENGLON / 3, derecha, y + ALTO_RENGLON / 3)
+            pdf.setDash()
+        y -= ALTO_RENGLON
+
+    pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+# ==================== CACHÉ DE DOCUMENTOS ====================
+
+def huella(*valores):
+    """
+    Versión de un documento a partir de los datos que pueden cambiar.
+    """
+    return hashlib.md5(repr(valores).encode('utf-8')).hexdigest()[:12]
+
+
+def documento_en_cache(tipo, pk, version, generar):
+    """
+    Obtiene un documento de la caché o lo genera y lo guarda.
+
+    Args:
+        tipo (str): Tipo de documento ('ticket', 'cotizacion')
+        pk (int): ID del documento
+        version (str): Huella de los datos del documento
+        generar (callable): Función que genera los bytes del PDF
+
+    Returns:
+        bytes: Documento PDF
+    """
+    clave = f'documento:{tipo}:{pk}:{version}'
+    contenido = cache.get(clave)
+    if contenido is None:
+        contenido = generar()
+        cache.set(clave, contenido, DURACION_DOCUMENTOS)
+    return contenido
+
+
+# ==================== TICKET DE VENTA ====================
+
+def ticket_venta_pdf(venta_id):
+    """
+    Ticket de una venta en PDF.
+
+    Args:
+        venta_id (int): ID de la venta
+
+    Returns:
+        bytes: Documento PDF, o None si la venta no existe
+    """
+    venta = Venta.objects.filter(pk=venta_id).values(
+        'id', 'fecha', 'total', 'metodo_pago', cajero=F('usuario__username')
+    ).first()
+    if venta is None:
+        return None
+
+    def generar():
+        detalles = DetalleVenta.objects.filter(venta_id=venta_id).order_by('pk').values_list(
+            'producto__nombre', 'cantidad', 'precio_unitario', 'subtotal'
+        )
+
+        renglones = [
+            ('centro', f'Ticket de venta #{venta["id"]}'),
+            ('centro', timezone.localtime(venta['fecha']).strftime('%d/%m/%Y %H:%M')),
+        ]
+        if venta['cajero']:
+            renglones.append(('centro', f'Atendió: {venta["cajero"]}'))
+        renglones.append(('linea',))
+
+        for nombre, cantidad, precio, subtotal in detalles:
+            renglones += renglones_texto(nombre)
+            renglones.append(('par', f'  {cantidad} x {dinero(precio)}', dinero(subtotal)))
+
+        renglones += [
+            ('linea',),
+            ('par', 'TOTAL', dinero(venta['total']), True),
+            ('par', 'Método de pago', venta['metodo_pago'].capitalize()),
+        ]
+        return dibujar(renglones, f'Ticket de venta #{venta["id"]}')
+
+    return documento_en_cache('ticket', venta_id, huella(venta['total'], venta['metodo_pago']), generar)
+
+
+# ==================== COTIZACIÓN DE SERVICIO ====================
+
+def cotizacion_pdf(servicio_pagado_id):
+    """
+    Cotización (o comprobante, si ya se pagó) de un servicio en PDF.
+
+    Args:
+        servicio_pagado_id (int): ID del ServicioPagado
+
+    Returns:
+        bytes: Documento PDF, o None si no existe
+    """
+    cotizacion = ServicioPagado.objects.filter(pk=servicio_pagado_id).values(
+        'id', 'nombre_cliente', 'precio_servicio', 'precio_productos', 'precio_total',
+        'estado', 'fecha_creacion', 'fecha_pago', servicio_nombre=F('servicio__nombre'),
+    ).first()
+    if cotizacion is None:
+        return None
+
+    version = huella(cotizacion['estado'], cotizacion['fecha_pago'], cotizacion['precio_total'])
+
+    def generar():
+        productos = ProductoServicioPagado.objects.filter(
+            servicio_pagado_id=servicio_pagado_id
+        ).order_by('pk').values_list('producto__nombre', 'cantidad', 'precio_unitario')
+
+        pagado = cotizacion['estado'] == 'pagado'
+        titulo = f'{"Comprobante de servicio" if pagado else "Cotización"} #{cotizacion["id"]}'
+
+        renglones = [
+            ('centro', titulo),
+            ('centro', timezone.localtime(cotizacion['fecha_creacion']).strftime('%d/%m/%Y %H:%M')),
+            ('linea',),
+            *renglones_texto(f'Cliente: {cotizacion["nombre_cliente"]}'),
+            *renglones_texto(f'Servicio: {cotizacion["servicio_nombre"]}'),
+            ('par', 'Mano de obra', dinero(cotizacion['precio_servicio'])),
+        ]
+
+        if productos:
+            renglones.append(('linea',))
+            for nombre, cantidad, precio in productos:
+                renglones += renglones_texto(nombre)
+                renglones.append(('par', f'  {cantidad} x {dinero(precio)}', dinero(cantidad * precio)))
+            renglones.append(('par', 'Productos', dinero(cotizacion['precio_productos'])))
+
+        renglones += [('linea',), ('par', 'TOTAL', dinero(cotizacion['precio_total']), True)]
+        if pagado and cotizacion['fecha_pago']:
+            fecha_pago = timezone.localtime(cotizacion['fecha_pago']).strftime('%d/%m/%Y %H:%M')
+            renglones.append(('par', 'Pagado', fecha_pago))
+
+        return dibujar(renglones, titulo)
+
+    return documento_en_cache('cotizacion', servicio_pagado_id, version, generar)
@@ -0,0 +1,123 @@
+"""
+Exportación de ventas y servicios en streaming (CSV/XLSX).
+
+Define las exportaciones de Venta/DetalleVenta y ServicioPagado usando las
+utilidades de inventario/exportacion.py (iteración por bloques con
+cursores del servidor y escritura en streaming).
+
+EXPORTACIONES DISPONIBLES:
+- productos: Catálogo completo de productos
+- ventas: Una fila por producto vendido (DetalleVenta) con los datos de su Venta
+- servicios: Cotizaciones y servicios pagados (ServicioPagado)
+
+Las exportaciones de ventas y servicios aceptan un rango de fechas opcional.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from inventario.exportacion import TAMANO_BLOQUE, exportar_productos
+from servicios.models import ServicioPagado
+from .models import DetalleVenta
+
+
+# ==================== RANGO DE FECHAS ====================
+
+def rango_fechas(desde=None, hasta=None):
+    """
+    Convierte fechas 'YYYY-MM-DD' (hora local) en límites datetime con zona horaria.
+
+    El límite superior es exclusivo (inicio del día siguiente a 'hasta'),
+    para filtrar con campo__gte / campo__lt y aprovechar índices sobre la fecha.
+
+    Args:
+        desde (str): Fecha inicial inclusiva (opcional)
+        hasta (str): Fecha final inclusiva (opcional)
+
+    Returns:
+        tuple: (inicio, fin) como datetimes con zona horaria o None
+
+    Raises:
+        ValueError: Si alguna fecha tiene formato inválido
+    """
+    def limite(valor, dias=0):
+        if not valor:
+            return None
+        try:
+            fecha = parse_date(valor)
+        except ValueError:
+            fecha = None
+        if fecha is None:
+            raise ValueError(f'Fecha inválida: {valor}. Usa el formato AAAA-MM-DD.')
+        return timezone.make_aware(datetime.combine(fecha + timedelta(days=dias), time.min))
+
+    return limite(desde), limite(hasta, dias=1)
+
+
+def filtrar_rango(queryset, campo, desde=None, hasta=None):
+    """
+    Aplica un rango de fechas (ver rango_fechas) a un campo DateTimeField.
+    """
+    inicio, fin = rango_fechas(desde, hasta)
+    if inicio:
+        queryset = queryset.filter(**{f'{campo}__gte': inicio})
+    if fin:
+        queryset = queryset.filter(**{f'{campo}__lt': fin})
+    return queryset
+
+
+# ==================== EXPORTACIONES ====================
+
+def exportar_ventas(desde=None, hasta=None):
+    """
+    Define la exportación de ventas: una fila por DetalleVenta.
+
+    Returns:
+        tuple: (encabezados, iterador de filas)
+    """
+    encabezados = [
+        'venta_id', 'fecha', 'usuario', 'metodo_pago', 'total_venta',
+        'producto_id', 'producto', 'cantidad', 'precio_unitario', 'subtotal',
+    ]
+
+    detalles = filtrar_rango(DetalleVenta.objects.all(), 'venta__fecha', desde, hasta)
+
+    filas = detalles.order_by('venta_id', 'pk').values_list(
+        'venta_id', 'venta__fecha', 'venta__usuario__username', 'venta__metodo_pago',
+        'venta__total', 'producto_id', 'producto__nombre', 'cantidad',
+        'precio_unitario', 'subtotal',
+    ).iterator(chunk_size=TAMANO_BLOQUE)
+
+    return encabezados, filas
+
+
+def exportar_servicios(desde=None, hasta=None):
+    """
+    Define la exportación de servicios cotizados y pagados.
+
+    Returns:
+        tuple: (encabezados, iterador de filas)
+    """
+    encabezados = [
+        'id', 'fecha_creacion', 'fecha_pago', 'estado', 'cliente', 'servicio',
+        'precio_servicio', 'precio_productos', 'precio_total',
+    ]
+
+    servicios = filtrar_rango(ServicioPagado.objects.all(), 'fecha_creacion', desde, hasta)
+
+    filas = servicios.order_by('pk').values_list(
+        'id', 'fecha_creacion', 'fecha_pago', 'estado', 'nombre_cliente',
+        'servicio__nombre', 'precio_servicio', 'precio_productos', 'precio_total',
+    ).iterator(chunk_size=TAMANO_BLOQUE)
+
+    return encabezados, filas
+
+
+# Registro de exportaciones disponibles (usado por vistas y comando)
+EXPORTACIONES = {
+    'productos': lambda desde=None, hasta=None: exportar_productos(),
+    'ventas': exportar_ventas,
+    'servicios': exportar_servicios,
+}
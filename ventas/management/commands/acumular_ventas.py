@@ -0,0 +1,31 @@
+"""
+Comando de administración: acumular_ventas
+
+Actualiza los acumulados de ventas por día/producto y por hora/cajero desde
+la marca de agua (ver ventas/acumulados.py). Pensado para ejecutarse
+periódicamente (ej. cron cada 15 minutos); la primera ejecución acumula
+todo el historial.
+
+USO:
+    python manage.py acumular_ventas
+"""
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from ventas.acumulados import acumular_ventas, fecha_marca
+
+
+class Command(BaseCommand):
+    """
+    Actualiza de forma incremental los acumulados de ventas.
+    """
+
+    help = 'Actualiza los acumulados de ventas (día/producto y hora/cajero) desde la marca de agua.'
+
+    def handle(self, *args, **options):
+        dias, horas = acumular_ventas()
+        self.stdout.write(self.style.SUCCESS(
+            f'Acumulados actualizados hasta {timezone.localtime(fecha_marca()):%Y-%m-%d %H:%M} '
+            f'({dias} filas por día, {horas} por hora).'
+        ))
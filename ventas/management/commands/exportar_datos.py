@@ -0,0 +1,58 @@
+"""
+Comando de administración: exportar_datos
+
+Exporta productos, ventas o servicios a CSV o XLSX leyendo la base de datos
+por bloques (memoria constante sin importar el tamaño del historial).
+
+USO:
+    python manage.py exportar_datos productos
+    python manage.py exportar_datos ventas --formato xlsx --desde 2025-01-01 --hasta 2025-12-31
+    python manage.py exportar_datos servicios --salida - > servicios.csv
+"""
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventario.exportacion import FORMATOS, escribir_exportacion
+from ventas.exportacion import EXPORTACIONES
+
+
+class Command(BaseCommand):
+    """
+    Exporta una tabla del sistema a un archivo CSV o XLSX.
+    """
+
+    help = 'Exporta productos, ventas o servicios a CSV o XLSX en streaming.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tipo', choices=sorted(EXPORTACIONES), help='Datos a exportar')
+        parser.add_argument('--formato', choices=sorted(FORMATOS), default='csv')
+        parser.add_argument(
+            '--salida',
+            help='Archivo de salida (default: <tipo>.<formato>; "-" para la salida estándar)',
+        )
+        parser.add_argument('--desde', help='Fecha inicial AAAA-MM-DD (ventas y servicios)')
+        parser.add_argument('--hasta', help='Fecha final AAAA-MM-DD (ventas y servicios)')
+
+    def handle(self, *args, **options):
+        tipo = options['tipo']
+        formato = options['formato']
+        salida = options['salida'] or f'{tipo}.{formato}'
+
+        try:
+            encabezados, filas = EXPORTACIONES[tipo](desde=options['desde'], hasta=options['hasta'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if salida == '-':
+            escribir_exportacion(sys.stdout.buffer, encabezados, filas, formato, titulo=tipo)
+            return
+
+        try:
+            with open(salida, 'wb') as archivo:
+                escribir_exportacion(archivo, encabezados, filas, formato, titulo=tipo)
+        except OSError as e:
+            raise CommandError(f'No se pudo escribir el archivo: {e}')
+
+        self.stdout.write(self.style.SUCCESS(f'Exportación guardada en {salida}'))
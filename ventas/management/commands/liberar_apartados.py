@@ -0,0 +1,28 @@
+"""
+Comando de administración: liberar_apartados
+
+Borra por lotes las reservas de stock vencidas (carritos del POS
+abandonados, ver ventas/carrito.py). Las reservas vencidas ya no cuentan
+contra el disponible; el barrido mantiene la tabla pequeña y actualiza la
+fotografía del catálogo. Pensado para ejecutarse periódicamente (ej. cron
+cada minuto).
+
+USO:
+    python manage.py liberar_apartados
+"""
+
+from django.core.management.base import BaseCommand
+
+from inventario.reservas import liberar_vencidas
+
+
+class Command(BaseCommand):
+    """
+    Libera las reservas de stock vencidas.
+    """
+
+    help = 'Borra por lotes las reservas de stock vencidas (carritos abandonados).'
+
+    def handle(self, *args, **options):
+        borradas = liberar_vencidas()
+        self.stdout.write(self.style.SUCCESS(f'Reservas vencidas liberadas: {borradas}.'))
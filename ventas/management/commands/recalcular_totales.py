@@ -0,0 +1,50 @@
+"""
+Comando de administración: recalcular_totales
+
+Corrige el total de las ventas que no coincide con la suma de sus detalles.
+Todas las ventas descuadradas se actualizan con un solo UPDATE basado en
+conjuntos, sin importar cuántas sean.
+
+USO:
+    python manage.py recalcular_totales
+    python manage.py recalcular_totales --desde 2025-01-01 --hasta 2025-01-31
+    python manage.py recalcular_totales --simular
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ventas.exportacion import filtrar_rango
+from ventas.models import Venta
+
+
+class Command(BaseCommand):
+    """
+    Recalcula en la base de datos el total de las ventas descuadradas.
+    """
+
+    help = 'Recalcula el total de las ventas a partir de sus detalles (un solo UPDATE).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help='Fecha inicial AAAA-MM-DD')
+        parser.add_argument('--hasta', help='Fecha final AAAA-MM-DD')
+        parser.add_argument(
+            '--simular',
+            action='store_true',
+            help='Solo cuenta las ventas descuadradas, sin modificarlas',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            ventas = filtrar_rango(Venta.objects.all(), 'fecha', options['desde'], options['hasta'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        descuadradas = ventas.descuadradas()
+
+        if options['simular']:
+            self.stdout.write(f'Ventas descuadradas: {descuadradas.count()}')
+            return
+
+        # UPDATE ... SET total = (SELECT SUM ...) WHERE id IN (ventas descuadradas)
+        actualizadas = Venta.objects.filter(pk__in=descuadradas.values('pk')).recalcular_totales()
+        self.stdout.write(self.style.SUCCESS(f'Ventas corregidas: {actualizadas}.'))
@@ -0,0 +1,32 @@
+"""
+MIGRACIÓN: 0003_detalleventa_producto_protect.py
+
+PROPÓSITO:
+    Protege el historial de ventas: un producto con ventas ya no puede
+    eliminarse en cascada (los productos ahora se archivan).
+
+CAMBIOS:
+    - DetalleVenta.producto: CASCADE → PROTECT
+"""
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Protección del historial de ventas.
+    """
+
+    dependencies = [
+        ('inventario', '0009_producto_activo'),
+        ('ventas', '0002_detalleventa_precio_unitario_venta_metodo_pago_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='detalleventa',
+            name='producto',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='inventario.producto'),
+        ),
+    ]
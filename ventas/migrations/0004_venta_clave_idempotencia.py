@@ -0,0 +1,30 @@
+"""
+MIGRACIÓN: 0004_venta_clave_idempotencia.py
+
+PROPÓSITO:
+    Permite reintentar el cobro de forma segura: el POS envía una clave
+    por cobro y el índice único impide registrar dos ventas con la misma.
+
+CAMBIOS:
+    - Venta.clave_idempotencia: CharField(64) nullable con índice único
+"""
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Clave de idempotencia de las ventas.
+    """
+
+    dependencies = [
+        ('ventas', '0003_detalleventa_producto_protect'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venta',
+            name='clave_idempotencia',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, unique=True),
+        ),
+    ]
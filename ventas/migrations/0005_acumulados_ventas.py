@@ -0,0 +1,66 @@
+"""
+MIGRACIÓN: 0005_acumulados_ventas.py
+
+PROPÓSITO:
+    Tablas de acumulados para reportes de ventas, actualizadas de forma
+    incremental por el comando acumular_ventas (la primera ejecución
+    acumula todo el historial).
+
+CAMBIOS:
+    - Nuevo modelo VentaDiaProducto: ventas por día y producto
+    - Nuevo modelo VentaHoraCajero: ventas por hora y cajero
+    - Nuevo modelo MarcaAcumulado: marca de agua de los acumulados
+"""
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Acumulados de ventas para reportes.
+    """
+
+    dependencies = [
+        ('inventario', '0009_producto_activo'),
+        ('ventas', '0004_venta_clave_idempotencia'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarcaAcumulado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True)),
+                ('fecha', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VentaDiaProducto',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField()),
+                ('cantidad', models.PositiveIntegerField(default=0)),
+                ('importe', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='inventario.producto')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('dia', 'producto'), name='acumulado_dia_producto_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VentaHoraCajero',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hora', models.DateTimeField()),
+                ('ventas', models.PositiveIntegerField(default=0)),
+                ('importe', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('usuario', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hora', 'usuario'], name='acumulado_hora_cajero_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+"""
+MIGRACIÓN: 0006_indices_reporte_ventas.py
+
+PROPÓSITO:
+    Índices para el reporte de ventas: un rango de fechas (ej. "este mes")
+    solo lee las ventas del rango aunque el historial abarque varios años.
+
+CAMBIOS:
+    - Índice venta_fecha_idx en Venta(fecha)
+    - Índice venta_usuario_fecha_idx en Venta(usuario, fecha)
+    - Índice detalle_producto_venta_idx en DetalleVenta(producto, venta)
+"""
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Índices del reporte de ventas.
+    """
+
+    dependencies = [
+        ('inventario', '0009_producto_activo'),
+        ('ventas', '0005_acumulados_ventas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='detalleventa',
+            index=models.Index(fields=['producto', 'venta'], name='detalle_producto_venta_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venta',
+            index=models.Index(fields=['fecha'], name='venta_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='venta',
+            index=models.Index(fields=['usuario', 'fecha'], name='venta_usuario_fecha_idx'),
+        ),
+    ]
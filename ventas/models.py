@@ -8,12 +8,79 @@ ventas y sus detalles.
 MODELOS:
 - Venta: Encabezado de la venta con información general
 - DetalleVenta: Líneas de detalle de productos vendidos
+- VentaDiaProducto / VentaHoraCajero: Acumulados para reportes
+- MarcaAcumulado: Hasta dónde están actualizados los acumulados
 """
 
-from django.db import models
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import F, Min, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from usuarios.models import Usuario
 from inventario.models import Producto
 
+# ==================== CONSULTAS: TOTALES DE VENTA ====================
+
+def total_detalles():
+    """
+    Subconsulta con la suma de los subtotales de cada venta (0 si no tiene detalles).
+    
+    Se usa como valor de un UPDATE o de una anotación, de modo que el total
+    se calcula en la base de datos sin traer los detalles a Python.
+    """
+    suma = (
+        DetalleVenta.objects.filter(venta=OuterRef('pk'))
+        .order_by()
+        .values('venta')
+        .annotate(suma=Sum('subtotal'))
+        .values('suma')
+    )
+    return Coalesce(
+        Subquery(suma), Value(Decimal('0')),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+    )
+
+
+class VentaQuerySet(models.QuerySet):
+    """
+    Consultas de ventas con el cálculo de totales basado en conjuntos.
+    """
+    
+    def recalcular_totales(self):
+        """
+        Recalcula el total de todas las ventas del QuerySet con un solo
+        UPDATE ... SET total = (SELECT SUM(subtotal) ...).
+        
+        Si alguna venta ya estaba incluida en los acumulados de reportes,
+        la marca de agua retrocede al inicio de su día para que se
+        reconstruyan (ver acumulados.retroceder_marca).
+        
+        Returns:
+            int: Número de ventas actualizadas
+        """
+        # Importación local: acumulados.py importa este módulo
+        from .acumulados import retroceder_marca
+        
+        with transaction.atomic(using=self.db):
+            # Antes del UPDATE: el QuerySet puede filtrar por el total descuadrado
+            primera = self.aggregate(primera=Min('fecha'))['primera']
+            actualizadas = self.update(total=total_detalles())
+            if actualizadas and primera is not None:
+                retroceder_marca(primera)
+        
+        return actualizadas
+    
+    def descuadradas(self):
+        """
+        Ventas cuyo total guardado no coincide con la suma de sus detalles.
+        Anotadas con 'total_calculado'.
+        """
+        return self.annotate(total_calculado=total_detalles()).exclude(
+            total=F('total_calculado')
+        )
+
+
 # ==================== MODELO: VENTA ====================
 
 class Venta(models.Model):
@@ -33,9 +100,14 @@ class Venta(models.Model):
     - fecha: Fecha y hora de la venta (auto-asignada)
     - total: Monto total de la venta (calculado desde detalles)
     - metodo_pago: Forma de pago (efectivo por defecto)
+    - clave_idempotencia: Clave única enviada por el POS (reintentos seguros)
     
     MÉTODOS:
-    - calcular_total(): Suma los subtotales de los detalles
+    - calcular_total(): Recalcula el total en la base de datos (un UPDATE)
+    
+    CONSULTAS:
+    - Venta.objects.recalcular_totales(): Recalcula el total de un QuerySet
+    - Venta.objects.descuadradas(): Ventas con total distinto a sus detalles
     
     USO:
         venta = Venta.objects.create(usuario=user, metodo_pago='efectivo')
@@ -61,30 +133,42 @@ class Venta(models.Model):
     # Método de pago utilizado
     metodo_pago = models.CharField(max_length=20, default='efectivo')
     
+    # Clave generada por el POS para cada cobro
+    # unique: un reintento (doble clic, red lenta) con la misma clave no puede
+    # crear una segunda venta; las ventas sin clave (NULL) no se restringen
+    clave_idempotencia = models.CharField(max_length=64, null=True, blank=True, unique=True, editable=False)
+    
+    objects = VentaQuerySet.as_manager()
+    
+    class Meta:
+        indexes = [
+            # Reportes, exportación y acumulados filtran por rango de fechas
+            models.Index(fields=['fecha'], name='venta_fecha_idx'),
+            # Reporte filtrado por cajero dentro de un rango de fechas
+            models.Index(fields=['usuario', 'fecha'], name='venta_usuario_fecha_idx'),
+        ]
+    
     def __str__(self):
         """Representación en string del modelo."""
         return f"Venta #{self.id} - ${self.total}"
     
     def calcular_total(self):
         """
-        Calcula el total de la venta sumando los subtotales de los detalles.
+        Recalcula el total de la venta a partir de sus detalles.
         
-        Este método recorre todos los DetalleVenta asociados, suma sus
-        subtotales, actualiza el campo total y guarda el objeto.
+        La suma se calcula en la base de datos con un único UPDATE que solo
+        escribe la columna total (ver VentaQuerySet.recalcular_totales), sin
+        cargar los detalles ni guardar el resto de los campos.
         
         Returns:
             Decimal: Total calculado de la venta
         """
-        # Sumar todos los subtotales de los detalles relacionados
-        total = sum(detalle.subtotal for detalle in self.detalles.all())
-        
-        # Actualizar el campo total
-        self.total = total
+        Venta.objects.filter(pk=self.pk).recalcular_totales()
         
-        # Guardar en la base de datos
-        self.save()
+        # Leer el total calculado por la base de datos
+        self.refresh_from_db(fields=['total'])
         
-        return total
+        return self.total
 
 # ==================== MODELO: DETALLE DE VENTA ====================
 
@@ -97,7 +181,7 @@ class DetalleVenta(models.Model):
     
     RELACIONES:
     - Venta: Venta a la que pertenece (CASCADE al eliminar)
-    - Producto: Producto vendido (CASCADE al eliminar)
+    - Producto: Producto vendido (PROTECT: los productos se archivan, no se eliminan)
     
     CAMPOS:
     - venta: Venta asociada
@@ -125,8 +209,9 @@ class DetalleVenta(models.Model):
     venta = models.ForeignKey(Venta, on_delete=models.CASCADE, related_name="detalles")
     
     # Producto vendido
-    # CASCADE: Si se elimina el producto, se elimina el detalle (cuidado en producción)
-    producto = models.ForeignKey(Producto, on_delete=models.CASCADE)
+    # PROTECT: Un producto con ventas no puede eliminarse físicamente; se archiva
+    # (Producto.activo=False) y el historial de ventas se conserva intacto
+    producto = models.ForeignKey(Producto, on_delete=models.PROTECT)
     
     # Cantidad de unidades vendidas (solo números positivos)
     cantidad = models.PositiveIntegerField()
@@ -138,6 +223,12 @@ class DetalleVenta(models.Model):
     # Subtotal de esta línea (cantidad × precio_unitario)
     # Se calcula automáticamente en save()
     subtotal = models.DecimalField(max_digits=10, decimal_places=2)
+    
+    class Meta:
+        indexes = [
+            # Ventas de un producto (reportes por producto)
+            models.Index(fields=['producto', 'venta'], name='detalle_producto_venta_idx'),
+        ]
 
     def __str__(self):
         """Representación en string del modelo."""
@@ -160,3 +251,75 @@ class DetalleVenta(models.Model):
         
         # Llamar al método save() original
         super().save(*args, **kwargs)
+
+
+# ==================== ACUMULADOS DE VENTAS (REPORTES) ====================
+
+class VentaDiaProducto(models.Model):
+    """
+    Acumulado de ventas por día (hora de México) y producto.
+    
+    Lo mantiene el comando acumular_ventas (ver ventas/acumulados.py); los
+    reportes leen estas filas en lugar de agrupar todo DetalleVenta.
+    
+    CAMPOS:
+    - dia: Día de la venta en America/Mexico_City
+    - producto: Producto vendido
+    - cantidad: Unidades vendidas en el día
+    - importe: Suma de los subtotales del día
+    """
+    
+    dia = models.DateField()
+    producto = models.ForeignKey(Producto, on_delete=models.PROTECT, related_name='+')
+    cantidad = models.PositiveIntegerField(default=0)
+    importe = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    class Meta:
+        constraints = [
+            # También es el índice para consultar rangos de días
+            models.UniqueConstraint(fields=['dia', 'producto'], name='acumulado_dia_producto_unico'),
+        ]
+    
+    def __str__(self):
+        """Representación en string del modelo."""
+        return f"{self.dia} - {self.producto_id}: {self.cantidad}"
+
+
+class VentaHoraCajero(models.Model):
+    """
+    Acumulado de ventas por hora (hora de México) y cajero.
+    
+    CAMPOS:
+    - hora: Inicio de la hora de las ventas
+    - usuario: Cajero que registró las ventas (null si se eliminó)
+    - ventas: Número de ventas en la hora
+    - importe: Suma de los totales de esas ventas
+    """
+    
+    hora = models.DateTimeField()
+    usuario = models.ForeignKey(Usuario, on_delete=models.SET_NULL, null=True, related_name='+')
+    ventas = models.PositiveIntegerField(default=0)
+    importe = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['hora', 'usuario'], name='acumulado_hora_cajero_idx'),
+        ]
+    
+    def __str__(self):
+        """Representación en string del modelo."""
+        return f"{self.hora} - {self.usuario_id}: {self.ventas}"
+
+
+class MarcaAcumulado(models.Model):
+    """
+    Marca de agua de los acumulados: todas las ventas con fecha anterior a
+    'fecha' ya están incluidas en VentaDiaProducto y VentaHoraCajero.
+    """
+    
+    nombre = models.CharField(max_length=50, unique=True)
+    fecha = models.DateTimeField()
+    
+    def __str__(self):
+        """Representación en string del modelo."""
+        return f"{self.nombre}: {self.fecha}"
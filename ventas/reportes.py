@@ -0,0 +1,208 @@
+"""
+Reporte de ventas con filtros por fechas, cajero y método de pago.
+
+El listado se pagina por cursor sobre (fecha, id) en orden descendente
+(paginar_por_fecha, también usada por el cobro de servicios),
+apoyado en los índices venta_fecha_idx y venta_usuario_fecha_idx, por lo
+que cada página lee solo las ventas que muestra. Los totales del rango se
+leen de los acumulados por hora y cajero (ver ventas/acumulados.py); solo
+al filtrar por método de pago se agregan directamente las ventas del rango.
+
+USO:
+    filtros = leer_filtros(request.GET)
+    ventas, siguiente = pagina_ventas(filtros, request.GET.get('despues'))
+    totales = totales_reporte(filtros)
+"""
+
+import base64
+import binascii
+import json
+
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .acumulados import ZONA_REPORTES, limites_dias, ventas_por_hora
+from .models import Venta
+
+# Número de ventas por página del reporte
+TAMANO_PAGINA_REPORTE = 50
+
+
+# ==================== FILTROS ====================
+
+def leer_filtros(parametros):
+    """
+    Valida los filtros del reporte enviados por GET.
+
+    Por defecto el reporte abarca el mes en curso (hora de México).
+
+    Args:
+        parametros (QueryDict): desde, hasta (AAAA-MM-DD), usuario (ID), metodo_pago
+
+    Returns:
+        dict: {desde, hasta, usuario, metodo_pago} (usuario y metodo_pago pueden ser None)
+
+    Raises:
+        ValueError: Si alguna fecha o el cajero son inválidos
+    """
+    hoy = timezone.localdate(timezone=ZONA_REPORTES)
+
+    def fecha(nombre, default):
+        valor = (parametros.get(nombre) or '').strip()
+        if not valor:
+            return default
+        try:
+            dia = parse_date(valor)
+        except ValueError:
+            dia = None
+        if dia is None:
+            raise ValueError(f'Fecha inválida: {valor}. Usa el formato AAAA-MM-DD.')
+        return dia
+
+    desde = fecha('desde', hoy.replace(day=1))
+    hasta = fecha('hasta', hoy)
+    if desde > hasta:
+        raise ValueError('La fecha inicial no puede ser posterior a la fecha final.')
+
+    usuario = (parametros.get('usuario') or '').strip()
+    if usuario:
+        try:
+            usuario = int(usuario)
+        except ValueError:
+            raise ValueError('Cajero inválido.')
+
+    return {
+        'desde': desde,
+        'hasta': hasta,
+        'usuario': usuario or None,
+        'metodo_pago': (parametros.get('metodo_pago') or '').strip() or None,
+    }
+
+
+def ventas_filtradas(filtros):
+    """
+    QuerySet de las ventas que cumplen los filtros (sin orden).
+    """
+    inicio, fin = limites_dias(filtros['desde'], filtros['hasta'])
+    ventas = Venta.objects.filter(fecha__gte=inicio, fecha__lt=fin)
+
+    if filtros['usuario']:
+        ventas = ventas.filter(usuario_id=filtros['usuario'])
+    if filtros['metodo_pago']:
+        ventas = ventas.filter(metodo_pago=filtros['metodo_pago'])
+
+    return ventas
+
+
+# ==================== PAGINACIÓN POR FECHA ====================
+
+def codificar_cursor(fecha, pk):
+    """
+    Genera el cursor que apunta a la fila (fecha, id) indicada (última de una página).
+    """
+    datos = json.dumps([fecha.isoformat(), pk])
+    return base64.urlsafe_b64encode(datos.encode('utf-8')).decode('ascii')
+
+
+def decodificar_cursor(cursor):
+    """
+    Obtiene (fecha, id) a partir de un cursor.
+
+    Returns:
+        tuple: (fecha, id) o None si el cursor está vacío o es inválido
+    """
+    if not cursor:
+        return None
+
+    try:
+        fecha, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        fecha = parse_datetime(fecha)
+        return (fecha, int(pk)) if fecha else None
+    except (binascii.Error, UnicodeError, ValueError, TypeError):
+        return None
+
+
+def paginar_por_fecha(queryset, campo, cursor=None, tamano=TAMANO_PAGINA_REPORTE):
+    """
+    Obtiene una página de un QuerySet ordenado por (campo, id) descendente.
+
+    Funciona con instancias o con diccionarios (.values() que incluya 'id').
+
+    Args:
+        queryset (QuerySet): Filas a paginar
+        campo (str): Campo DateTimeField del orden (ej. 'fecha')
+        cursor (str): Cursor de la página anterior (None para la primera página)
+        tamano (int): Filas por página
+
+    Returns:
+        tuple: (lista de filas, cursor de la siguiente página o None)
+    """
+    queryset = queryset.order_by(f'-{campo}', '-pk')
+
+    posicion = decodificar_cursor(cursor)
+    if posicion:
+        fecha, pk = posicion
+        # campo <= X delimita el rango del índice; el resto desempata por id
+        queryset = queryset.filter(
+            Q(**{f'{campo}__lte': fecha}) & (Q(**{f'{campo}__lt': fecha}) | Q(pk__lt=pk))
+        )
+
+    # Se pide una fila extra para saber si existe una página siguiente
+    filas = list(queryset[:tamano + 1])
+
+    siguiente = None
+    if len(filas) > tamano:
+        filas = filas[:tamano]
+        ultima = filas[-1]
+        if isinstance(ultima, dict):
+            siguiente = codificar_cursor(ultima[campo], ultima['id'])
+        else:
+            siguiente = codificar_cursor(getattr(ultima, campo), ultima.pk)
+
+    return filas, siguiente
+
+
+# ==================== REPORTE ====================
+
+def pagina_ventas(filtros, cursor=None, tamano=TAMANO_PAGINA_REPORTE):
+    """
+    Obtiene una página de ventas, de la más reciente a la más antigua.
+
+    Args:
+        filtros (dict): Filtros validados (ver leer_filtros)
+        cursor (str): Cursor de la página anterior (None para la primera página)
+        tamano (int): Ventas por página
+
+    Returns:
+        tuple: (lista de dicts {id, fecha, cajero, metodo_pago, total},
+                cursor de la siguiente página o None)
+    """
+    ventas = ventas_filtradas(filtros).values(
+        'id', 'fecha', 'metodo_pago', 'total', cajero=F('usuario__username')
+    )
+    return paginar_por_fecha(ventas, 'fecha', cursor, tamano)
+
+
+def totales_reporte(filtros):
+    """
+    Número de ventas e importe total del rango filtrado.
+
+    Sin filtro de método de pago, los totales se leen de los acumulados por
+    hora y cajero (costo proporcional al rango, no al historial).
+
+    Returns:
+        dict: {ventas, importe}
+    """
+    if filtros['metodo_pago']:
+        totales = ventas_filtradas(filtros).aggregate(ventas=Count('pk'), importe=Sum('total'))
+        return {'ventas': totales['ventas'], 'importe': totales['importe'] or 0}
+
+    filas = ventas_por_hora(filtros['desde'], filtros['hasta'])
+    if filtros['usuario']:
+        filas = [fila for fila in filas if fila['usuario_id'] == filtros['usuario']]
+
+    return {
+        'ventas': sum(fila['ventas'] for fila in filas),
+        'importe': sum(fila['importe'] for fila in filas),
+    }
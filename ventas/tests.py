@@ -0,0 +1,433 @@
+"""
+Pruebas del módulo de ventas.
+
+Cubren las reglas de cobro que dependen de la base de datos:
+- Descuento condicional de stock (sin sobreventa, todo o nada)
+- Idempotencia de los reintentos de cobro
+- Cobro de servicios por lote con resultado por ID
+- Reservas de stock de cotizaciones y apartados del carrito del POS
+
+Ejecutar con:
+    python manage.py test ventas
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from inventario.models import MovimientoStock, Producto, ReservaStock
+from inventario.reservas import StockInsuficienteError, descontar_stock, liberar_vencidas
+from servicios.cotizacion import crear_cotizacion
+from servicios.models import Servicio, ServicioPagado
+from usuarios.models import Usuario
+from . import checkout
+from .carrito import CarritoDesactualizadoError, apartar, lineas, quitar_vendidos
+from .checkout import procesar_venta
+from .cobro_servicios import NO_ENCONTRADO, PAGADO, YA_PAGADO, pagar_servicios
+from .models import DetalleVenta, Venta
+
+
+def crear_producto(nombre, stock, precio='100.00'):
+    return Producto.objects.create(nombre=nombre, precio=precio, cantidad_stock=stock)
+
+
+# ==================== COBRO DEL POS ====================
+
+class ProcesarVentaTests(TestCase):
+    """
+    Motor de cobro del POS (ventas.checkout.procesar_venta).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cajero = Usuario.objects.create_user(username='cajero', password='x')
+
+    def test_venta_descuenta_stock_y_registra_movimientos(self):
+        laptop = crear_producto('Laptop', 5, '1500.00')
+        mouse = crear_producto('Mouse', 10, '200.00')
+
+        venta = procesar_venta(self.cajero, [
+            {'producto_id': laptop.pk, 'cantidad': 2},
+            {'producto_id': mouse.pk, 'cantidad': 1},
+            {'producto_id': laptop.pk, 'cantidad': 1},
+        ])
+
+        laptop.refresh_from_db()
+        mouse.refresh_from_db()
+        self.assertEqual(laptop.cantidad_stock, 2)
+        self.assertEqual(mouse.cantidad_stock, 9)
+        self.assertEqual(str(venta.total), '4700.00')
+        self.assertEqual(venta.stock_restante, {laptop.pk: 2, mouse.pk: 9})
+        self.assertEqual(DetalleVenta.objects.filter(venta=venta).count(), 2)
+        self.assertEqual(
+            dict(MovimientoStock.objects.filter(tipo='venta').values_list('producto_id', 'cantidad')),
+            {laptop.pk: -3, mouse.pk: -1},
+        )
+
+    def test_sobreventa_rechazada_sin_cambios(self):
+        laptop = crear_producto('Laptop', 2)
+
+        with self.assertRaises(StockInsuficienteError):
+            procesar_venta(self.cajero, [{'producto_id': laptop.pk, 'cantidad': 3}])
+
+        laptop.refresh_from_db()
+        self.assertEqual(laptop.cantidad_stock, 2)
+        self.assertFalse(Venta.objects.exists())
+        self.assertFalse(MovimientoStock.objects.exists())
+
+    def test_un_producto_sin_stock_revierte_todo_el_carrito(self):
+        laptop = crear_producto('Laptop', 5)
+        mouse = crear_producto('Mouse', 1)
+
+        with self.assertRaises(StockInsuficienteError):
+            procesar_venta(self.cajero, [
+                {'producto_id': laptop.pk, 'cantidad': 1},
+                {'producto_id': mouse.pk, 'cantidad': 2},
+            ])
+
+        laptop.refresh_from_db()
+        self.assertEqual(laptop.cantidad_stock, 5)
+        self.assertFalse(Venta.objects.exists())
+
+    def test_producto_inexistente(self):
+        with self.assertRaises(ValueError):
+            procesar_venta(self.cajero, [{'producto_id': 999999, 'cantidad': 1}])
+
+    def test_update_condicional_no_descuenta_de_mas(self):
+        laptop = crear_producto('Laptop', 3)
+        mouse = crear_producto('Mouse', 3)
+
+        # El UPDATE alcanza solo a un producto: la transacción se revierte completa
+        with self.assertRaises(StockInsuficienteError):
+            with transaction.atomic():
+                descontar_stock({laptop.pk: 1, mouse.pk: 4})
+
+        self.assertEqual(
+            dict(Producto.objects.values_list('pk', 'cantidad_stock')),
+            {laptop.pk: 3, mouse.pk: 3},
+        )
+
+
+# ==================== IDEMPOTENCIA ====================
+
+class IdempotenciaVentaTests(TestCase):
+    """
+    Reintentos de cobro con la misma clave_idempotencia.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cajero = Usuario.objects.create_user(username='cajero', password='x')
+
+    def setUp(self):
+        self.laptop = crear_producto('Laptop', 5)
+        self.carrito = [{'producto_id': self.laptop.pk, 'cantidad': 2}]
+
+    def test_reintento_retorna_la_venta_original(self):
+        original = procesar_venta(self.cajero, self.carrito, clave_idempotencia='cobro-1')
+        reintento = procesar_venta(self.cajero, self.carrito, clave_idempotencia=' cobro-1 ')
+
+        self.assertFalse(original.repetida)
+        self.assertTrue(reintento.repetida)
+        self.assertEqual(reintento.pk, original.pk)
+        self.assertEqual(Venta.objects.count(), 1)
+        self.laptop.refresh_from_db()
+        self.assertEqual(self.laptop.cantidad_stock, 3)
+
+    def test_reintento_no_valida_stock(self):
+        procesar_venta(self.cajero, self.carrito, clave_idempotencia='cobro-1')
+        Producto.objects.filter(pk=self.laptop.pk).update(cantidad_stock=0)
+
+        reintento = procesar_venta(self.cajero, self.carrito, clave_idempotencia='cobro-1')
+
+        self.assertTrue(reintento.repetida)
+
+    def test_claves_distintas_registran_ventas_distintas(self):
+        procesar_venta(self.cajero, self.carrito, clave_idempotencia='cobro-1')
+        procesar_venta(self.cajero, self.carrito, clave_idempotencia='cobro-2')
+
+        self.assertEqual(Venta.objects.count(), 2)
+        self.laptop.refresh_from_db()
+        self.assertEqual(self.laptop.cantidad_stock, 1)
+
+    def test_carrera_resuelta_por_indice_unico(self):
+        original = procesar_venta(self.cajero, self.carrito, clave_idempotencia='cobro-1')
+
+        # Simula una petición concurrente que no vio la venta original en
+        # ninguna de sus búsquedas: el INSERT choca con el índice único
+        buscar = checkout.venta_por_clave
+        respuestas = iter([None, None])
+
+        def venta_por_clave(clave):
+            return next(respuestas, None) or buscar(clave)
+
+        with mock.patch.object(checkout, 'venta_por_clave', side_effect=venta_por_clave):
+            reintento = procesar_venta(self.cajero, self.carrito, clave_idempotencia='cobro-1')
+
+        self.assertTrue(reintento.repetida)
+        self.assertEqual(reintento.pk, original.pk)
+        self.assertEqual(Venta.objects.count(), 1)
+        self.assertEqual(DetalleVenta.objects.count(), 1)
+        self.laptop.refresh_from_db()
+        self.assertEqual(self.laptop.cantidad_stock, 3)
+
+    def test_clave_demasiado_larga(self):
+        with self.assertRaises(ValueError):
+            procesar_venta(self.cajero, self.carrito, clave_idempotencia='x' * 65)
+
+
+# ==================== COBRO DE SERVICIOS ====================
+
+class PagarServiciosTests(TestCase):
+    """
+    Cobro por lote de cotizaciones (ventas.cobro_servicios.pagar_servicios).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cajero = Usuario.objects.create_user(username='cajero', password='x')
+        cls.servicio = Servicio.objects.create(
+            nombre='Formateo', descripcion='Formateo e instalación', costo=Decimal('300.00')
+        )
+
+    def setUp(self):
+        self.disco = crear_producto('Disco SSD', 5, '900.00')
+        self.primera = crear_cotizacion(self.servicio, 'Ana', [
+            {'producto_id': self.disco.pk, 'cantidad': 1},
+        ])
+        self.segunda = crear_cotizacion(self.servicio, 'Luis', [
+            {'producto_id': self.disco.pk, 'cantidad': 2},
+        ])
+
+    def test_resultado_por_id(self):
+        pagar_servicios([self.primera.pk], self.cajero)
+
+        cobro = pagar_servicios([self.primera.pk, self.segunda.pk, 999999], self.cajero)
+
+        self.assertEqual(cobro['resultados'], {
+            self.primera.pk: YA_PAGADO,
+            self.segunda.pk: PAGADO,
+            999999: NO_ENCONTRADO,
+        })
+        self.assertEqual(cobro['pagados'], 1)
+        self.assertEqual(str(cobro['importe']), '2100.00')
+
+        self.segunda.refresh_from_db()
+        self.assertEqual(self.segunda.estado, 'pagado')
+        self.assertEqual(self.segunda.fecha_pago, cobro['fecha_pago'])
+
+    def test_pago_descuenta_stock_y_libera_reservas(self):
+        pagar_servicios([self.primera.pk, self.segunda.pk], self.cajero)
+
+        self.disco.refresh_from_db()
+        self.assertEqual(self.disco.cantidad_stock, 2)
+        self.assertFalse(ReservaStock.objects.filter(origen='servicio').exists())
+        self.assertEqual(
+            MovimientoStock.objects.filter(tipo='servicio', producto=self.disco).count(), 2
+        )
+
+    def test_reintento_no_descuenta_dos_veces(self):
+        pagar_servicios([self.primera.pk], self.cajero)
+        cobro = pagar_servicios([self.primera.pk], self.cajero)
+
+        self.assertEqual(cobro['resultados'], {self.primera.pk: YA_PAGADO})
+        self.disco.refresh_from_db()
+        self.assertEqual(self.disco.cantidad_stock, 4)
+
+    def test_sin_stock_no_se_paga_ningun_servicio(self):
+        # Ajuste de inventario posterior a las cotizaciones
+        Producto.objects.filter(pk=self.disco.pk).update(cantidad_stock=2)
+
+        with self.assertRaises(StockInsuficienteError):
+            pagar_servicios([self.primera.pk, self.segunda.pk], self.cajero)
+
+        self.assertEqual(
+            set(ServicioPagado.objects.values_list('estado', flat=True)), {'cotizado'}
+        )
+        self.disco.refresh_from_db()
+        self.assertEqual(self.disco.cantidad_stock, 2)
+        self.assertEqual(ReservaStock.objects.filter(origen='servicio').count(), 2)
+
+
+# ==================== RESERVAS DE COTIZACIONES ====================
+
+class ReservaCotizacionTests(TestCase):
+    """
+    Las refacciones cotizadas quedan apartadas y el POS no puede venderlas.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cajero = Usuario.objects.create_user(username='cajero', password='x')
+        cls.servicio = Servicio.objects.create(
+            nombre='Cambio de pantalla', descripcion='Pantalla de laptop', costo=Decimal('250.00')
+        )
+
+    def setUp(self):
+        self.pantalla = crear_producto('Pantalla 15"', 5, '1200.00')
+        self.cotizacion = crear_cotizacion(self.servicio, 'Ana', [
+            {'producto_id': self.pantalla.pk, 'cantidad': 3},
+        ])
+
+    def test_reserva_bloquea_la_venta(self):
+        with self.assertRaises(StockInsuficienteError):
+            procesar_venta(self.cajero, [{'producto_id': self.pantalla.pk, 'cantidad': 3}])
+
+        self.pantalla.refresh_from_db()
+        self.assertEqual(self.pantalla.cantidad_stock, 5)
+
+    def test_se_vende_solo_el_disponible(self):
+        venta = procesar_venta(self.cajero, [{'producto_id': self.pantalla.pk, 'cantidad': 2}])
+
+        self.assertEqual(venta.stock_restante, {self.pantalla.pk: 0})
+        self.pantalla.refresh_from_db()
+        self.assertEqual(self.pantalla.cantidad_stock, 3)
+
+    def test_reserva_bloquea_otra_cotizacion(self):
+        with self.assertRaises(StockInsuficienteError):
+            crear_cotizacion(self.servicio, 'Luis', [
+                {'producto_id': self.pantalla.pk, 'cantidad': 3},
+            ])
+
+        self.assertEqual(ServicioPagado.objects.count(), 1)
+
+    def test_pago_libera_la_reserva_y_descuenta(self):
+        pagar_servicios([self.cotizacion.pk], self.cajero)
+
+        self.assertFalse(ReservaStock.objects.exists())
+        self.pantalla.refresh_from_db()
+        self.assertEqual(self.pantalla.cantidad_stock, 2)
+
+        # Tras el pago el stock restante vuelve a estar disponible para el POS
+        procesar_venta(self.cajero, [{'producto_id': self.pantalla.pk, 'cantidad': 2}])
+
+
+# ==================== APARTADOS DEL CARRITO ====================
+
+class ApartadoCarritoTests(TestCase):
+    """
+    Apartados del carrito del POS entre cajeros concurrentes (ventas.carrito).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cajero = Usuario.objects.create_user(username='cajero', password='x')
+        cls.otro_cajero = Usuario.objects.create_user(username='otro', password='x')
+
+    def setUp(self):
+        self.mouse = crear_producto('Mouse', 5, '200.00')
+
+    def test_apartado_bloquea_a_otro_cajero(self):
+        resultado = apartar(self.cajero, self.mouse.pk, 4)
+        self.assertEqual(resultado['disponible'], 1)
+
+        with self.assertRaises(StockInsuficienteError):
+            apartar(self.otro_cajero, self.mouse.pk, 2)
+        with self.assertRaises(StockInsuficienteError):
+            procesar_venta(self.otro_cajero, [{'producto_id': self.mouse.pk, 'cantidad': 2}])
+
+    def test_cobro_del_propio_carrito_libera_sus_apartados(self):
+        apartar(self.cajero, self.mouse.pk, 4)
+
+        procesar_venta(self.cajero, [{'producto_id': self.mouse.pk, 'cantidad': 4}])
+
+        self.assertFalse(ReservaStock.objects.exists())
+        self.mouse.refresh_from_db()
+        self.assertEqual(self.mouse.cantidad_stock, 1)
+
+    def test_carrito_distinto_del_apartado_se_rechaza(self):
+        teclado = crear_producto('Teclado', 5)
+        apartar(self.cajero, self.mouse.pk, 2)
+
+        # Pestaña desactualizada: otra cantidad, u otra línea que no está apartada
+        for carrito in ([{'producto_id': self.mouse.pk, 'cantidad': 3}],
+                        [{'producto_id': self.mouse.pk, 'cantidad': 2},
+                         {'producto_id': teclado.pk, 'cantidad': 1}]):
+            with self.assertRaises(CarritoDesactualizadoError):
+                procesar_venta(self.cajero, carrito)
+
+        self.assertFalse(Venta.objects.exists())
+        self.assertEqual(lineas(self.cajero)[0]['cantidad'], 2)
+
+    def test_cobro_con_carrito_desactualizado_responde_409(self):
+        apartar(self.cajero, self.mouse.pk, 2)
+        self.client.force_login(self.cajero)
+
+        respuesta = self.client.post(reverse('ventas_registrar_venta'), {
+            'carrito_data': '[{"producto_id": %d, "cantidad": 1}]' % self.mouse.pk,
+            'clave_idempotencia': 'cobro-1',
+        })
+
+        self.assertEqual(respuesta.status_code, 409)
+        datos = respuesta.json()
+        self.assertTrue(datos['conflicto'])
+        self.assertEqual(
+            [(linea['producto_id'], linea['cantidad']) for linea in datos['carrito']],
+            [(self.mouse.pk, 2)],
+        )
+
+    def test_sin_apartados_vigentes_se_valida_el_disponible(self):
+        apartar(self.cajero, self.mouse.pk, 2)
+        ReservaStock.objects.update(expira=timezone.now() - timedelta(seconds=1))
+
+        procesar_venta(self.cajero, [{'producto_id': self.mouse.pk, 'cantidad': 3}])
+
+        self.mouse.refresh_from_db()
+        self.assertEqual(self.mouse.cantidad_stock, 2)
+
+    def test_cobro_borra_solo_las_lineas_vendidas(self):
+        teclado = crear_producto('Teclado', 5)
+        apartar(self.cajero, self.mouse.pk, 2)
+        apartar(self.cajero, teclado.pk, 1)
+
+        quitar_vendidos(self.cajero, [self.mouse.pk])
+
+        self.assertEqual(
+            [(linea['producto_id'], linea['cantidad']) for linea in lineas(self.cajero)],
+            [(teclado.pk, 1)],
+        )
+
+    def test_cantidad_cero_quita_la_linea(self):
+        apartar(self.cajero, self.mouse.pk, 4)
+        apartar(self.cajero, self.mouse.pk, 0)
+
+        self.assertEqual(lineas(self.cajero), [])
+        apartar(self.otro_cajero, self.mouse.pk, 5)
+
+    def test_apartado_vencido_deja_de_contar(self):
+        apartar(self.cajero, self.mouse.pk, 4)
+        ReservaStock.objects.update(expira=timezone.now() - timedelta(seconds=1))
+
+        self.assertEqual(lineas(self.cajero), [])
+        procesar_venta(self.otro_cajero, [{'producto_id': self.mouse.pk, 'cantidad': 5}])
+
+    def test_barrido_borra_solo_los_vencidos(self):
+        teclado = crear_producto('Teclado', 5)
+        apartar(self.cajero, self.mouse.pk, 2)
+        apartar(self.otro_cajero, teclado.pk, 1)
+        ReservaStock.objects.filter(documento=self.cajero.pk).update(
+            expira=timezone.now() - timedelta(seconds=1)
+        )
+
+        self.assertEqual(liberar_vencidas(tamano_lote=1), 1)
+        self.assertEqual(
+            list(ReservaStock.objects.values_list('producto_id', flat=True)), [teclado.pk]
+        )
+
+    def test_abrir_el_pos_conserva_el_carrito(self):
+        apartar(self.cajero, self.mouse.pk, 2)
+        self.client.force_login(self.cajero)
+
+        respuesta = self.client.get(reverse('ventas_cobrar_productos'))
+
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(ReservaStock.objects.count(), 1)
+        self.assertEqual(
+            [(linea['producto_id'], linea['cantidad']) for linea in respuesta.context['carrito']],
+            [(self.mouse.pk, 2)],
+        )
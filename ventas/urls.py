@@ -7,13 +7,28 @@ incluyendo punto de venta de productos y cobro de servicios.
 RUTAS DISPONIBLES:
 - '' (ventas): Página principal del módulo con opciones
 - cobrar-productos/: Punto de venta (POS) para productos
+- cobrar-productos/registrar/: API AJAX de cobro (ticket en JSON)
+- cobrar-productos/apartar/: API AJAX que aparta las líneas del carrito
 - cobrar-servicios/: Gestión y cobro de servicios
+- cobrar-servicios/<id>/detalle/: API AJAX con el detalle de un servicio
 - pagar-servicio/<id>/: Procesar pago de un servicio específico
-- buscar-producto/: API AJAX para búsqueda de productos
+- pagar-servicios/: API AJAX para cobrar varios servicios a la vez
+- buscar-producto/: API AJAX asíncrona para búsqueda de productos (ETag)
+- catalogo/: API AJAX con la fotografía versionada del catálogo
+- eventos/: Cambios de stock y cotizaciones en vivo (Server-Sent Events, ASGI)
+- reporte/: Historial de ventas con filtros y totales
+- reporte/datos/: API AJAX del reporte de ventas (JSON)
+- ticket/<id>/: Ticket de una venta en PDF
+- cotizacion/<id>/: Cotización o comprobante de un servicio en PDF
+- exportar/<tipo>/: Descarga de ventas o servicios en CSV/XLSX
 """
 
 from django.urls import path
-from .views import ventas_view, cobrar_productos, cobrar_servicios, buscar_producto, pagar_servicio
+from .views import (
+    ventas_view, cobrar_productos, registrar_venta, apartar_producto, cobrar_servicios, detalle_servicio,
+    buscar_producto, pagar_servicio, pagar_servicios_lote, catalogo, eventos, reporte_ventas,
+    reporte_ventas_datos, ticket_venta, cotizacion_servicio, exportar_datos
+)
 
 urlpatterns = [
     # Página principal de ventas (selector de opciones)
@@ -22,12 +37,43 @@ urlpatterns = [
     # Punto de venta para productos del inventario
     path('cobrar-productos/', cobrar_productos, name='ventas_cobrar_productos'),
     
+    # API AJAX de cobro del POS (retorna el ticket y el stock actualizado)
+    path('cobrar-productos/registrar/', registrar_venta, name='ventas_registrar_venta'),
+    
+    # API AJAX que aparta en el servidor las líneas del carrito (con vencimiento)
+    path('cobrar-productos/apartar/', apartar_producto, name='ventas_apartar_producto'),
+    
     # Gestión y cobro de servicios de reparación
     path('cobrar-servicios/', cobrar_servicios, name='ventas_cobrar_servicios'),
     
+    # API AJAX con el detalle de un servicio (se pide al abrir sus modales)
+    path('cobrar-servicios/<int:servicio_pagado_id>/detalle/', detalle_servicio, name='ventas_detalle_servicio'),
+    
     # Procesar el pago de un servicio cotizado
     path('pagar-servicio/<int:servicio_id>/', pagar_servicio, name='pagar_servicio'),
     
+    # API AJAX para cobrar varios servicios cotizados en un solo UPDATE
+    path('pagar-servicios/', pagar_servicios_lote, name='ventas_pagar_servicios'),
+    
     # API AJAX para búsqueda de productos (retorna JSON)
     path('buscar-producto/', buscar_producto, name='buscar_producto'),
+    
+    # API AJAX del catálogo versionado (¿cambió la versión N?)
+    path('catalogo/', catalogo, name='ventas_catalogo'),
+    
+    # Flujo SSE con los cambios de stock y de cotizaciones (una conexión por pantalla)
+    path('eventos/', eventos, name='ventas_eventos'),
+    
+    # Historial de ventas con filtros (fechas, cajero, método de pago) y totales
+    path('reporte/', reporte_ventas, name='ventas_reporte'),
+    
+    # API AJAX del reporte de ventas (retorna JSON)
+    path('reporte/datos/', reporte_ventas_datos, name='ventas_reporte_datos'),
+    
+    # Documentos PDF para imprimir (servidos desde la caché en reimpresiones)
+    path('ticket/<int:venta_id>/', ticket_venta, name='ventas_ticket'),
+    path('cotizacion/<int:servicio_pagado_id>/', cotizacion_servicio, name='ventas_cotizacion'),
+    
+    # Exportación en streaming de ventas o servicios (CSV/XLSX)
+    path('exportar/<str:tipo>/', exportar_datos, name='ventas_exportar'),
 ]
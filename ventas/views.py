@@ -9,21 +9,47 @@ Este módulo contiene todas las vistas para el sistema de ventas:
 VISTAS DISPONIBLES:
 - ventas_view: Página principal con opciones
 - cobrar_productos: Punto de venta para productos
+- registrar_venta: API AJAX de cobro (retorna el ticket en JSON)
 - buscar_producto: API AJAX para búsqueda
+- catalogo: API AJAX con la fotografía versionada del catálogo
 - cobrar_servicios: Gestión de servicios cotizados/pagados
+- detalle_servicio: API AJAX con el detalle de un servicio (modales)
 - pagar_servicio: Procesar pago de servicio
+- pagar_servicios_lote: API AJAX para cobrar varios servicios a la vez
+- reporte_ventas: Historial de ventas con filtros, paginado y totales
+- reporte_ventas_datos: API AJAX del reporte de ventas (JSON)
+- ticket_venta / cotizacion_servicio: Documentos PDF para imprimir
+- exportar_datos: Descarga de ventas/servicios en CSV o XLSX
 """
 
-from django.shortcuts import render, redirect, get_object_or_404
+from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse
-from django.db import transaction
+from django.http import HttpResponse, JsonResponse, Http404, StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
 from inventario.models import Producto
-from servicios.models import ServicioPagado
-from .models import Venta, DetalleVenta
+from inventario.busqueda import buscar_productos
+from inventario.catalogo import (
+    abuscar_en_catalogo, aestado_catalogo, agregar_validadores, condicion_catalogo,
+    obtener_catalogo, version_catalogo,
+)
+from inventario.eventos import flujo_sse
+from inventario.reservas import anotar_disponible
+from servicios.models import ProductoServicioPagado, Servicio, ServicioPagado
+from usuarios.models import Usuario
+from .carrito import CarritoDesactualizadoError, apartar, lineas, vaciar
+from .checkout import procesar_venta
+from .cobro_servicios import NO_ENCONTRADO, YA_PAGADO, leer_ids, pagar_servicios
+from .exportacion import exportar_ventas, exportar_servicios
+from .reportes import leer_filtros, pagina_ventas, paginar_por_fecha, totales_reporte
+from .documentos import cotizacion_pdf, ticket_venta_pdf
+from inventario.exportacion import respuesta_exportacion
 import json
+import uuid
+
+# Servicios por página en el cobro de servicios
+TAMANO_PAGINA_SERVICIOS = 25
 
 # ==================== VISTA PRINCIPAL ====================
 
@@ -54,27 +80,30 @@ def cobrar_productos(request):
     """
     Vista del Punto de Venta (POS) para cobrar productos.
     
-    GET: Muestra la interfaz del punto de venta con productos disponibles
+    GET: Muestra la interfaz del punto de venta con productos disponibles y
+         el carrito que el cajero tiene apartado (sin modificarlo)
     POST: Procesa la venta del carrito de productos
     
     FLUJO POST:
     1. Recibe datos del carrito en JSON
-    2. Valida stock disponible de cada producto
-    3. Crea la Venta y sus DetalleVenta
-    4. Actualiza el stock de productos
-    5. Calcula y guarda el total
+    2. Delega el cobro al motor de ventas (ventas.checkout.procesar_venta)
+       junto con la clave de idempotencia del formulario
+    3. Muestra el resultado y redirige al POS
     
     CARACTERÍSTICAS:
     - Transacción atómica para integridad de datos
-    - Validación de stock antes de procesar
-    - Actualización automática de inventario
-    - Sistema de carrito con múltiples productos
+    - Bloqueo de productos en orden de ID (sin sobreventa entre cajeros)
+    - Descuento de stock con un solo UPDATE condicional
+    - Número fijo de consultas sin importar el tamaño del carrito
+    - Reintentos seguros: cada carga del POS genera una clave de
+      idempotencia; reenviar el mismo cobro (doble clic, reintento de la
+      red) retorna la venta original sin descontar stock otra vez
     
     PERMISOS:
     - Requiere autenticación (@login_required)
     
     Args:
-        request: Objeto HttpRequest con carrito_data en POST
+        request: Objeto HttpRequest con carrito_data y clave_idempotencia en POST
         
     Returns:
         HttpResponse: Template del POS o redirección después de venta
@@ -91,57 +120,29 @@ def cobrar_productos(request):
                 messages.error(request, 'El carrito está vacío.')
                 return redirect('ventas_cobrar_productos')
             
-            # Crear la venta con transacción atómica
+            # Procesar la venta completa (bloqueo, descuento de stock y detalles)
             # Si algo falla, se revierte toda la operación
-            with transaction.atomic():
-                # Crear el encabezado de la venta
-                venta = Venta.objects.create(
-                    usuario=request.user,
-                    metodo_pago='efectivo'  # Por ahora solo efectivo
-                )
-                
-                total_venta = 0
-                
-                # Procesar cada item del carrito
-                for item in carrito:
-                    # Obtener el producto o retornar 404
-                    producto = get_object_or_404(Producto, id=item['producto_id'])
-                    cantidad = int(item['cantidad'])
-                    
-                    # Verificar stock disponible
-                    if producto.cantidad_stock < cantidad:
-                        raise ValueError(
-                            f'Stock insuficiente para {producto.nombre}. '
-                            f'Disponible: {producto.cantidad_stock}'
-                        )
-                    
-                    # Crear detalle de venta
-                    # El subtotal se calcula automáticamente en save()
-                    detalle = DetalleVenta.objects.create(
-                        venta=venta,
-                        producto=producto,
-                        cantidad=cantidad,
-                        precio_unitario=producto.precio,
-                        subtotal=cantidad * producto.precio
-                    )
-                    
-                    # Actualizar stock del producto (restar cantidad vendida)
-                    producto.cantidad_stock -= cantidad
-                    producto.save()
-                    
-                    # Acumular total de la venta
-                    total_venta += detalle.subtotal
-                
-                # Actualizar el total de la venta
-                venta.total = total_venta
-                venta.save()
-                
-                # Mensaje de éxito
-                messages.success(
-                    request, 
-                    f'Venta #{venta.id} realizada con éxito. Total: ${total_venta:.2f}'
+            venta = procesar_venta(
+                request.user,
+                carrito,
+                metodo_pago='efectivo',  # Por ahora solo efectivo
+                clave_idempotencia=request.POST.get('clave_idempotencia'),
+            )
+            
+            if venta.repetida:
+                # Reintento del mismo cobro: no se registró nada nuevo
+                messages.info(
+                    request,
+                    f'La venta #{venta.id} ya estaba registrada. Total: ${venta.total:.2f}'
                 )
                 return redirect('ventas_cobrar_productos')
+            
+            # Mensaje de éxito
+            messages.success(
+                request, 
+                f'Venta #{venta.id} realizada con éxito. Total: ${venta.total:.2f}'
+            )
+            return redirect('ventas_cobrar_productos')
                 
         except ValueError as e:
             # Error de validación (stock insuficiente, etc.)
@@ -153,29 +154,199 @@ def cobrar_productos(request):
             return redirect('ventas_cobrar_productos')
     
     # GET request - mostrar el formulario del punto de venta
-    # Filtrar solo productos con stock disponible
-    productos = Producto.objects.filter(cantidad_stock__gt=0).order_by('nombre')
+    # Productos con stock disponible desde la fotografía del catálogo en caché
+    version, productos = obtener_catalogo()
     
     return render(request, 'ventas/cobrar_productos.html', {
-        'productos': productos
+        'productos': productos,
+        'version_catalogo': version,
+        # Líneas que el cajero ya tiene apartadas (otra pestaña o recarga):
+        # abrir el POS no libera nada, solo muestra el carrito del servidor
+        'carrito': lineas(request.user),
+        # Clave de idempotencia del próximo cobro (una por carga del POS)
+        'clave_idempotencia': uuid.uuid4().hex
+    })
+
+# ==================== API AJAX: COBRO DEL POS ====================
+
+@login_required
+def registrar_venta(request):
+    """
+    Vista AJAX que cobra el carrito del POS y retorna el ticket en JSON.
+    
+    Recibe los mismos campos que el formulario de cobrar_productos, pero en
+    lugar de redirigir (y volver a renderizar todo el catálogo) responde con
+    la venta y el stock actualizado de los productos vendidos, para que
+    cobrar_productos.js actualice la página en su lugar.
+    
+    PARÁMETROS POST:
+    - carrito_data: JSON con array de productos [{producto_id, cantidad}, ...]
+    - clave_idempotencia: Clave única del cobro
+    
+    RESPUESTA JSON:
+    {
+        "success": true,
+        "repetida": false,
+        "venta": {"id": 12, "total": "450.00", "fecha": "2025-01-31T18:20:00-06:00"},
+        "productos": [{"id": 1, "disponible": 3}, ...],
+        "clave_idempotencia": "...",  # Clave para el siguiente cobro
+        "ticket_url": "/ventas/ticket/12/"
+    }
+    Error: {"success": false, "error": "..."} con estado 400 o 500
+    Carrito distinto del apartado (otra pestaña lo cambió), estado 409:
+    {"success": false, "conflicto": true, "error": "...", "carrito": [...]}
+    con las líneas apartadas vigentes para que el POS las muestre
+    
+    PERMISOS:
+    - Requiere autenticación (@login_required)
+    
+    Args:
+        request: Objeto HttpRequest con carrito_data y clave_idempotencia en POST
+        
+    Returns:
+        JsonResponse: Ticket de la venta o error
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Método no permitido'}, status=405)
+    
+    try:
+        carrito = json.loads(request.POST.get('carrito_data', '[]'))
+        
+        if not carrito:
+            return JsonResponse({'success': False, 'error': 'El carrito está vacío.'}, status=400)
+        
+        venta = procesar_venta(
+            request.user,
+            carrito,
+            metodo_pago='efectivo',  # Por ahora solo efectivo
+            clave_idempotencia=request.POST.get('clave_idempotencia'),
+        )
+    except CarritoDesactualizadoError as e:
+        return JsonResponse({
+            'success': False,
+            'conflicto': True,
+            'error': str(e),
+            'carrito': lineas(request.user),
+        }, status=409)
+    except ValueError as e:
+        # Error de validación (stock insuficiente, carrito inválido, etc.)
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse(
+            {'success': False, 'error': f'Error al procesar la venta: {str(e)}'}, status=500
+        )
+    
+    # Stock disponible vigente solo de los productos vendidos
+    # (una venta nueva lo trae calculado con las filas bloqueadas)
+    stock = getattr(venta, 'stock_restante', None)
+    if stock is None:
+        stock = dict(
+            anotar_disponible(Producto.todos.filter(detalleventa__venta=venta))
+            .values_list('id', 'disponible')
+        )
+    
+    return JsonResponse({
+        'success': True,
+        'repetida': venta.repetida,
+        'venta': {
+            'id': venta.id,
+            'total': f'{venta.total:.2f}',
+            'fecha': timezone.localtime(venta.fecha).isoformat(),
+        },
+        'productos': [
+            {'id': pk, 'disponible': cantidad} for pk, cantidad in stock.items()
+        ],
+        'clave_idempotencia': uuid.uuid4().hex,
+        'ticket_url': reverse('ventas_ticket', args=[venta.id]),
+    })
+
+# ==================== API AJAX: APARTADO DEL CARRITO ====================
+
+@login_required
+def apartar_producto(request):
+    """
+    Vista AJAX que aparta en el servidor una línea del carrito del POS.
+    
+    El POS la llama cada vez que agrega, cambia o quita un producto del
+    carrito, para que el stock se valide al momento y no al cobrar
+    (ver ventas/carrito.py). Cada llamada renueva el apartado de todo el
+    carrito por DURACION_APARTADO.
+    
+    PARÁMETROS POST:
+    - producto_id y cantidad: Cantidad total de la línea (0 la quita)
+    - vaciar: Si se envía, libera todo el carrito
+    
+    RESPUESTA JSON:
+    {
+        "success": true,
+        "producto_id": 1,
+        "apartado": 2,       # Cantidad apartada de la línea
+        "disponible": 3,     # Disponible restante para los demás
+        "expira": "..."
+    }
+    Error: {"success": false, "error": "..."} con estado 400 o 500
+    
+    PERMISOS:
+    - Requiere autenticación (@login_required)
+    - Solo acepta método POST
+    
+    Args:
+        request: Objeto HttpRequest con producto_id y cantidad en POST
+        
+    Returns:
+        JsonResponse: Cantidad apartada y disponible del producto, o error
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Método no permitido'}, status=405)
+    
+    if request.POST.get('vaciar'):
+        vaciar(request.user)
+        return JsonResponse({'success': True})
+    
+    try:
+        producto_id = int(request.POST.get('producto_id', ''))
+        cantidad = int(request.POST.get('cantidad', ''))
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'Producto o cantidad inválidos.'}, status=400)
+    
+    try:
+        resultado = apartar(request.user, producto_id, cantidad)
+    except ValueError as e:
+        # Stock insuficiente o producto inexistente
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse(
+            {'success': False, 'error': f'Error al apartar el producto: {str(e)}'}, status=500
+        )
+    
+    return JsonResponse({
+        'success': True,
+        'producto_id': producto_id,
+        'apartado': resultado['apartado'],
+        'disponible': resultado['disponible'],
+        'expira': timezone.localtime(resultado['expira']).isoformat(),
     })
 
 # ==================== API AJAX: BÚSQUEDA DE PRODUCTOS ====================
 
 @login_required
-def buscar_producto(request):
+async def buscar_producto(request):
     """
-    Vista AJAX para buscar productos por nombre.
+    Vista AJAX asíncrona para buscar productos por nombre.
     
     Proporciona una API para búsqueda en tiempo real de productos
     desde el punto de venta. Retorna datos en formato JSON.
     
+    Es asíncrona (ORM y caché asíncronos): bajo un servidor ASGI cada
+    tecla de cada terminal espera la consulta sin ocupar un hilo.
+    
     PARÁMETROS GET:
     - q: Término de búsqueda (mínimo 2 caracteres)
     
     FILTROS:
-    - Nombre contiene el término (case-insensitive)
+    - Nombre o descripción contienen el término (búsqueda indexada)
     - Solo productos con stock disponible
+    - Ordenados por relevancia
     - Máximo 10 resultados
     
     RESPUESTA JSON:
@@ -185,12 +356,17 @@ def buscar_producto(request):
                 "id": 1,
                 "nombre": "Laptop HP",
                 "precio": "15000.00",
-                "cantidad_stock": 5
+                "cantidad_stock": 5,
+                "disponible": 4
             },
             ...
         ]
     }
     
+    CACHÉ HTTP:
+    - ETag / Last-Modified con la versión del catálogo; si el cliente ya
+      tiene la versión actual recibe un 304 sin consultar la base de datos
+    
     PERMISOS:
     - Requiere autenticación (@login_required)
     
@@ -207,16 +383,97 @@ def buscar_producto(request):
     if len(query) < 2:
         return JsonResponse({'productos': []})
     
-    # Buscar productos que coincidan con el término
-    # __icontains: búsqueda case-insensitive que contiene el término
-    # cantidad_stock__gt=0: solo productos con stock disponible
-    productos = Producto.objects.filter(
-        nombre__icontains=query,
-        cantidad_stock__gt=0
-    ).values('id', 'nombre', 'precio', 'cantidad_stock')[:10]
+    # El cliente ya tiene esta búsqueda con la versión actual del catálogo
+    version, modificado = await aestado_catalogo()
+    no_modificado = condicion_catalogo(request, version, modificado)
+    if no_modificado is not None:
+        return no_modificado
+    
+    async def buscar():
+        # Productos que coinciden con el término, ordenados por relevancia
+        # disponible__gt=0: solo productos con stock que no esté apartado
+        productos = buscar_productos(
+            query,
+            anotar_disponible(Producto.objects.filter(cantidad_stock__gt=0)).filter(disponible__gt=0)
+        ).values('id', 'nombre', 'precio', 'cantidad_stock', 'disponible')[:10]
+        return [producto async for producto in productos]
+    
+    # El resultado se guarda en caché con la versión del catálogo
+    productos = await abuscar_en_catalogo(query, buscar, version)
     
     # Retornar JSON con la lista de productos
-    return JsonResponse({'productos': list(productos)})
+    return agregar_validadores(JsonResponse({'productos': productos}), version, modificado)
+
+
+# ==================== API AJAX: CATÁLOGO VERSIONADO ====================
+
+@login_required
+def catalogo(request):
+    """
+    Vista AJAX con la fotografía del catálogo de productos con stock.
+    
+    Permite a las pantallas abiertas (POS, cotización) saber si el catálogo
+    cambió con una sola lectura de la caché, y descargarlo solo si cambió.
+    
+    PARÁMETROS GET:
+    - version: Versión que tiene el cliente (opcional)
+    
+    RESPUESTA JSON:
+    - Si la versión no cambió: {"version": N, "cambio": false}
+    - Si cambió (o no se indicó): {"version": M, "cambio": true, "productos": [...]}
+    
+    PERMISOS:
+    - Requiere autenticación (@login_required)
+    
+    Args:
+        request: Objeto HttpRequest con parámetro 'version' opcional
+        
+    Returns:
+        JsonResponse: Versión actual y, si cambió, la lista de productos
+    """
+    version = version_catalogo()
+    
+    if request.GET.get('version') == str(version):
+        return JsonResponse({'version': version, 'cambio': False})
+    
+    version, productos = obtener_catalogo()
+    return JsonResponse({'version': version, 'cambio': True, 'productos': productos})
+
+# ==================== EVENTOS EN VIVO (SSE) ====================
+
+@login_required
+async def eventos(request):
+    """
+    Vista asíncrona con los cambios de stock y de cotizaciones en vivo.
+    
+    Cada pantalla (POS, cobro de servicios) abre una sola conexión
+    Server-Sent Events de larga duración y recibe solo los cambios, en
+    lugar de recargar la página (ver inventario/eventos.py). Requiere un
+    servidor ASGI (uvicorn TodoLap.asgi:application).
+    
+    MENSAJES (campo data, JSON):
+    - {"stock": {"12": 3}}: Disponible actual de cada producto modificado
+    - {"servicios": {"7": "pagado"}}: Nuevo estado de cada cotización
+    - {"recargar": true}: Se perdieron eventos; resincronizar con /ventas/catalogo/
+    
+    PERMISOS:
+    - Requiere autenticación (@login_required)
+    
+    Args:
+        request: Objeto HttpRequest
+        
+    Returns:
+        StreamingHttpResponse: Flujo text/event-stream
+    """
+    return StreamingHttpResponse(
+        flujo_sse(),
+        content_type='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            # Evita que nginx acumule los eventos en su búfer
+            'X-Accel-Buffering': 'no',
+        },
+    )
 
 # ==================== COBRO DE SERVICIOS ====================
 
@@ -232,6 +489,7 @@ def cobrar_servicios(request):
     PARÁMETROS GET:
     - mostrar: 'cotizados' o 'pagados' (default: 'cotizados')
     - q: Término de búsqueda por cliente o servicio
+    - despues: Cursor de la página (paginación por fecha, ver ventas/reportes.py)
     
     FUNCIONALIDADES:
     - Filtrado por estado (cotizado/pagado)
@@ -239,6 +497,13 @@ def cobrar_servicios(request):
     - Vista de detalles de cada servicio
     - Botón para procesar pago de servicios cotizados
     
+    RENDIMIENTO:
+    - Servicio y técnico se obtienen en la misma consulta (select_related)
+    - La página solo lleva las filas: el detalle (con productos utilizados)
+      se pide a detalle_servicio al abrir el modal
+    - El total se cuenta una vez en la vista; la página se lee por cursor
+    - Número de consultas constante, sin importar cuántos servicios haya
+    
     PERMISOS:
     - Requiere autenticación (@login_required)
     
@@ -250,38 +515,119 @@ def cobrar_servicios(request):
     """
     # Obtener el filtro de estado (cotizado o pagado)
     mostrar = request.GET.get('mostrar', 'cotizados')  # Default: cotizados
-    query = request.GET.get('q', '')  # Término de búsqueda
+    query = request.GET.get('q', '').strip()  # Término de búsqueda
     
     # Filtrar según el estado seleccionado
     if mostrar == 'pagados':
         # Mostrar servicios ya pagados (historial)
-        servicios = ServicioPagado.objects.filter(
-            estado='pagado'
-        ).select_related('servicio').order_by('-fecha_pago')
+        servicios = ServicioPagado.objects.filter(estado='pagado')
+        campo_fecha = 'fecha_pago'
     else:
         # Mostrar servicios cotizados pendientes de pago
-        servicios = ServicioPagado.objects.filter(
-            estado='cotizado'
-        ).select_related('servicio').order_by('-fecha_creacion')
+        servicios = ServicioPagado.objects.filter(estado='cotizado')
+        campo_fecha = 'fecha_creacion'
     
     # Filtrar por búsqueda si existe un término
     if query:
-        # Buscar por nombre de cliente O por nombre del servicio
-        servicios = servicios.filter(
-            nombre_cliente__icontains=query
-        ) | servicios.filter(
-            servicio__nombre__icontains=query
-        )
+        # Buscar por nombre de cliente O por nombre del servicio: un OR entre
+        # columnas de dos tablas no puede usar índices (recorre toda la tabla);
+        # la UNION de dos subconsultas usa el índice de trigramas de cada lado
+        # (servicio_cliente_trgm y servicio_nombre_trgm)
+        por_cliente = ServicioPagado.objects.filter(nombre_cliente__icontains=query).values('pk')
+        por_servicio = ServicioPagado.objects.filter(
+            servicio__in=Servicio.todos.filter(nombre__icontains=query)
+        ).values('pk')
+        servicios = servicios.filter(pk__in=por_cliente.union(por_servicio))
+    
+    # Contar una sola vez (el template no vuelve a consultar)
+    total = servicios.count()
+    
+    servicios = servicios.select_related('servicio__tecnico')
+    servicios, siguiente = paginar_por_fecha(
+        servicios, campo_fecha, request.GET.get('despues'), TAMANO_PAGINA_SERVICIOS
+    )
     
     # Preparar contexto para el template
     context = {
         'servicios': servicios,
+        'total': total,
+        'siguiente': siguiente,
         'query': query,
         'mostrar': mostrar  # Para mantener el tab activo
     }
     
     return render(request, 'ventas/cobrar_servicios.html', context)
 
+@login_required
+def detalle_servicio(request, servicio_pagado_id):
+    """
+    Vista AJAX con el detalle de un servicio cotizado o pagado.
+    
+    La pantalla de cobro de servicios la pide al abrir los modales de
+    detalle o de pago (y la guarda en el navegador), en lugar de incluir
+    el detalle de cada servicio en el HTML de la lista.
+    
+    RESPUESTA JSON:
+    {
+        "success": true,
+        "servicio": {"id": 7, "nombre_cliente": "...", "servicio": "...", "descripcion": "...",
+                     "tecnico": "... o null", "estado": "cotizado", "estado_display": "Cotizado",
+                     "precio_servicio": "300.00", "precio_productos": "150.00", "precio_total": "450.00",
+                     "fecha_creacion": "...", "fecha_pago": "... o null"},
+        "productos": [{"nombre": "...", "cantidad": 2, "precio_unitario": "75.00", "subtotal": "150.00"}, ...]
+    }
+    Error: {"success": false, "error": "..."} con estado 404
+    
+    PERMISOS:
+    - Requiere autenticación (@login_required)
+    
+    Args:
+        request: Objeto HttpRequest
+        servicio_pagado_id (int): ID del ServicioPagado
+        
+    Returns:
+        JsonResponse: Detalle del servicio o error
+    """
+    servicio_pagado = ServicioPagado.objects.select_related('servicio__tecnico').filter(
+        pk=servicio_pagado_id
+    ).first()
+    if servicio_pagado is None:
+        return JsonResponse({'success': False, 'error': 'Servicio no encontrado'}, status=404)
+    
+    productos = ProductoServicioPagado.objects.filter(
+        servicio_pagado_id=servicio_pagado_id
+    ).order_by('pk').values_list('producto__nombre', 'cantidad', 'precio_unitario')
+    
+    tecnico = servicio_pagado.servicio.tecnico
+    fecha_pago = servicio_pagado.fecha_pago
+    
+    return JsonResponse({
+        'success': True,
+        'servicio': {
+            'id': servicio_pagado.id,
+            'nombre_cliente': servicio_pagado.nombre_cliente,
+            'servicio': servicio_pagado.servicio.nombre,
+            'descripcion': servicio_pagado.servicio.descripcion,
+            'tecnico': tecnico.get_full_name() if tecnico else None,
+            'estado': servicio_pagado.estado,
+            'estado_display': servicio_pagado.get_estado_display(),
+            'precio_servicio': f'{servicio_pagado.precio_servicio:.2f}',
+            'precio_productos': f'{servicio_pagado.precio_productos:.2f}',
+            'precio_total': f'{servicio_pagado.precio_total:.2f}',
+            'fecha_creacion': timezone.localtime(servicio_pagado.fecha_creacion).strftime('%d/%m/%Y %H:%M'),
+            'fecha_pago': timezone.localtime(fecha_pago).strftime('%d/%m/%Y %H:%M') if fecha_pago else None,
+        },
+        'productos': [
+            {
+                'nombre': nombre,
+                'cantidad': cantidad,
+                'precio_unitario': f'{precio:.2f}',
+                'subtotal': f'{cantidad * precio:.2f}',
+            }
+            for nombre, cantidad, precio in productos
+        ],
+    })
+
 # ==================== PROCESAR PAGO DE SERVICIO ====================
 
 @login_required
@@ -290,18 +636,17 @@ def pagar_servicio(request, servicio_id):
     Vista para procesar el pago de un servicio cotizado.
     
     Cambia el estado de un servicio de 'cotizado' a 'pagado' y
-    registra la fecha de pago.
+    registra la fecha de pago (ver ventas/cobro_servicios.py).
     
     FLUJO:
-    1. Valida que el servicio exista y esté en estado 'cotizado'
-    2. Cambia el estado a 'pagado'
-    3. Registra la fecha y hora del pago
-    4. Guarda los cambios
-    5. Muestra mensaje de confirmación
+    1. Marca el servicio como pagado solo si sigue en estado 'cotizado'
+    2. Registra la fecha y hora del pago
+    3. Descuenta del inventario los productos del servicio (y libera su reserva)
+    4. Muestra mensaje de confirmación (o de que ya estaba pagado)
     
     SEGURIDAD:
     - Solo procesa servicios en estado 'cotizado'
-    - Usa transacción atómica para integridad
+    - UPDATE condicional en una transacción atómica (no se cobra dos veces)
     
     PERMISOS:
     - Requiere autenticación (@login_required)
@@ -316,33 +661,26 @@ def pagar_servicio(request, servicio_id):
     """
     if request.method == 'POST':
         try:
-            # Usar transacción atómica para integridad de datos
-            with transaction.atomic():
-                # Obtener el servicio cotizado o retornar 404
-                # Solo permite servicios en estado 'cotizado'
-                servicio_pagado = get_object_or_404(
-                    ServicioPagado, 
-                    id=servicio_id, 
-                    estado='cotizado'
-                )
-                
-                # Actualizar el estado a pagado
-                servicio_pagado.estado = 'pagado'
-                
-                # Registrar fecha y hora del pago
-                servicio_pagado.fecha_pago = timezone.now()
-                
-                # Guardar cambios en la base de datos
-                servicio_pagado.save()
-                
+            resultado = pagar_servicios([servicio_id], request.user)['resultados'][servicio_id]
+            
+            if resultado == NO_ENCONTRADO:
+                messages.error(request, 'El servicio no existe.')
+            elif resultado == YA_PAGADO:
+                messages.info(request, f'El servicio #{servicio_id} ya estaba pagado.')
+            else:
+                servicio_pagado = ServicioPagado.objects.select_related('servicio').get(pk=servicio_id)
                 # Mensaje de éxito con detalles
                 messages.success(
                     request, 
                     f'Servicio "{servicio_pagado.servicio.nombre}" pagado exitosamente. '
                     f'Total: ${servicio_pagado.precio_total:.2f}'
                 )
-                return redirect('ventas_cobrar_servicios')
+            return redirect('ventas_cobrar_servicios')
                 
+        except ValueError as e:
+            # Stock insuficiente para los productos del servicio
+            messages.error(request, str(e))
+            return redirect('ventas_cobrar_servicios')
         except Exception as e:
             # Error al procesar el pago
             messages.error(request, f'Error al procesar el pago: {str(e)}')
@@ -350,3 +688,266 @@ def pagar_servicio(request, servicio_id):
     
     # Si no es POST, redirigir a la lista
     return redirect('ventas_cobrar_servicios')
+
+
+@login_required
+def pagar_servicios_lote(request):
+    """
+    Vista AJAX para cobrar varios servicios cotizados a la vez.
+    
+    Todos los servicios se marcan como pagados con un solo UPDATE
+    condicional y comparten la misma fecha de pago. Los que ya estaban
+    pagados (o no existen) se reportan sin error. Los productos de los
+    servicios pagados se descuentan del inventario en el mismo cobro.
+    
+    DATOS POST:
+    - ids: IDs de los ServicioPagado a cobrar (campo repetido)
+    
+    RESPUESTA JSON:
+    {
+        "success": true,
+        "fecha_pago": "...",
+        "pagados": 2,
+        "importe": "900.00",
+        "resultados": [{"id": 7, "resultado": "pagado"}, {"id": 9, "resultado": "ya_pagado"}, ...]
+    }
+    Error: {"success": false, "error": "..."} con estado 400 (datos inválidos
+    o stock insuficiente; en ese caso no se paga ningún servicio) o 500
+    
+    PERMISOS:
+    - Requiere autenticación (@login_required)
+    - Solo acepta método POST
+    
+    Args:
+        request: Objeto HttpRequest (debe ser POST)
+        
+    Returns:
+        JsonResponse: Resultado por servicio o error
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'Método no permitido'}, status=405)
+    
+    try:
+        ids = leer_ids(request.POST.getlist('ids'))
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    
+    try:
+        cobro = pagar_servicios(ids, request.user)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    except Exception as e:
+        return JsonResponse(
+            {'success': False, 'error': f'Error al procesar el pago: {str(e)}'}, status=500
+        )
+    
+    return JsonResponse({
+        'success': True,
+        'fecha_pago': timezone.localtime(cobro['fecha_pago']).isoformat(),
+        'pagados': cobro['pagados'],
+        'importe': f"{cobro['importe']:.2f}",
+        'resultados': [
+            {'id': pk, 'resultado': resultado} for pk, resultado in cobro['resultados'].items()
+        ],
+    })
+
+# ==================== REPORTE DE VENTAS ====================
+
+@login_required
+def reporte_ventas(request):
+    """
+    Vista del historial de ventas con filtros, paginación y totales.
+    
+    Por defecto muestra el mes en curso. Cada página lee solo las ventas
+    que muestra (paginación por cursor sobre los índices de fecha) y los
+    totales se leen de los acumulados (ver ventas/reportes.py).
+    
+    PARÁMETROS GET:
+    - desde / hasta: Rango de fechas AAAA-MM-DD (default: mes en curso)
+    - usuario: ID del cajero (opcional)
+    - metodo_pago: Forma de pago (opcional)
+    - despues: Cursor de la página anterior (opcional)
+    
+    PERMISOS:
+    - Requiere autenticación (@login_required)
+    
+    Args:
+        request: Objeto HttpRequest con los filtros en GET
+        
+    Returns:
+        HttpResponse: Template del reporte de ventas
+    """
+    try:
+        filtros = leer_filtros(request.GET)
+    except ValueError as e:
+        messages.error(request, str(e))
+        return redirect('ventas_reporte')
+    
+    ventas, siguiente = pagina_ventas(filtros, request.GET.get('despues'))
+    
+    # Filtros actuales para el enlace a la siguiente página
+    parametros = request.GET.copy()
+    parametros.pop('despues', None)
+    
+    return render(request, 'ventas/reporte_ventas.html', {
+        'ventas': ventas,
+        'siguiente': siguiente,
+        'totales': totales_reporte(filtros),
+        'filtros': filtros,
+        'parametros': parametros.urlencode(),
+        'cajeros': Usuario.objects.order_by('username').values('id', 'username')
+    })
+
+
+@login_required
+def reporte_ventas_datos(request):
+    """
+    Vista AJAX con una página del reporte de ventas y los totales del rango.
+    
+    PARÁMETROS GET: Los mismos que reporte_ventas
+    
+    RESPUESTA JSON:
+    {
+        "success": true,
+        "ventas": [{"id": 12, "fecha": "...", "cajero": "ana", "metodo_pago": "efectivo", "total": "450.00"}, ...],
+        "siguiente": "cursor o null",
+        "totales": {"ventas": 120, "importe": "35200.00"}
+    }
+    Error: {"success": false, "error": "..."} con estado 400
+    
+    PERMISOS:
+    - Requiere autenticación (@login_required)
+    
+    Args:
+        request: Objeto HttpRequest con los filtros en GET
+        
+    Returns:
+        JsonResponse: Página del reporte o error
+    """
+    try:
+        filtros = leer_filtros(request.GET)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    
+    ventas, siguiente = pagina_ventas(filtros, request.GET.get('despues'))
+    totales = totales_reporte(filtros)
+    
+    return JsonResponse({
+        'success': True,
+        'ventas': [
+            {
+                'id': venta['id'],
+                'fecha': timezone.localtime(venta['fecha']).isoformat(),
+                'cajero': venta['cajero'],
+                'metodo_pago': venta['metodo_pago'],
+                'total': f"{venta['total']:.2f}",
+            }
+            for venta in ventas
+        ],
+        'siguiente': siguiente,
+        'totales': {'ventas': totales['ventas'], 'importe': f"{totales['importe']:.2f}"},
+    })
+
+# ==================== DOCUMENTOS PDF ====================
+
+def respuesta_pdf(contenido, nombre_archivo):
+    """
+    Respuesta HTTP que muestra un PDF en el navegador (listo para imprimir).
+    """
+    response = HttpResponse(contenido, content_type='application/pdf')
+    response['Content-Disposition'] = f'inline; filename="{nombre_archivo}"'
+    return response
+
+
+@login_required
+def ticket_venta(request, venta_id):
+    """
+    Vista que devuelve el ticket de una venta en PDF.
+    
+    Las reimpresiones se sirven desde la caché (ver ventas/documentos.py).
+    
+    PERMISOS:
+    - Requiere autenticación (@login_required)
+    
+    Args:
+        request: Objeto HttpRequest
+        venta_id (int): ID de la venta
+        
+    Returns:
+        HttpResponse: Ticket en PDF (404 si la venta no existe)
+    """
+    contenido = ticket_venta_pdf(venta_id)
+    if contenido is None:
+        raise Http404('Venta no encontrada')
+    
+    return respuesta_pdf(contenido, f'ticket-{venta_id}.pdf')
+
+
+@login_required
+def cotizacion_servicio(request, servicio_pagado_id):
+    """
+    Vista que devuelve la cotización (o comprobante de pago) de un servicio en PDF.
+    
+    PERMISOS:
+    - Requiere autenticación (@login_required)
+    
+    Args:
+        request: Objeto HttpRequest
+        servicio_pagado_id (int): ID del ServicioPagado
+        
+    Returns:
+        HttpResponse: Cotización en PDF (404 si no existe)
+    """
+    contenido = cotizacion_pdf(servicio_pagado_id)
+    if contenido is None:
+        raise Http404('Cotización no encontrada')
+    
+    return respuesta_pdf(contenido, f'cotizacion-{servicio_pagado_id}.pdf')
+
+# ==================== EXPORTACIÓN DE VENTAS Y SERVICIOS ====================
+
+@login_required
+def exportar_datos(request, tipo):
+    """
+    Vista para descargar el historial de ventas o servicios en CSV o XLSX.
+    
+    Las filas se leen con cursores del servidor por bloques y se envían en
+    streaming (StreamingHttpResponse): la memoria utilizada es constante
+    aunque el historial abarque varios años.
+    
+    PARÁMETROS GET:
+    - formato: 'csv' (default) o 'xlsx'
+    - desde: Fecha inicial AAAA-MM-DD (opcional)
+    - hasta: Fecha final AAAA-MM-DD (opcional)
+    
+    PERMISOS:
+    - Requiere autenticación (@login_required)
+    
+    Args:
+        request: Objeto HttpRequest con parámetros GET opcionales
+        tipo (str): 'ventas' o 'servicios'
+        
+    Returns:
+        StreamingHttpResponse: Archivo exportado como adjunto
+    """
+    exportaciones = {
+        'ventas': exportar_ventas,
+        'servicios': exportar_servicios,
+    }
+    
+    if tipo not in exportaciones:
+        raise Http404('Exportación no disponible')
+    
+    try:
+        encabezados, filas = exportaciones[tipo](
+            desde=request.GET.get('desde'),
+            hasta=request.GET.get('hasta')
+        )
+    except ValueError as e:
+        # Fecha con formato inválido
+        messages.error(request, str(e))
+        return redirect('ventas')
+    
+    return respuesta_exportacion(
+        tipo, encabezados, filas, request.GET.get('formato', 'csv'), request
+    )